@@ -29,7 +29,7 @@ class PatientInline(admin.StackedInline):
 class UserAdmin(BaseUserAdmin):
     model = User
     list_display = ('email', 'full_name', 'get_role', 'is_staff', 'is_active', 'created_at')
-    list_filter = ('is_staff', 'is_active', 'deleted_at')
+    list_filter = ('role', 'is_staff', 'is_active', 'deleted_at')
     search_fields = ('email', 'username', 'first_name', 'last_name', 'phone')
     ordering = ('-created_at',)
     readonly_fields = ('created_at', 'updated_at', 'last_login')
@@ -53,7 +53,7 @@ class UserAdmin(BaseUserAdmin):
     def full_name(self, obj):
         return obj.full_name
     
-    @admin.display(description='Rol')
+    @admin.display(description='Rol', ordering='role')
     def get_role(self, obj):
         if obj.is_doctor:
             return format_html('<span style="color: #1976d2;">Doctor</span>')
@@ -70,6 +70,7 @@ class DoctorAdmin(admin.ModelAdmin):
     readonly_fields = ('id', 'created_at', 'updated_at')
     date_hierarchy = 'created_at'
     autocomplete_fields = ('user',)
+    list_select_related = ('user',)
     
     fieldsets = (
         ('Usuario', {'fields': ('user',)}),
@@ -80,6 +81,10 @@ class DoctorAdmin(admin.ModelAdmin):
         ('Metadatos', {'fields': ('id', 'created_at', 'updated_at'), 'classes': ('collapse',)}),
     )
     
+    def get_queryset(self, request):
+        # Una sola query de especialidades para toda la página del listado
+        return super().get_queryset(request).prefetch_related('specialties')
+    
     @admin.display(description='Nombre')
     def get_full_name(self, obj):
         return f"Dr. {obj.user.full_name}"
@@ -104,6 +109,7 @@ class PatientAdmin(admin.ModelAdmin):
     readonly_fields = ('id', 'created_at', 'updated_at')
     date_hierarchy = 'created_at'
     autocomplete_fields = ('user',)
+    list_select_related = ('user',)
     
     fieldsets = (
         ('Usuario', {'fields': ('user',)}),
@@ -132,15 +138,15 @@ class PatientAdmin(admin.ModelAdmin):
 class SpecialtyAdmin(admin.ModelAdmin):
     list_display = ('name', 'get_doctors_count', 'created_at')
     search_fields = ('name', 'description')
-    readonly_fields = ('id', 'created_at')
+    readonly_fields = ('id', 'active_doctors_count', 'created_at')
     filter_horizontal = ('doctors',)
     
     fieldsets = (
         (None, {'fields': ('name', 'description')}),
-        ('Doctores', {'fields': ('doctors',)}),
+        ('Doctores', {'fields': ('doctors', 'active_doctors_count')}),
         ('Metadatos', {'fields': ('id', 'created_at'), 'classes': ('collapse',)}),
     )
     
-    @admin.display(description='Nº Doctores')
+    @admin.display(description='Nº Doctores activos', ordering='active_doctors_count')
     def get_doctors_count(self, obj):
-        return obj.doctors.count()
+        return obj.active_doctors_count
@@ -0,0 +1,170 @@
+# apps/users/authentication.py
+"""
+Autenticación JWT sin tocar Postgres en cada request.
+
+JWTAuthentication de simplejwt verifica la firma del token (HS256) y
+después busca el User por id en la base en cada request.
+CachedJWTAuthentication agrega tres capas:
+
+1. LRU por proceso de tokens ya verificados (token -> token validado),
+   por JWT_TOKEN_CACHE_TTL segundos como máximo y nunca más allá de su
+   `exp`. Un hit no vuelve a calcular el HMAC ni a decodificar el JSON.
+2. Snapshot del usuario en Redis (auth:user:<uuid>:<columnas>): columnas
+   del User sin el password (incluye role, así que is_doctor / is_patient
+   tampoco consultan la base). Con un hit, request.user se arma sin queries.
+3. Invalidación: los signals (apps/users/signals.py) borran el snapshot
+   al guardar el User (incluye soft_delete() y restore(), que llaman a
+   save()), al borrarlo y al cambiar su rol (crear / borrar su perfil de
+   doctor o paciente).
+
+El LRU sólo guarda el token validado (id de usuario y claims), nunca
+datos del usuario: desactivar un usuario corta el acceso en el próximo
+request aunque su token siga en el LRU.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.users.models import User
+
+# Columnas del snapshot: todo menos el password, que queda diferido
+SNAPSHOT_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields if field.attname != 'password'
+)
+
+# La clave incluye las columnas: si cambia el modelo, los snapshots viejos
+# (guardados como lista de valores) dejan de leerse
+USER_CACHE_KEY = 'auth:user:{}:' + hashlib.md5(','.join(SNAPSHOT_FIELDS).encode()).hexdigest()[:8]
+
+
+class TokenCache:
+    """LRU thread-safe de tokens validados, con vencimiento por entrada"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw_token):
+        with self._lock:
+            entry = self._entries.get(raw_token)
+            if entry is None:
+                return None
+            token, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[raw_token]
+                return None
+            self._entries.move_to_end(raw_token)
+            return token
+
+    def put(self, raw_token, token):
+        expires_at = min(time.time() + self.ttl, token.get('exp', 0))
+        with self._lock:
+            self._entries[raw_token] = (token, expires_at)
+            self._entries.move_to_end(raw_token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(settings.JWT_TOKEN_CACHE_SIZE, settings.JWT_TOKEN_CACHE_TTL)
+
+
+# ----------------------------------------------------------------------
+# Snapshot del usuario
+# ----------------------------------------------------------------------
+
+def build_snapshot(user):
+    """Dict cacheable con las columnas del usuario"""
+    return {
+        'fields': [getattr(user, attname) for attname in SNAPSHOT_FIELDS],
+        'password_md5': get_md5_hash_password(user.password),
+    }
+
+
+def user_from_snapshot(snapshot):
+    """
+    User armado desde el snapshot, como si viniera de la base.
+
+    El password queda diferido (si alguien lo lee, se carga con una query
+    y un save() sin update_fields no lo pisa).
+    """
+    return User.from_db(DEFAULT_DB_ALIAS, SNAPSHOT_FIELDS, snapshot['fields'])
+
+
+def get_user_snapshot(user_id):
+    """Snapshot del usuario desde Redis, o desde la base (y se cachea)"""
+    key = USER_CACHE_KEY.format(user_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        user = User.objects.only(*SNAPSHOT_FIELDS, 'password').filter(pk=user_id).first()
+        if user is None:
+            return None
+        snapshot = build_snapshot(user)
+        cache.set(key, snapshot, settings.AUTH_USER_CACHE_TIMEOUT)
+    return snapshot
+
+
+def invalidate_user(user_id):
+    """
+    Borra el snapshot del usuario, ahora y al confirmar la transacción.
+
+    El borrado inmediato corta el cache en este request; el del commit
+    evita que un request concurrente vuelva a guardar los datos viejos
+    mientras la transacción no terminó.
+    """
+    key = USER_CACHE_KEY.format(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+# ----------------------------------------------------------------------
+# Authentication class
+# ----------------------------------------------------------------------
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication con LRU de tokens y snapshot del usuario en Redis"""
+
+    def get_validated_token(self, raw_token):
+        token = token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_cache.put(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        snapshot = get_user_snapshot(user_id)
+        if snapshot is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        user = user_from_snapshot(snapshot)
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != snapshot['password_md5']:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        return user
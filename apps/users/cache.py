@@ -0,0 +1,240 @@
+# apps/users/cache.py
+"""
+Cache de respuestas para los endpoints públicos del catálogo.
+
+Las claves llevan la versión de cada "namespace" del que depende la
+respuesta. Los signals (apps/users/signals.py) incrementan la versión
+al cambiar los datos, así las entradas viejas quedan huérfanas y
+expiran solas, sin borrar entradas que no tienen relación.
+
+Namespaces:
+- doctors:         cualquier listado de doctores
+- doctor:<uuid>:   el detalle de un doctor
+- specialties:     especialidades (nombres, contadores y vínculos)
+
+Las views async (apps/users/views/public_async.py) usan las mismas
+versiones, pero leen Redis con el cliente asyncio de redis-py en lugar
+de django-redis (que es sync y bajo ASGI correría en un thread).
+"""
+
+import asyncio
+import functools
+import hashlib
+import time
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.users.instrumentation import record_cache
+
+VERSION_KEY = 'api:v:{}'
+
+
+def _initial_version():
+    # Arranca desde un timestamp (ms): si Redis pierde la versión,
+    # la nueva nunca coincide con una que ya se haya usado.
+    return int(time.time() * 1000)
+
+
+def get_versions(namespaces):
+    """Versión actual de cada namespace (en un solo round-trip)"""
+    keys = [VERSION_KEY.format(ns) for ns in namespaces]
+    found = cache.get_many(keys)
+
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            version = _initial_version()
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        versions.append(version)
+    return versions
+
+
+def bump(*namespaces):
+    """Invalida los namespaces incrementando su versión"""
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # No existía: la creamos ya "nueva"
+            cache.set(key, _initial_version(), timeout=None)
+
+
+def bump_on_commit(*namespaces):
+    """
+    Invalida recién cuando se confirma la transacción actual.
+
+    Si se invalidara antes, un request concurrente podría volver a
+    cachear los datos viejos con la versión nueva.
+    """
+    transaction.on_commit(lambda: bump(*namespaces))
+
+
+def doctor_namespace(doctor_id):
+    return f'doctor:{doctor_id}'
+
+
+def _request_digest(request):
+    params = sorted(
+        (key, value)
+        for key in request.query_params
+        for value in request.query_params.getlist(key)
+    )
+    raw = f'{request.build_absolute_uri(request.path)}|{params}'
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def response_cache_key(request, view_name, namespaces):
+    """Clave con las versiones de los namespaces y los query params normalizados"""
+    versions = '.'.join(str(v) for v in get_versions(namespaces))
+    return f'api:r:{view_name}:{versions}:{_request_digest(request)}'
+
+
+def cache_response(namespaces, cacheable_params=None, timeout=None):
+    """
+    Decorator para views de DRF (va debajo de @api_view).
+
+    namespaces: tupla de namespaces, o función (request, **kwargs) -> tupla
+    cacheable_params: si se indica, sólo se cachean requests cuyos query
+        params estén todos en este conjunto (ej. listados sin filtros)
+    timeout: segundos (default: settings.API_CACHE_TIMEOUT)
+
+    Sólo se cachean respuestas 200 a GET.
+    """
+    if timeout is None:
+        timeout = settings.API_CACHE_TIMEOUT
+
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view_func(request, *args, **kwargs)
+            if cacheable_params is not None and not set(request.query_params) <= cacheable_params:
+                return view_func(request, *args, **kwargs)
+
+            view_namespaces = namespaces(request, **kwargs) if callable(namespaces) else namespaces
+            key = response_cache_key(request, view_func.__name__, view_namespaces)
+
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, timeout)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+# ----------------------------------------------------------------------
+# Versión async (views ASGI)
+# ----------------------------------------------------------------------
+
+# Un cliente por event loop: las conexiones de redis.asyncio quedan
+# atadas al loop en el que se abrieron
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """Cliente redis.asyncio sobre el mismo Redis que CACHES['default']"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = aioredis.Redis.from_url(settings.CACHES['default']['LOCATION'])
+        _async_clients[loop] = client
+    return client
+
+
+async def aget_versions(namespaces):
+    """
+    Como get_versions, sin bloquear el event loop.
+
+    Lee y crea las mismas claves que django-redis (cache.make_key; los
+    enteros se guardan sin pickle), así un bump() desde los signals
+    invalida también lo cacheado por las views async.
+
+    Devuelve None si Redis no responde: el cache es una optimización
+    (igual que IGNORE_EXCEPTIONS en CACHES).
+    """
+    client = get_async_client()
+    keys = [cache.make_key(VERSION_KEY.format(ns)) for ns in namespaces]
+    started = time.perf_counter()
+    try:
+        found = await client.mget(keys)
+        versions = []
+        for key, version in zip(keys, found):
+            if version is None:
+                version = _initial_version()
+                if not await client.set(key, version, nx=True):
+                    version = await client.get(key) or version
+            versions.append(int(version))
+    except (RedisError, OSError):
+        return None
+    missing = found.count(None)
+    record_cache(time.perf_counter() - started, hits=len(keys) - missing, misses=missing)
+    return versions
+
+
+def acache_response(namespaces, cacheable_params=None, timeout=None):
+    """
+    Como cache_response, para views async que devuelven HttpResponse.
+
+    Guarda el cuerpo ya renderizado (bytes): un hit no deserializa ni
+    vuelve a renderizar nada. Las claves no se comparten con las de
+    cache_response (el formato guardado es distinto).
+    """
+    if timeout is None:
+        timeout = settings.API_CACHE_TIMEOUT
+
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return await view_func(request, *args, **kwargs)
+            if cacheable_params is not None and not set(request.query_params) <= cacheable_params:
+                return await view_func(request, *args, **kwargs)
+
+            view_namespaces = namespaces(request, **kwargs) if callable(namespaces) else namespaces
+            versions = await aget_versions(view_namespaces)
+            if versions is None:
+                return await view_func(request, *args, **kwargs)
+
+            client = get_async_client()
+            key = cache.make_key('api:ra:{}:{}:{}'.format(
+                view_func.__name__,
+                '.'.join(str(v) for v in versions),
+                _request_digest(request),
+            ))
+            started = time.perf_counter()
+            try:
+                body = await client.get(key)
+            except (RedisError, OSError):
+                body = None
+            record_cache(time.perf_counter() - started, hits=int(body is not None), misses=int(body is None))
+            if body is not None:
+                return HttpResponse(body, content_type='application/json')
+
+            response = await view_func(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                try:
+                    await client.set(key, response.content, ex=timeout)
+                except (RedisError, OSError):
+                    pass
+            return response
+
+        return wrapper
+
+    return decorator
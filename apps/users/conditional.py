@@ -0,0 +1,119 @@
+# apps/users/conditional.py
+"""
+GET condicional (ETag / Last-Modified) para endpoints de detalle.
+
+El validador se calcula sin serializar nada: con las versiones del
+cache (apps/users/cache.py) o con los updated_at ya cargados. Si el
+cliente manda If-None-Match / If-Modified-Since y coincide, se responde
+304 sin cuerpo.
+"""
+
+import functools
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+
+from apps.users.cache import aget_versions, get_versions
+
+
+def make_etag(*parts):
+    """ETag corto y opaco a partir de cualquier cantidad de valores"""
+    raw = '|'.join(str(part) for part in parts)
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def set_validators(response, etag=None, last_modified=None, private=False):
+    """
+    Agrega ETag / Last-Modified a la respuesta.
+
+    Cache-Control: no-cache obliga al cliente a revalidar siempre;
+    private evita que proxies compartidos guarden datos del usuario.
+    """
+    if etag:
+        response.headers['ETag'] = quote_etag(etag)
+    if last_modified:
+        response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+    if private:
+        patch_cache_control(response, no_cache=True, private=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def not_modified(request, etag=None, last_modified=None, private=False):
+    """
+    Devuelve una respuesta 304 si el cliente ya tiene esta versión,
+    o None si hay que generar la respuesta completa.
+    """
+    response = get_conditional_response(
+        request,
+        etag=quote_etag(etag) if etag else None,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None and response.status_code == status.HTTP_304_NOT_MODIFIED:
+        return set_validators(response, etag, last_modified, private)
+    return None
+
+
+def etag_from_versions(namespaces):
+    """
+    Decorator para views públicas cacheadas (va debajo de @api_view).
+
+    El ETag sale de las versiones de los namespaces de los que depende
+    la respuesta: una sola lectura a Redis, sin tocar Postgres.
+
+    namespaces: tupla de namespaces, o función (request, **kwargs) -> tupla
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            view_namespaces = namespaces(request, **kwargs) if callable(namespaces) else namespaces
+            etag = make_etag(view_func.__name__, *view_namespaces, *get_versions(view_namespaces))
+
+            response = not_modified(request, etag=etag)
+            if response is not None:
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                set_validators(response, etag=etag)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def aetag_from_versions(namespaces):
+    """Como etag_from_versions, para views async (versiones con aget_versions)"""
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await view_func(request, *args, **kwargs)
+
+            view_namespaces = namespaces(request, **kwargs) if callable(namespaces) else namespaces
+            versions = await aget_versions(view_namespaces)
+            if versions is None:
+                # Sin Redis no hay validador estable: respuesta completa
+                return await view_func(request, *args, **kwargs)
+            # Mismo ETag que la view sync: pasar de una a otra no invalida lo del cliente
+            etag = make_etag(view_func.__name__.removesuffix('_async'), *view_namespaces, *versions)
+
+            response = not_modified(request, etag=etag)
+            if response is not None:
+                return response
+
+            response = await view_func(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                set_validators(response, etag=etag)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,104 @@
+# apps/users/directory.py
+"""
+Mantenimiento del read model DoctorSearchDocument.
+
+refresh_directory(ids) recalcula las filas de esos doctores:
+- doctores visibles -> upsert (INSERT ... ON CONFLICT DO UPDATE)
+- doctores inactivos, eliminados o inexistentes -> se borra su fila
+
+Se llama desde apps/users/signals.py dentro de la misma transacción
+que el cambio, y en bloque desde `python manage.py rebuild_search_index`.
+"""
+
+from apps.users.models import Doctor, DoctorSearchDocument
+from apps.users.search import build_search_values
+
+DOCUMENT_FIELDS = [
+    'full_name',
+    'image_url',
+    'address',
+    'latitude',
+    'longitude',
+    'specialty_ids',
+    'specialty_names',
+    'search_name',
+    'search_specialties',
+    'search_vector',
+    'created_at',
+    'refreshed_at',
+]
+
+
+def build_document(doctor):
+    """
+    Arma el documento de un doctor cargado con
+    Doctor.objects.for_listing() (usuario y especialidades en memoria).
+    """
+    specialties = list(doctor.specialties.all())
+    search_name, search_specialties, search_vector = build_search_values(
+        doctor.user.first_name,
+        doctor.user.last_name,
+        doctor.university,
+        doctor.bio,
+        [s.name for s in specialties],
+    )
+
+    return DoctorSearchDocument(
+        doctor_id=doctor.pk,
+        full_name=doctor.user.full_name,
+        image_url=doctor.image_url,
+        address=doctor.address,
+        latitude=doctor.latitude,
+        longitude=doctor.longitude,
+        specialty_ids=[s.pk for s in specialties],
+        specialty_names=[s.name for s in specialties],
+        search_name=search_name,
+        search_specialties=search_specialties,
+        search_vector=search_vector,
+        created_at=doctor.created_at,
+    )
+
+
+def _upsert(documents):
+    DoctorSearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=['doctor'],
+        update_fields=DOCUMENT_FIELDS,
+    )
+
+
+def refresh_directory(doctor_ids=None, batch_size=500):
+    """
+    Recalcula el read model.
+
+    doctor_ids: ids a refrescar (None = reconstrucción completa).
+    Devuelve la cantidad de documentos escritos.
+    """
+    doctors = Doctor.objects.public().for_listing().order_by('pk')
+    stale = DoctorSearchDocument.objects.all()
+
+    if doctor_ids is not None:
+        doctor_ids = list(doctor_ids)
+        if not doctor_ids:
+            return 0
+        doctors = doctors.filter(pk__in=doctor_ids)
+        stale = stale.filter(doctor_id__in=doctor_ids)
+
+    # Primero quitamos los que ya no son visibles
+    stale.exclude(doctor__in=Doctor.objects.public()).delete()
+
+    written = 0
+    batch = []
+    for doctor in doctors.iterator(chunk_size=batch_size):
+        batch.append(build_document(doctor))
+        if len(batch) >= batch_size:
+            _upsert(batch)
+            written += len(batch)
+            batch = []
+
+    if batch:
+        _upsert(batch)
+        written += len(batch)
+
+    return written
@@ -0,0 +1,116 @@
+# apps/users/export.py
+"""
+Exportación del directorio de doctores en JSON Lines o CSV.
+
+La usan el endpoint /api/doctors/export/ (StreamingHttpResponse) y el
+comando `python manage.py export_doctors`. Las filas se leen con
+.values() + iterator(chunk_size=...), que en Postgres usa un cursor del
+lado del servidor: la memoria del proceso no depende del tamaño del
+directorio, sólo de `chunk_size`.
+"""
+
+import csv
+import io
+
+import orjson
+
+from apps.users.models import DoctorSearchDocument
+
+EXPORT_FORMATS = ('jsonl', 'csv')
+
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# (columna de salida, ruta en DoctorSearchDocument.values())
+EXPORT_COLUMNS = (
+    ('id', 'doctor_id'),
+    ('full_name', 'full_name'),
+    ('first_name', 'doctor__user__first_name'),
+    ('last_name', 'doctor__user__last_name'),
+    ('license_number', 'doctor__license_number'),
+    ('university', 'doctor__university'),
+    ('address', 'address'),
+    ('latitude', 'latitude'),
+    ('longitude', 'longitude'),
+    ('image_url', 'image_url'),
+    ('specialties', 'specialty_names'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'doctor__updated_at'),
+)
+
+
+def export_rows(chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Tuplas del directorio (doctores visibles), en el orden de EXPORT_COLUMNS.
+
+    Sale del read model con un único JOIN a doctor / user: sin prefetch
+    de especialidades ni instancias de modelos.
+    """
+    queryset = DoctorSearchDocument.objects.order_by('doctor_id').values_list(
+        *(path for _, path in EXPORT_COLUMNS)
+    )
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def _to_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return '|'.join(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _to_json(value):
+    if value is None or isinstance(value, list):
+        return value
+    return _to_text(value)
+
+
+def _jsonl_chunks(rows, chunk_size):
+    names = [name for name, _ in EXPORT_COLUMNS]
+    buffer = []
+    for row in rows:
+        record = {name: _to_json(value) for name, value in zip(names, row)}
+        buffer.append(orjson.dumps(record))
+        if len(buffer) >= chunk_size:
+            yield b'\n'.join(buffer) + b'\n'
+            buffer = []
+    if buffer:
+        yield b'\n'.join(buffer) + b'\n'
+
+
+def _csv_chunks(rows, chunk_size):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow([name for name, _ in EXPORT_COLUMNS])
+
+    pending = 0
+    for row in rows:
+        writer.writerow([_to_text(value) for value in row])
+        pending += 1
+        if pending >= chunk_size:
+            yield output.getvalue().encode('utf-8')
+            output.seek(0)
+            output.truncate()
+            pending = 0
+    yield output.getvalue().encode('utf-8')
+
+
+def export_chunks(export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Generador de bloques de bytes (~chunk_size filas cada uno).
+
+    Decimales, UUID y fechas salen como texto (latitud con sus 6
+    decimales, fechas en ISO 8601); las especialidades como lista en
+    JSONL y separadas por '|' en CSV.
+    """
+    rows = export_rows(chunk_size)
+    if export_format == 'csv':
+        return _csv_chunks(rows, chunk_size)
+    return _jsonl_chunks(rows, chunk_size)
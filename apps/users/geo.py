@@ -0,0 +1,56 @@
+# apps/users/geo.py
+"""
+Utilidades geográficas sin PostGIS.
+
+La búsqueda por cercanía se hace en dos pasos:
+1. Prefiltro por bounding box sobre (latitude, longitude), que
+   resuelve el índice doctor_geo_idx.
+2. Distancia exacta con haversine (en SQL) sólo sobre los candidatos,
+   para filtrar por radio y ordenar.
+"""
+
+import math
+
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+# Radio medio de la Tierra
+EARTH_RADIUS_KM = 6371.0088
+
+
+def bounding_box(lat, lng, radius_km):
+    """
+    Rectángulo (min_lat, max_lat, min_lng, max_lng) que contiene
+    el círculo de `radius_km` alrededor del punto.
+    """
+    lat, lng = float(lat), float(lng)
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+
+    # Cerca de los polos el círculo cubre todas las longitudes
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    delta_lng = math.degrees(
+        math.asin(math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat)))
+    )
+    return min_lat, max_lat, lng - delta_lng, lng + delta_lng
+
+
+def haversine_expression(lat, lng, lat_field='latitude', lng_field='longitude'):
+    """
+    Expresión ORM con la distancia en km desde (lat, lng) hasta
+    los campos `lat_field` / `lng_field` del modelo.
+    """
+    lat_rad = math.radians(float(lat))
+    lng_rad = math.radians(float(lng))
+
+    row_lat = Radians(Cast(F(lat_field), FloatField()))
+    row_lng = Radians(Cast(F(lng_field), FloatField()))
+
+    a = (
+        Power(Sin((row_lat - Value(lat_rad)) / Value(2.0)), 2)
+        + Value(math.cos(lat_rad)) * Cos(row_lat)
+        * Power(Sin((row_lng - Value(lng_rad)) / Value(2.0)), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a))
@@ -0,0 +1,171 @@
+# apps/users/hashing.py
+"""
+Hasheo de passwords en un pool acotado de threads.
+
+PBKDF2 (y argon2 / bcrypt) liberan el GIL mientras calculan, así que un
+pool de threads los corre en paralelo sin el costo de levantar procesos.
+Lo importante es que el pool es ACOTADO:
+- como máximo PASSWORD_HASHING_WORKERS hashes a la vez por proceso
+- como máximo PASSWORD_HASHING_MAX_PENDING pedidos esperando; si se
+  llena, el login / registro responde 503 con Retry-After en vez de
+  encolarse, y los threads del worker quedan libres para los endpoints
+  de lectura
+
+El pool es por proceso y sirve con workers gthread (config/gunicorn.py):
+con GUNICORN_THREADS threads por proceso, MAX_PENDING tiene que ser menor
+para que queden threads para las lecturas y el 503 llegue a dispararse.
+Con workers sync (un request por proceso) no hay nada que acotar: usar
+PASSWORD_HASHING_WORKERS = 0, que hashea en el thread del request
+(comportamiento de Django por defecto).
+
+Los contadores (en curso, en cola, rechazados, tiempos de espera y de
+hash) se exportan a /metrics (password_hashing_*, apps/users/metrics.py);
+metrics() devuelve los del proceso actual.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from apps.users import metrics as prometheus
+
+
+class HashingBusy(APIException):
+    """Pool lleno: se responde 503 con Retry-After"""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Hay demasiados inicios de sesión en curso. Reintentá en unos segundos.'
+    default_code = 'hashing_busy'
+    # El exception handler de DRF lo manda como Retry-After
+    wait = 1
+
+
+class HashingPool:
+    """
+    ThreadPoolExecutor con límite de pedidos pendientes y métricas.
+
+    workers: hashes simultáneos
+    max_pending: pedidos en curso + en cola antes de rechazar
+    timeout: segundos máximos que un request espera su resultado
+    """
+
+    def __init__(self, workers, max_pending, timeout):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hashing')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        prometheus.hashing_pool_started(workers, max_pending)
+        self._lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'in_flight': 0,
+            'queued': 0,
+            'wait_seconds': 0.0,
+            'hash_seconds': 0.0,
+        }
+
+    def _count(self, **changes):
+        with self._lock:
+            for key, delta in changes.items():
+                self._stats[key] += delta
+        prometheus.record_hashing(changes)
+
+    def run(self, func, *args):
+        """Ejecuta func(*args) en el pool y espera el resultado"""
+        if not self._slots.acquire(blocking=False):
+            self._count(rejected=1)
+            raise HashingBusy()
+
+        enqueued_at = time.perf_counter()
+        self._count(submitted=1, queued=1)
+
+        def task():
+            started = time.perf_counter()
+            self._count(queued=-1, in_flight=1, wait_seconds=started - enqueued_at)
+            try:
+                return func(*args)
+            finally:
+                self._count(in_flight=-1, completed=1, hash_seconds=time.perf_counter() - started)
+                self._slots.release()
+
+        future = self._executor.submit(task)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # La tarea sigue y libera su lugar al terminar
+            self._count(timeouts=1)
+            raise HashingBusy()
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(workers=self.workers, max_pending=self.max_pending)
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_pid = None
+
+
+def get_pool():
+    """Pool del proceso actual (se crea al primer uso, también después de un fork)"""
+    global _pool, _pool_pid
+    workers = settings.PASSWORD_HASHING_WORKERS
+    if not workers:
+        return None
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = HashingPool(
+                    workers=workers,
+                    max_pending=settings.PASSWORD_HASHING_MAX_PENDING or workers * 2,
+                    timeout=settings.PASSWORD_HASHING_TIMEOUT,
+                )
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def _run(func, *args):
+    pool = get_pool()
+    if pool is None:
+        return func(*args)
+    return pool.run(func, *args)
+
+
+def make_password(raw_password):
+    """Como django.contrib.auth.hashers.make_password, pero en el pool"""
+    return _run(hashers.make_password, raw_password)
+
+
+def check_password(user, raw_password):
+    """
+    Como user.check_password(), con la verificación en el pool.
+
+    Si el hash usa parámetros viejos se vuelve a hashear (también en el
+    pool) y se guarda, igual que hace Django.
+    """
+    encoded = user.password
+    if not _run(hashers.check_password, raw_password, encoded):
+        return False
+
+    if hashers.identify_hasher(encoded).must_update(encoded):
+        user.password = make_password(raw_password)
+        user.save(update_fields=['password'])
+    return True
+
+
+def metrics():
+    """Contadores de backpressure del pool de este proceso ({} si está desactivado)"""
+    pool = get_pool()
+    return pool.metrics() if pool else {}
@@ -0,0 +1,299 @@
+# apps/users/importer.py
+"""
+Importación masiva de doctores (User + Doctor + especialidades).
+
+La usa `python manage.py import_doctors`. A diferencia del alta por la
+API (RegisterSerializer + DoctorCreateSerializer), trabaja por lotes:
+- valida cada fila sin tocar la base (DoctorImportSerializer)
+- chequea email / username / matrícula contra la base con un query por
+  campo y por lote, y contra el resto del archivo
+- hashea los passwords en un pool de procesos, o deja la cuenta con
+  password inutilizable (pendiente de invitación) si la fila no trae
+- inserta con bulk_create: usuarios, doctores y vínculos con especialidades
+
+bulk_create no dispara signals: al final de cada lote se actualizan el
+read model, los contadores de especialidades y el cache a mano.
+"""
+
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+import orjson
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from rest_framework import serializers
+
+from apps.users.cache import bump_on_commit
+from apps.users.directory import refresh_directory
+from apps.users.models import Doctor, Specialty, User
+from apps.users.search import normalize
+
+INPUT_FORMATS = ('csv', 'jsonl')
+
+
+class DoctorImportSerializer(serializers.Serializer):
+    """
+    Una fila del archivo de importación.
+
+    Sólo validaciones de formato: la unicidad se chequea por lote
+    en DoctorImporter.
+    """
+
+    email = serializers.EmailField()
+    username = serializers.CharField(max_length=150, required=False, allow_blank=True)
+    first_name = serializers.CharField(max_length=150)
+    last_name = serializers.CharField(max_length=150)
+    phone = serializers.RegexField(r'^\+?1?\d{9,15}$', required=False, allow_blank=True)
+    password = serializers.CharField(min_length=8, required=False, allow_blank=True)
+
+    license_number = serializers.CharField(max_length=50)
+    university = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    bio = serializers.CharField(required=False, allow_blank=True)
+    address = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    latitude = serializers.DecimalField(max_digits=9, decimal_places=6, required=False, allow_null=True)
+    longitude = serializers.DecimalField(max_digits=9, decimal_places=6, required=False, allow_null=True)
+    image_url = serializers.URLField(max_length=500, required=False, allow_blank=True)
+
+    # Nombres de especialidades; en CSV separados por '|'
+    specialties = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        required=False
+    )
+
+    def to_internal_value(self, data):
+        data = {key: value for key, value in data.items() if value not in (None, '')}
+        if isinstance(data.get('specialties'), str):
+            data['specialties'] = [name.strip() for name in data['specialties'].split('|') if name.strip()]
+        return super().to_internal_value(data)
+
+    def validate_email(self, value):
+        return value.lower()
+
+
+def read_rows(path, input_format):
+    """Genera (número de fila, dict) desde un CSV con encabezado o un JSONL"""
+    with open(path, newline='', encoding='utf-8') as source:
+        if input_format == 'csv':
+            for number, row in enumerate(csv.DictReader(source), start=1):
+                yield number, row
+        else:
+            number = 0
+            for line in source:
+                if not line.strip():
+                    continue
+                number += 1
+                try:
+                    yield number, orjson.loads(line)
+                except orjson.JSONDecodeError as exc:
+                    yield number, {'__error__': f'JSON inválido: {exc}'}
+
+
+def _init_worker():
+    # Con 'spawn' los workers arrancan sin Django configurado
+    if not apps.ready:
+        django.setup()
+
+
+class Checkpoint:
+    """
+    Progreso persistido en un archivo JSON para poder retomar.
+
+    Se escribe después de confirmar cada lote (escritura atómica con
+    os.replace), así que nunca apunta a filas no guardadas.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {'rows_done': 0, 'created': 0, 'rejected': 0}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as source:
+                self.state.update(json.load(source))
+
+    def save(self):
+        if not self.path:
+            return
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as output:
+            json.dump(self.state, output)
+        os.replace(tmp, self.path)
+
+
+class DoctorImporter:
+    """
+    Importa lotes de filas ya leídas.
+
+    workers: procesos para hashear passwords (0 = en el proceso actual)
+    dry_run: valida todo pero no escribe
+    """
+
+    def __init__(self, workers=0, dry_run=False):
+        self.dry_run = dry_run
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers else None
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown()
+
+    # ------------------------------------------------------------------
+    # Validación
+    # ------------------------------------------------------------------
+
+    def validate(self, batch, seen):
+        """
+        Devuelve (válidas, rechazadas).
+
+        válidas: lista de (número de fila, datos validados)
+        rechazadas: lista de (número de fila, errores)
+        seen: emails / usernames / matrículas ya usados en lotes anteriores
+        """
+        # Un solo serializer para todo el lote: los campos se construyen una vez
+        serializer = DoctorImportSerializer()
+        valid, rejected = [], []
+        for number, row in batch:
+            if '__error__' in row:
+                rejected.append((number, {'row': [row['__error__']]}))
+                continue
+            try:
+                data = serializer.run_validation(row)
+            except serializers.ValidationError as exc:
+                rejected.append((number, exc.detail))
+                continue
+            data['username'] = data.get('username') or data['email'][:150]
+            valid.append((number, data))
+
+        # Unicidad: un query por campo contra la base + duplicados en el archivo
+        taken = {
+            'email': set(User.objects.filter(
+                email__in=[data['email'] for _, data in valid]
+            ).values_list('email', flat=True)),
+            'username': set(User.objects.filter(
+                username__in=[data['username'] for _, data in valid]
+            ).values_list('username', flat=True)),
+            'license_number': set(Doctor.objects.filter(
+                license_number__in=[data['license_number'] for _, data in valid]
+            ).values_list('license_number', flat=True)),
+        }
+
+        unique = []
+        for number, data in valid:
+            errors = {
+                field: ['Ya existe.' if data[field] in taken[field] else 'Repetido en el archivo.']
+                for field in taken
+                if data[field] in taken[field] or data[field] in seen[field]
+            }
+            if errors:
+                rejected.append((number, errors))
+                continue
+            for field in taken:
+                seen[field].add(data[field])
+            unique.append((number, data))
+
+        return unique, rejected
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def hash_passwords(self, rows):
+        """Password hasheado por fila, o inutilizable si la fila no trae"""
+        passwords = [data.get('password') or None for _, data in rows]
+        to_hash = [password for password in passwords if password]
+        if self.pool and to_hash:
+            hashed = iter(self.pool.map(make_password, to_hash, chunksize=max(1, len(to_hash) // 32)))
+        else:
+            hashed = iter(make_password(password) for password in to_hash)
+        return [next(hashed) if password else make_password(None) for password in passwords]
+
+    @staticmethod
+    def _specialty_ids():
+        """{nombre normalizado: pk}; entre homónimos gana la especialidad más vieja"""
+        ids = {}
+        for name, pk in Specialty.objects.order_by('created_at', 'pk').values_list('name', 'pk'):
+            ids.setdefault(normalize(name), pk)
+        return ids
+
+    def _specialties_by_name(self, rows):
+        """
+        {nombre normalizado: pk} de las especialidades del lote.
+
+        Compara como la búsqueda (sin mayúsculas ni acentos): "cardiologia"
+        o "CARDIOLOGÍA" reusan la "Cardiología" existente en vez de crear
+        otra. Se compara en Python porque con el collation C de la base
+        lower() no baja las letras acentuadas; la tabla es chica.
+        Las que faltan se crean con el primer nombre que aparece.
+        """
+        wanted = {}
+        for _, data in rows:
+            for name in data.get('specialties', []):
+                wanted.setdefault(normalize(name), name)
+        if not wanted:
+            return {}
+
+        ids = self._specialty_ids()
+        missing = [name for key, name in wanted.items() if key not in ids]
+        if missing:
+            Specialty.objects.bulk_create(
+                [Specialty(name=name) for name in missing],
+                ignore_conflicts=True
+            )
+            ids = self._specialty_ids()
+        return {key: ids[key] for key in wanted}
+
+    def create(self, rows):
+        """Inserta un lote ya validado. Devuelve la cantidad de doctores creados."""
+        if not rows or self.dry_run:
+            return 0
+
+        passwords = self.hash_passwords(rows)
+
+        with transaction.atomic():
+            specialty_ids = self._specialties_by_name(rows)
+
+            users, doctors, links = [], [], []
+            Link = Specialty.doctors.through
+            for (_, data), password in zip(rows, passwords):
+                user = User(
+                    email=data['email'],
+                    username=data['username'],
+                    first_name=data['first_name'],
+                    last_name=data['last_name'],
+                    phone=data.get('phone', ''),
+                    password=password,
+                    role=User.Role.DOCTOR,
+                )
+                doctor = Doctor(
+                    user=user,
+                    license_number=data['license_number'],
+                    university=data.get('university', ''),
+                    bio=data.get('bio', ''),
+                    address=data.get('address', ''),
+                    latitude=data.get('latitude'),
+                    longitude=data.get('longitude'),
+                    image_url=data.get('image_url', ''),
+                )
+                users.append(user)
+                doctors.append(doctor)
+                # "Cardiología" y "cardiologia" en la misma fila son un solo vínculo
+                links.extend(
+                    Link(specialty_id=specialty_id, doctor_id=doctor.pk)
+                    for specialty_id in dict.fromkeys(
+                        specialty_ids[normalize(name)] for name in data.get('specialties', [])
+                    )
+                )
+
+            User.objects.bulk_create(users)
+            Doctor.objects.bulk_create(doctors)
+            Link.objects.bulk_create(links)
+
+            # bulk_create no dispara signals (ver apps/users/signals.py)
+            refresh_directory([doctor.pk for doctor in doctors])
+            Specialty.objects.filter(
+                pk__in=set(specialty_ids.values())
+            ).recompute_active_doctors_count()
+            bump_on_commit('doctors', 'specialties')
+
+        return len(doctors)
@@ -0,0 +1,287 @@
+# apps/users/instrumentation.py
+"""
+Métricas por request: queries SQL, tiempo en la base y uso del cache.
+
+InstrumentationMiddleware cuenta queries y cache de cada request para las
+métricas de Prometheus (apps/users/metrics.py, si METRICS_ENABLED), y en
+una fracción de los requests (INSTRUMENTATION_SAMPLE_RATE) además:
+- agrega el header Server-Timing (db / cache / total), visible en la
+  pestaña Network del navegador. Sólo con SERVER_TIMING_HEADER (por
+  defecto = DEBUG) o para usuarios staff: a un cliente anónimo le
+  mostraría cuántas queries y cuánto cache usa cada endpoint
+- loguea un resumen (nivel INFO) con la view, las queries y el cache
+- loguea un WARNING si la misma query (misma forma de SQL, con
+  cualquier parámetro) se repite más de INSTRUMENTATION_REPEATED_QUERY_THRESHOLD
+  veces: el síntoma típico de un N+1
+
+Las queries se cuentan con un execute_wrapper instalado una sola vez en
+cada conexión (signal connection_created) y el cache con el cliente
+de django-redis InstrumentedRedisClient (CACHES['default']). Los dos
+anotan en el RequestMetrics del request actual, que viaja en un
+ContextVar: funciona igual en views sync, async y en el thread donde
+corre el ORM bajo ASGI. Fuera de un request medido, el costo es leer
+el ContextVar.
+"""
+
+import functools
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django_redis.client import DefaultClient
+
+from apps.users import metrics as prometheus
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_metrics', default=None)
+
+# "IN (%s, %s, %s)" -> "IN (%s...)": misma forma con cualquier cantidad de ids
+_PARAM_LIST = re.compile(r'%s(?:\s*,\s*%s)+')
+
+_MISSING = object()
+
+
+class RequestMetrics:
+    """Contadores de un request"""
+
+    __slots__ = (
+        'sampled', 'started', 'queries', 'db_time', 'shapes',
+        'cache_hits', 'cache_misses', 'cache_calls', 'cache_time',
+    )
+
+    def __init__(self, sampled=True):
+        # Las formas de SQL (para detectar N+1) sólo se juntan en los muestreados
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_calls = 0
+        self.cache_time = 0.0
+
+    def record_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        if self.sampled:
+            self.shapes[sql_shape(sql)] += 1
+
+    def record_cache(self, duration, hits=0, misses=0):
+        self.cache_calls += 1
+        self.cache_time += duration
+        self.cache_hits += hits
+        self.cache_misses += misses
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def repeated_queries(self, threshold):
+        """[(sql, veces)] de las formas que se repiten más de threshold veces"""
+        return [(sql, count) for sql, count in self.shapes.most_common() if count > threshold]
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'cache;dur={self.cache_time * 1000:.1f};'
+            f'desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f'total;dur={self.total_time * 1000:.1f}',
+        ])
+
+
+def sql_shape(sql):
+    """SQL sin la cantidad de parámetros de los IN: las repeticiones de una query la comparten"""
+    return _PARAM_LIST.sub('%s...', sql)
+
+
+def current_metrics():
+    """RequestMetrics del request actual, o None si no se está midiendo"""
+    return _current.get()
+
+
+def record_cache(duration, hits=0, misses=0):
+    """Anota una operación de cache hecha sin django-redis (p. ej. redis.asyncio)"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.record_cache(duration, hits, misses)
+
+
+# ----------------------------------------------------------------------
+# SQL
+# ----------------------------------------------------------------------
+
+def _execute_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - started)
+
+
+@receiver(connection_created)
+def install_execute_wrapper(sender, connection, **kwargs):
+    # connection_created se repite en cada reconexión del mismo wrapper
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+# ----------------------------------------------------------------------
+# Cache
+# ----------------------------------------------------------------------
+
+def _timed(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return method(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            metrics.record_cache(time.perf_counter() - started)
+    return wrapper
+
+
+class InstrumentedRedisClient(DefaultClient):
+    """DefaultClient de django-redis que anota hits, misses y tiempo por request"""
+
+    def get(self, key, default=None, version=None, client=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().get(key, default, version, client)
+        started = time.perf_counter()
+        value = super().get(key, _MISSING, version, client)
+        hit = value is not _MISSING
+        metrics.record_cache(time.perf_counter() - started, hits=int(hit), misses=int(not hit))
+        return value if hit else default
+
+    def get_many(self, keys, version=None, client=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().get_many(keys, version, client)
+        keys = list(keys)
+        started = time.perf_counter()
+        found = super().get_many(keys, version, client)
+        metrics.record_cache(
+            time.perf_counter() - started, hits=len(found), misses=len(keys) - len(found)
+        )
+        return found
+
+    set = _timed(DefaultClient.set)
+    add = _timed(DefaultClient.add)
+    set_many = _timed(DefaultClient.set_many)
+    delete = _timed(DefaultClient.delete)
+    delete_many = _timed(DefaultClient.delete_many)
+    incr = _timed(DefaultClient.incr)
+    has_key = _timed(DefaultClient.has_key)
+
+
+# ----------------------------------------------------------------------
+# Middleware
+# ----------------------------------------------------------------------
+
+class InstrumentationMiddleware:
+    """
+    Mide los requests (ver docstring del módulo).
+
+    Con METRICS_ENABLED mide todos para las métricas de Prometheus
+    (apps/users/metrics.py); Server-Timing, el log y la detección de
+    N+1 quedan sólo para los muestreados.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        self.threshold = settings.INSTRUMENTATION_REPEATED_QUERY_THRESHOLD
+        self.export = settings.METRICS_ENABLED
+        self.server_timing = settings.SERVER_TIMING_HEADER
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def start(self, request):
+        """RequestMetrics para este request, o None si no hay que medirlo"""
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        if not sampled and not self.export:
+            return None
+        if self.export:
+            prometheus.request_started(request)
+        return RequestMetrics(sampled)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = self.start(request)
+        if metrics is None:
+            return self.get_response(request)
+
+        response = None
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+            self.finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        metrics = self.start(request)
+        if metrics is None:
+            return await self.get_response(request)
+
+        response = None
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+            self.finish(request, response, metrics)
+        return response
+
+    def finish(self, request, response, metrics):
+        """response es None si get_response lanzó una excepción"""
+        if self.export:
+            prometheus.request_finished(request, response, metrics)
+        if metrics.sampled and response is not None:
+            self.report(request, response, metrics)
+
+    def exposes_timing(self, request):
+        if self.server_timing:
+            return True
+        # DRF deja en request.user el usuario autenticado por JWT
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
+
+    def report(self, request, response, metrics):
+        if self.exposes_timing(request):
+            response['Server-Timing'] = metrics.server_timing()
+
+        match = request.resolver_match
+        view = match.view_name if match else request.path
+        logger.info(
+            '%s %s [%s] %s: %d queries (%.1f ms), cache %d hits / %d misses (%.1f ms), %.1f ms',
+            request.method, request.path, view, response.status_code,
+            metrics.queries, metrics.db_time * 1000,
+            metrics.cache_hits, metrics.cache_misses, metrics.cache_time * 1000,
+            metrics.total_time * 1000,
+        )
+        for sql, count in metrics.repeated_queries(self.threshold):
+            logger.warning(
+                'Posible N+1 en %s %s [%s]: la misma query se ejecutó %d veces: %s',
+                request.method, request.path, view, count, sql[:300],
+            )
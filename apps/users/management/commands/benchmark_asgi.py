@@ -0,0 +1,119 @@
+# apps/users/management/commands/benchmark_asgi.py
+"""
+Prueba de carga de los endpoints públicos de lectura bajo ASGI:
+views sync (DRF, corren en el executor de threads) vs async
+(apps/users/views/public_async.py).
+
+Los requests pasan por el handler ASGI de Django en el mismo proceso
+(AsyncClient), con N "conexiones" concurrentes por endpoint. Mide
+requests/s y latencias; no incluye el costo del servidor HTTP.
+
+Uso:
+    python manage.py benchmark_asgi
+    python manage.py benchmark_asgi --concurrency 64 --seconds 10
+    python manage.py benchmark_asgi --mode async
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+import types
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, override_settings
+from django.urls import path
+
+from apps.users import views
+from apps.users.models import DoctorSearchDocument, Specialty
+
+MODES = ('sync', 'async')
+
+
+def _urlconf(mode):
+    """URLconf con las cuatro views públicas en su versión sync o async"""
+    suffix = '_async' if mode == 'async' else ''
+    module = types.ModuleType(f'benchmark_asgi_{mode}')
+    module.urlpatterns = [
+        path('api/doctors/', getattr(views, f'doctor_list{suffix}')),
+        path('api/doctors/<uuid:doctor_id>/', getattr(views, f'doctor_detail{suffix}')),
+        path('api/specialties/', getattr(views, f'specialty_list{suffix}')),
+        path('api/specialties/<uuid:specialty_id>/', getattr(views, f'specialty_detail{suffix}')),
+    ]
+    return module
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+async def _load(url, concurrency, seconds):
+    """(requests por status, latencias) con `concurrency` clientes pegándole a `url`"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+    latencies, statuses = [], {}
+
+    async def connection():
+        client = AsyncClient()
+        while loop.time() < deadline:
+            started = time.perf_counter()
+            response = await client.get(url)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    return statuses, latencies
+
+
+class Command(BaseCommand):
+    help = 'Prueba de carga ASGI: views públicas sync vs async'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--mode', choices=MODES, help='Sólo un modo (default: ambos)')
+
+    def handle(self, *args, **options):
+        doctor_id = DoctorSearchDocument.objects.values_list('doctor_id', flat=True).first()
+        specialty_id = Specialty.objects.values_list('id', flat=True).first()
+        if doctor_id is None or specialty_id is None:
+            raise CommandError('Se necesita al menos un doctor y una especialidad cargados.')
+
+        urls = [
+            '/api/doctors/',
+            '/api/doctors/?search=gar',  # no se cachea: va siempre a la base
+            f'/api/doctors/{doctor_id}/',
+            '/api/specialties/',
+            f'/api/specialties/{specialty_id}/',
+        ]
+        modes = [options['mode']] if options['mode'] else MODES
+
+        # Los 4xx / 5xx se cuentan en el resumen, no se loguean uno por uno
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        self.stdout.write(
+            f'Concurrencia {options["concurrency"]}, {options["seconds"]:.0f}s por endpoint'
+        )
+
+        for url in urls:
+            for mode in modes:
+                with override_settings(
+                    ROOT_URLCONF=_urlconf(mode),
+                    ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                ):
+                    started = time.perf_counter()
+                    statuses, latencies = asyncio.run(
+                        _load(url, options['concurrency'], options['seconds'])
+                    )
+                    duration = time.perf_counter() - started
+
+                self.stdout.write(
+                    f'{mode:5} {url:50} {len(latencies) / duration:8.1f} req/s  '
+                    f'p50 {_percentile(latencies, 50) * 1000:6.1f} ms  '
+                    f'p99 {_percentile(latencies, 99) * 1000:6.1f} ms  '
+                    f'media {statistics.fmean(latencies or [0]) * 1000:6.1f} ms  '
+                    f'{statuses}'
+                )
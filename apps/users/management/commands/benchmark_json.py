@@ -0,0 +1,115 @@
+# apps/users/management/commands/benchmark_json.py
+"""
+Compara el JSONRenderer de DRF con ORJSONRenderer (apps/users/renderers.py).
+
+Arma en memoria N doctores con la forma de DoctorSerializer en dos
+variantes y, para cada una, verifica que los dos renderers generen
+exactamente los mismos bytes y mide el tiempo de render por 1.000 doctores:
+- serializer: valores ya convertidos a string, como los devuelve DRF
+- native: UUID, Decimal y datetime sin convertir, como salen de .values()
+
+No toca la base de datos.
+
+Uso:
+    python manage.py benchmark_json
+    python manage.py benchmark_json --doctors 5000 --repeat 50
+"""
+
+import random
+import timeit
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.users.renderers import ORJSONRenderer
+
+SPECIALTIES = ['Cardiología', 'Pediatría', 'Dermatología', 'Clínica Médica', 'Traumatología']
+
+
+def _doctor(rng, now, native):
+    """Un doctor con la forma de DoctorSerializer"""
+    text = (lambda value: value) if native else str
+    created_at = now - timedelta(days=rng.randint(0, 900), microseconds=rng.randint(0, 999999))
+    if not native:
+        created_at = created_at.isoformat().replace('+00:00', 'Z')
+
+    user_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+    return {
+        'id': text(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        'user': {
+            'id': text(user_id),
+            'email': f'medico{user_id.hex[:8]}@example.com',
+            'username': f'medico{user_id.hex[:8]}',
+            'first_name': rng.choice(['Juan', 'María', 'José', 'Lucía']),
+            'last_name': rng.choice(['González', 'Pérez', 'Fernández', 'López']),
+            'full_name': 'Juan González',
+            'phone': '+54 11 5555-5555',
+            'is_active': True,
+            'is_doctor': True,
+            'is_patient': False,
+            'created_at': created_at,
+            'updated_at': created_at,
+        },
+        'license_number': f'MN{rng.randint(10000, 99999)}',
+        'university': 'Universidad de Buenos Aires',
+        'bio': 'Atención de adultos y niños. Turnos por la mañana.',
+        'address': 'Av. Corrientes 1234, CABA',
+        'latitude': text(Decimal('-34.603700') + Decimal(rng.randint(0, 9999)) / 10**6),
+        'longitude': text(Decimal('-58.381600') - Decimal(rng.randint(0, 9999)) / 10**6),
+        'image_url': '',
+        'specialties': [
+            {'id': str(uuid.UUID(int=rng.getrandbits(128), version=4)), 'name': name}
+            for name in rng.sample(SPECIALTIES, 2)
+        ],
+        'is_active': True,
+        'created_at': created_at,
+        'updated_at': created_at,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Mide el tiempo de render JSON (DRF vs orjson) por cada 1.000 doctores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--doctors', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        now = timezone.now()
+        count = options['doctors']
+        per_thousand = 1000 / count
+
+        for variant, native in (('serializer', False), ('native', True)):
+            data = {
+                'next': None,
+                'previous': None,
+                'results': [_doctor(rng, now, native) for _ in range(count)],
+            }
+
+            renderers = {'drf': JSONRenderer(), 'orjson': ORJSONRenderer()}
+            outputs = {name: r.render(data, 'application/json') for name, r in renderers.items()}
+            if outputs['drf'] != outputs['orjson']:
+                raise CommandError(f'{variant}: la salida de orjson no coincide con la de DRF')
+
+            timings = {}
+            for name, renderer in renderers.items():
+                best = min(timeit.repeat(
+                    lambda: renderer.render(data, 'application/json'),
+                    number=1,
+                    repeat=options['repeat'],
+                ))
+                timings[name] = best * 1000 * per_thousand
+
+            self.stdout.write(
+                f'{variant:<11} {len(outputs["drf"]):>9} bytes | '
+                f'drf {timings["drf"]:7.2f} ms | orjson {timings["orjson"]:7.2f} ms | '
+                f'x{timings["drf"] / timings["orjson"]:.1f}  (por 1.000 doctores)'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Salida idéntica en ambas variantes.'))
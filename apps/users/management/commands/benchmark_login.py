@@ -0,0 +1,102 @@
+# apps/users/management/commands/benchmark_login.py
+"""
+Mide logins sostenidos por segundo (y por core) contra /api/auth/login/.
+
+Crea un usuario temporal, dispara logins desde N threads durante unos
+segundos y reporta throughput, latencias, rechazos (503) y las métricas
+del pool de hashing. Con --inline compara contra hashear en el thread
+del request (PASSWORD_HASHING_WORKERS = 0).
+
+Uso:
+    python manage.py benchmark_login
+    python manage.py benchmark_login --concurrency 16 --seconds 20
+    python manage.py benchmark_login --inline
+"""
+
+import logging
+import os
+import statistics
+import threading
+import time
+import uuid
+
+import orjson
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from apps.users import hashing
+from apps.users.models import User
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark de logins por segundo con el pool de hashing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--inline', action='store_true', help='Hashear en el thread del request')
+
+    def handle(self, *args, **options):
+        password = uuid.uuid4().hex
+        email = f'benchmark-{uuid.uuid4().hex[:12]}@example.com'
+        user = User.objects.create_user(email=email, username=email, password=password)
+        body = orjson.dumps({'email': email, 'password': password})
+
+        overrides = {'PASSWORD_HASHING_WORKERS': 0} if options['inline'] else {}
+        host = next(
+            (h for h in settings.ALLOWED_HOSTS if h != '*' and not h.startswith('.')),
+            'localhost'
+        )
+        # Los 503 del pool saturado son esperables acá: no los logueamos uno por uno
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        latencies, statuses = [], {}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+
+        def worker():
+            client = Client(HTTP_HOST=host)
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                response = client.post('/api/auth/login/', data=body, content_type='application/json')
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        try:
+            with override_settings(**overrides):
+                threads = [threading.Thread(target=worker) for _ in range(options['concurrency'])]
+                started = time.monotonic()
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                duration = time.monotonic() - started
+                pool_metrics = hashing.metrics()
+        finally:
+            user.delete()
+
+        ok = statuses.get(200, 0)
+        cores = os.cpu_count() or 1
+        mode = 'inline' if options['inline'] else f'pool ({pool_metrics.get("workers")} workers)'
+        self.stdout.write(f'Modo: {mode}, concurrencia {options["concurrency"]}, {duration:.1f}s, {cores} cores')
+        self.stdout.write(f'Respuestas: {statuses}')
+        self.stdout.write(
+            f'Logins OK: {ok / duration:.1f}/s ({ok / duration / cores:.1f}/s por core)'
+        )
+        self.stdout.write(
+            f'Latencia: p50 {_percentile(latencies, 50) * 1000:.0f} ms, '
+            f'p95 {_percentile(latencies, 95) * 1000:.0f} ms, '
+            f'p99 {_percentile(latencies, 99) * 1000:.0f} ms, '
+            f'media {statistics.fmean(latencies or [0]) * 1000:.0f} ms'
+        )
+        if pool_metrics:
+            self.stdout.write(f'Pool: {pool_metrics}')
@@ -0,0 +1,43 @@
+# apps/users/management/commands/export_doctors.py
+"""
+Exporta el directorio de doctores en JSON Lines o CSV.
+
+Lee la base en bloques con un cursor del lado del servidor, así que la
+memoria es constante aunque haya millones de doctores.
+
+Uso:
+    python manage.py export_doctors > doctores.jsonl
+    python manage.py export_doctors --output csv --file doctores.csv
+    python manage.py export_doctors --chunk-size 5000
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand
+
+from apps.users.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_chunks
+
+
+class Command(BaseCommand):
+    help = 'Exporta los doctores visibles en JSON Lines o CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', choices=EXPORT_FORMATS, default='jsonl')
+        parser.add_argument('--file', help='Archivo de salida (default: stdout)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        chunks = export_chunks(options['output'], chunk_size=options['chunk_size'])
+
+        if not options['file']:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        written = 0
+        with open(options['file'], 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+                written += len(chunk)
+        self.stderr.write(self.style.SUCCESS(f'{written} bytes escritos en {options["file"]}.'))
@@ -0,0 +1,114 @@
+# apps/users/management/commands/import_doctors.py
+"""
+Importa doctores (usuario + perfil + especialidades) desde CSV o JSONL.
+
+Columnas / claves: email, first_name, last_name, license_number y
+opcionales username, phone, password, university, bio, address,
+latitude, longitude, image_url, specialties (nombres; en CSV separados
+por '|'). Las especialidades se buscan sin distinguir mayúsculas ni
+acentos; las que no existen se crean.
+
+Sin password la cuenta queda con password inutilizable (pendiente de
+invitación). El progreso se guarda en <archivo>.checkpoint después de
+cada lote: si el proceso se corta, volver a correr el mismo comando
+retoma desde el último lote confirmado.
+
+Uso:
+    python manage.py import_doctors registro.csv
+    python manage.py import_doctors registro.jsonl --batch-size 2000 --workers 8
+    python manage.py import_doctors registro.csv --dry-run --errors rechazados.jsonl
+"""
+
+import itertools
+import os
+import time
+
+import orjson
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.importer import INPUT_FORMATS, Checkpoint, DoctorImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Importa doctores en lote desde un archivo CSV o JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file')
+        parser.add_argument('--input', choices=INPUT_FORMATS, help='Formato (default: por extensión)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=min(4, os.cpu_count() or 1),
+            help='Procesos para hashear passwords (0 = sin pool)'
+        )
+        parser.add_argument('--checkpoint', help='Archivo de progreso (default: <file>.checkpoint)')
+        parser.add_argument('--restart', action='store_true', help='Ignorar el checkpoint existente')
+        parser.add_argument('--errors', help='Guardar las filas rechazadas (JSONL)')
+        parser.add_argument('--dry-run', action='store_true', help='Sólo validar, sin escribir')
+
+    def handle(self, *args, **options):
+        path = options['file']
+        if not os.path.exists(path):
+            raise CommandError(f'No existe el archivo {path}')
+
+        input_format = options['input'] or path.rsplit('.', 1)[-1].lower()
+        if input_format not in INPUT_FORMATS:
+            raise CommandError(f'Formato no soportado: usar --input {"|".join(INPUT_FORMATS)}')
+
+        checkpoint_path = None if options['dry_run'] else (options['checkpoint'] or f'{path}.checkpoint')
+        if options['restart'] and checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        checkpoint = Checkpoint(checkpoint_path)
+        state = checkpoint.state
+        if state['rows_done']:
+            self.stdout.write(f'Retomando después de la fila {state["rows_done"]}.')
+
+        errors_file = open(options['errors'], 'ab') if options['errors'] else None
+        importer = DoctorImporter(workers=options['workers'], dry_run=options['dry_run'])
+        seen = {'email': set(), 'username': set(), 'license_number': set()}
+
+        rows = (
+            (number, row) for number, row in read_rows(path, input_format)
+            if number > state['rows_done']
+        )
+        started = time.monotonic()
+        processed = 0
+        try:
+            while True:
+                batch = list(itertools.islice(rows, options['batch_size']))
+                if not batch:
+                    break
+
+                valid, rejected = importer.validate(batch, seen)
+                created = importer.create(valid)
+
+                state['rows_done'] = batch[-1][0]
+                state['created'] += created if not options['dry_run'] else len(valid)
+                state['rejected'] += len(rejected)
+                checkpoint.save()
+
+                if errors_file:
+                    for number, errors in rejected:
+                        errors_file.write(orjson.dumps({'row': number, 'errors': errors}) + b'\n')
+                elif rejected:
+                    number, errors = rejected[0]
+                    self.stderr.write(f'  fila {number}: {errors} (+{len(rejected) - 1} rechazadas)')
+
+                processed += len(batch)
+                rate = processed / max(time.monotonic() - started, 1e-6)
+                self.stdout.write(
+                    f'Fila {state["rows_done"]}: {state["created"]} creados, '
+                    f'{state["rejected"]} rechazados ({rate:.0f} filas/s)'
+                )
+        finally:
+            importer.close()
+            if errors_file:
+                errors_file.close()
+
+        verb = 'válidos' if options['dry_run'] else 'importados'
+        self.stdout.write(self.style.SUCCESS(
+            f'{state["created"]} doctores {verb}, {state["rejected"]} filas rechazadas.'
+        ))
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
@@ -0,0 +1,34 @@
+# apps/users/management/commands/load_token_blacklist.py
+"""
+Copia a Redis los refresh tokens blacklisteados en la base.
+
+La blacklist se consulta en Redis (apps/users/tokens.py). Correr una vez
+al pasar a Redis (o después de perder sus datos) para que los tokens
+invalidados antes sigan rechazados hasta que venzan. Sólo copia los
+que todavía no vencieron, con el TTL que les queda.
+
+Uso:
+    python manage.py load_token_blacklist
+"""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from apps.users.tokens import add_to_blacklist
+
+
+class Command(BaseCommand):
+    help = 'Carga en Redis la blacklist de refresh tokens de la base'
+
+    def handle(self, *args, **options):
+        rows = BlacklistedToken.objects.filter(
+            token__expires_at__gt=timezone.now()
+        ).values_list('token__jti', 'token__expires_at')
+
+        loaded = 0
+        for jti, expires_at in rows.iterator(chunk_size=2000):
+            add_to_blacklist(jti, expires_at.timestamp())
+            loaded += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{loaded} tokens cargados en Redis.'))
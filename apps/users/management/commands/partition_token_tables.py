@@ -0,0 +1,34 @@
+# apps/users/management/commands/partition_token_tables.py
+"""
+Convierte las tablas de token_blacklist a particionadas por mes.
+
+Con las tablas particionadas, la retención (prune_jwt_tokens / Celery
+beat) borra particiones enteras en vez de filas. La conversión copia
+todas las filas con las tablas bloqueadas: correrla en una ventana de
+mantenimiento. Requiere PostgreSQL 12 o superior. Ver
+apps/users/token_tables.py para los cambios de constraints.
+
+Uso:
+    python manage.py partition_token_tables
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.users.token_tables import partition_token_tables, table_stats
+
+
+class Command(BaseCommand):
+    help = 'Particiona por mes las tablas de token_blacklist'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql' or connection.pg_version < 120000:
+            raise CommandError('Se necesita PostgreSQL 12 o superior.')
+
+        if not partition_token_tables():
+            self.stdout.write('Las tablas ya están particionadas.')
+            return
+
+        for table, stats in table_stats().items():
+            self.stdout.write(f"  {table}: ~{stats['rows']} filas, {stats['partitions']} particiones")
+        self.stdout.write(self.style.SUCCESS('Tablas particionadas por mes.'))
@@ -0,0 +1,72 @@
+# apps/users/management/commands/prune_jwt_tokens.py
+"""
+Corre a mano la retención de las tablas de token_blacklist.
+
+Es lo mismo que hace la tarea de Celery beat (apps/users/tasks.py);
+sirve para la primera limpieza o para ver el tamaño de las tablas.
+
+Uso:
+    python manage.py prune_jwt_tokens
+    python manage.py prune_jwt_tokens --batch-size 5000 --pause 0
+    python manage.py prune_jwt_tokens --stats
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.users.token_tables import is_partitioned, prune_token_tables, table_stats
+
+
+class Command(BaseCommand):
+    help = 'Borra los refresh tokens vencidos de las tablas de token_blacklist'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Tokens por lote (default: JWT_PRUNE_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            help='Segundos de pausa entre lotes (default: JWT_PRUNE_PAUSE)',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Sólo muestra el tamaño de las tablas, sin borrar',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            mode = 'particionadas' if is_partitioned() else 'sin particionar'
+            self.stdout.write(f'Tablas {mode}')
+            self._write_tables(table_stats())
+            return
+
+        result = prune_token_tables(options['batch_size'], options['pause'])
+
+        if result['mode'] == 'partitions':
+            for name in result['created_partitions']:
+                self.stdout.write(f'  + {name}')
+            for name in result['dropped_partitions']:
+                self.stdout.write(f'  - {name}')
+            summary = (
+                f"{len(result['created_partitions'])} particiones creadas, "
+                f"{len(result['dropped_partitions'])} borradas, "
+                f"{result['deleted_orphans']} entradas de blacklist huérfanas borradas"
+            )
+        else:
+            summary = (
+                f"{result['deleted_outstanding']} tokens y "
+                f"{result['deleted_blacklisted']} entradas de blacklist borrados "
+                f"en {result['batches']} lotes"
+            )
+        self._write_tables(result['tables'])
+        self.stdout.write(self.style.SUCCESS(f"{summary} ({result['duration_seconds']} s)."))
+
+    def _write_tables(self, tables):
+        for table, stats in tables.items():
+            self.stdout.write(
+                f"  {table}: ~{stats['rows']} filas, {stats['bytes'] / 1024:.0f} KB, "
+                f"{stats['partitions']} particiones"
+            )
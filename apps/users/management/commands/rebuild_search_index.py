@@ -0,0 +1,23 @@
+# apps/users/management/commands/rebuild_search_index.py
+"""
+Reconstruye el read model DoctorSearchDocument (directorio de doctores).
+
+Uso:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --batch-size 1000
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.users.directory import refresh_directory
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los documentos de búsqueda (DoctorSearchDocument) de los doctores visibles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        written = refresh_directory(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{written} doctores reindexados.'))
@@ -0,0 +1,22 @@
+# apps/users/management/commands/reconcile_specialty_counts.py
+"""
+Recalcula Specialty.active_doctors_count desde la tabla intermedia.
+
+El contador se mantiene con signals, pero operaciones que no los
+disparan (QuerySet.update(), SQL manual, restores) pueden desfasarlo.
+
+Uso:
+    python manage.py reconcile_specialty_counts
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.users.models import Specialty
+
+
+class Command(BaseCommand):
+    help = 'Corrige el contador de doctores activos de cada especialidad'
+
+    def handle(self, *args, **options):
+        fixed = Specialty.objects.recompute_active_doctors_count()
+        self.stdout.write(self.style.SUCCESS(f'{fixed} especialidades corregidas.'))
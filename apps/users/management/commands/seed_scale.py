@@ -0,0 +1,102 @@
+# apps/users/management/commands/seed_scale.py
+"""
+Llena la base con un dataset sintético del tamaño de producción
+(apps/users/seeding.py) para reproducir la carga en local.
+
+Determinístico: la misma --seed y los mismos tamaños generan los mismos
+datos, con cualquier --batch-size y --workers. Todos los usuarios tienen
+el password SEED_PASSWORD y emails en @seed.example.com. Los lotes se
+generan e insertan en paralelo (--workers procesos, cada uno con su
+conexión); un millón de usuarios tarda unos minutos.
+
+Para agregar más datos sobre un dataset generado antes, pasar --first-user
+(y --first-specialty) a partir de donde terminó la corrida anterior.
+
+Uso:
+    python manage.py seed_scale
+    python manage.py seed_scale --users 5000000 --doctors 250000 --workers 8
+    python manage.py seed_scale --users 100000 --first-user 1000000 --seed 7
+"""
+
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.models import Specialty, User
+from apps.users.seeding import SEED_PASSWORD, SPECIALTY_NAMES, seed_dataset, seed_username
+
+
+class Command(BaseCommand):
+    help = 'Genera usuarios, doctores y pacientes sintéticos para pruebas a escala'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000_000)
+        parser.add_argument('--doctors', type=int, default=50_000)
+        parser.add_argument(
+            '--patients',
+            type=int,
+            help='Default: todos los usuarios que no son doctores',
+        )
+        parser.add_argument('--specialties', type=int, default=len(SPECIALTY_NAMES))
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=min(4, os.cpu_count() or 1),
+            help='Procesos que insertan lotes en paralelo (0 = sin pool)'
+        )
+        parser.add_argument('--first-user', type=int, default=0, help='Primer índice de usuario')
+        parser.add_argument('--first-specialty', type=int, default=0, help='Primer índice de especialidad')
+
+    def handle(self, *args, **options):
+        # Con DEBUG, connection.queries guarda (y re-renderiza) cada INSERT de varios MB
+        settings.DEBUG = False
+
+        users, doctors = options['users'], options['doctors']
+        patients = options['patients']
+        if patients is None:
+            patients = users - doctors
+        if min(users, doctors, patients, options['specialties']) < 0 or doctors + patients > users:
+            raise CommandError('Tamaños inválidos: doctors + patients no puede superar a users')
+
+        first_user = options['first_user']
+        usernames = [seed_username(first_user), seed_username(first_user + users - 1)]
+        if users and User.objects.filter(username__in=usernames).exists():
+            raise CommandError(
+                f'Ya hay usuarios generados desde el índice {first_user}: '
+                f'usar --first-user {User.objects.filter(username__regex=r"^user[0-9]+$").count()} '
+                'o una base vacía'
+            )
+        if options['specialties'] and not options['first_specialty'] and Specialty.objects.exists():
+            raise CommandError(
+                'Ya hay especialidades: usar --specialties 0 o --first-specialty '
+                f'{Specialty.objects.count()}'
+            )
+
+        started = time.monotonic()
+        report_every = max(options['batch_size'], users // 20)
+
+        def progress(done, total):
+            if done % report_every < options['batch_size'] or done == total:
+                elapsed = time.monotonic() - started
+                self.stdout.write(f'  {done}/{total} usuarios ({done / elapsed:.0f}/s)')
+
+        result = seed_dataset(
+            users, doctors, options['specialties'],
+            patients=patients,
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            first_user=first_user,
+            first_specialty=options['first_specialty'],
+            progress=progress,
+            workers=options['workers'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.users} usuarios, {result.doctors} doctores, {result.patients} pacientes, '
+            f'{result.specialties} especialidades y {result.links} vínculos '
+            f'en {time.monotonic() - started:.1f} s (password: {SEED_PASSWORD}).'
+        ))
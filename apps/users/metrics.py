@@ -0,0 +1,196 @@
+# apps/users/metrics.py
+"""
+Métricas Prometheus de la API (endpoint /metrics, apps/users/views/metrics.py).
+
+Por request (las anota InstrumentationMiddleware, apps/users/instrumentation.py),
+con la etiqueta `view` = nombre de la URL (doctor_list, login,
+token_refresh, ...):
+    http_request_duration_seconds   histograma de duración (view, method, status)
+    http_requests_in_progress       requests en curso (method)
+    http_request_db_queries         histograma de queries SQL por request (view)
+    http_request_db_seconds_total   tiempo en la base (view)
+    http_cache_lookups_total        lecturas de cache (view, result=hit|miss)
+
+Hit ratio por view en PromQL:
+    sum by (view) (rate(http_cache_lookups_total{result="hit"}[5m]))
+      / sum by (view) (rate(http_cache_lookups_total[5m]))
+
+Pool de hashing de passwords (apps/users/hashing.py), sumado entre procesos:
+    password_hashing_tasks          hashes en curso / en cola (state)
+    password_hashing_capacity       workers y max_pending (limit)
+    password_hashing_requests_total pedidos terminados (result=completed|rejected|timeouts)
+    password_hashing_wait_seconds_total / password_hashing_seconds_total
+                                    tiempo en cola / hasheando
+
+Además, el tamaño de las tablas de tokens y la última corrida de la
+retención (apps/users/token_tables.py), leídos del cache al scrapear.
+
+Varios procesos (gunicorn): con PROMETHEUS_MULTIPROC_DIR cada worker
+escribe sus valores en archivos de ese directorio y /metrics los suma
+(modo multiproceso de prometheus_client). config/gunicorn.py lo vacía
+al arrancar y descarta los gauges de los workers que terminan.
+"""
+
+import os
+
+from django.core.cache import cache
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from apps.users.token_tables import PRUNE_STATS_KEY
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Duración de los requests',
+    ['view', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress',
+    'Requests en curso',
+    ['method'],
+    multiprocess_mode='livesum',
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Queries SQL por request',
+    ['view'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_SECONDS = Counter(
+    'http_request_db_seconds',
+    'Tiempo de los requests en la base',
+    ['view'],
+)
+CACHE_LOOKUPS = Counter(
+    'http_cache_lookups',
+    'Lecturas de cache de los requests',
+    ['view', 'result'],
+)
+
+HASHING_TASKS = Gauge(
+    'password_hashing_tasks',
+    'Hashes de passwords en curso o en cola',
+    ['state'],
+    multiprocess_mode='livesum',
+)
+HASHING_CAPACITY = Gauge(
+    'password_hashing_capacity',
+    'Límites del pool de hashing',
+    ['limit'],
+    multiprocess_mode='livesum',
+)
+HASHING_REQUESTS = Counter(
+    'password_hashing_requests',
+    'Pedidos al pool de hashing por resultado',
+    ['result'],
+)
+HASHING_WAIT_SECONDS = Counter(
+    'password_hashing_wait_seconds',
+    'Tiempo de los hashes esperando un thread del pool',
+)
+HASHING_SECONDS = Counter(
+    'password_hashing_seconds',
+    'Tiempo hasheando en el pool',
+)
+
+
+def view_label(request):
+    """Nombre de la URL; nunca el path (la cantidad de etiquetas tiene que ser acotada)"""
+    match = request.resolver_match
+    if match is None:
+        return '<unresolved>'
+    return match.url_name or '<unnamed>'
+
+
+def request_started(request):
+    REQUESTS_IN_PROGRESS.labels(request.method).inc()
+
+
+def request_finished(request, response, metrics):
+    """Anota un request terminado (response es None si la view lanzó una excepción)"""
+    REQUESTS_IN_PROGRESS.labels(request.method).dec()
+
+    view = view_label(request)
+    status = str(response.status_code) if response is not None else '500'
+    REQUEST_DURATION.labels(view, request.method, status).observe(metrics.total_time)
+    REQUEST_DB_QUERIES.labels(view).observe(metrics.queries)
+    if metrics.db_time:
+        REQUEST_DB_SECONDS.labels(view).inc(metrics.db_time)
+    if metrics.cache_hits:
+        CACHE_LOOKUPS.labels(view, 'hit').inc(metrics.cache_hits)
+    if metrics.cache_misses:
+        CACHE_LOOKUPS.labels(view, 'miss').inc(metrics.cache_misses)
+
+
+def hashing_pool_started(workers, max_pending):
+    HASHING_CAPACITY.labels('workers').set(workers)
+    HASHING_CAPACITY.labels('max_pending').set(max_pending)
+
+
+def record_hashing(changes):
+    """Cambios de los contadores de HashingPool (mismas claves que HashingPool.metrics())"""
+    for state in ('in_flight', 'queued'):
+        if changes.get(state):
+            HASHING_TASKS.labels(state).inc(changes[state])
+    for result in ('completed', 'rejected', 'timeouts'):
+        if changes.get(result):
+            HASHING_REQUESTS.labels(result).inc(changes[result])
+    if changes.get('wait_seconds'):
+        HASHING_WAIT_SECONDS.inc(changes['wait_seconds'])
+    if changes.get('hash_seconds'):
+        HASHING_SECONDS.inc(changes['hash_seconds'])
+
+
+class TokenTablesCollector:
+    """Última corrida de la retención de tokens (la guarda prune_token_tables en el cache)"""
+
+    def collect(self):
+        stats = cache.get(PRUNE_STATS_KEY)
+        if not stats:
+            return
+
+        rows = GaugeMetricFamily('jwt_token_table_rows', 'Filas estimadas', labels=['table'])
+        size = GaugeMetricFamily('jwt_token_table_bytes', 'Tamaño en disco', labels=['table'])
+        for table, table_stats in stats['tables'].items():
+            rows.add_metric([table], table_stats['rows'])
+            size.add_metric([table], table_stats['bytes'])
+        yield rows
+        yield size
+
+        yield GaugeMetricFamily(
+            'jwt_prune_duration_seconds', 'Duración de la última retención',
+            value=stats['duration_seconds'],
+        )
+        deleted = GaugeMetricFamily(
+            'jwt_prune_deleted', 'Borrado en la última retención', labels=['kind'],
+        )
+        if stats['mode'] == 'partitions':
+            deleted.add_metric(['partitions'], len(stats['dropped_partitions']))
+            deleted.add_metric(['orphans'], stats.get('deleted_orphans', 0))
+        else:
+            deleted.add_metric(['outstanding'], stats['deleted_outstanding'])
+            deleted.add_metric(['blacklisted'], stats['deleted_blacklisted'])
+        yield deleted
+
+
+_token_tables_registry = CollectorRegistry()
+_token_tables_registry.register(TokenTablesCollector())
+
+
+def render():
+    """Todas las métricas en el formato de texto de Prometheus"""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry) + generate_latest(_token_tables_registry)
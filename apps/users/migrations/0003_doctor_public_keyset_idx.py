@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_doctor_latitude_doctor_longitude_alter_doctor_bio_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True)), fields=['-created_at', 'id'], name='doctor_public_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_doctor_public_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True), ('latitude__isnull', False), ('longitude__isnull', False)), fields=['latitude', 'longitude'], name='doctor_geo_idx'),
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:42
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import unicodedata
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import Value
+
+# Copia congelada de apps.users.search (normalize / build_search_values) al
+# momento de esta migración: si esa lógica cambia, la migración no cambia.
+SEARCH_CONFIG = 'spanish'
+
+
+def normalize(text):
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.lower().split())
+
+
+def build_search_values(first_name, last_name, university, bio, specialty_names):
+    name = normalize(f'{first_name} {last_name}')
+    specialties = normalize(' '.join(sorted(specialty_names)))
+    vector = (
+        SearchVector(Value(name), config=SEARCH_CONFIG, weight='A')
+        + SearchVector(Value(specialties), config=SEARCH_CONFIG, weight='B')
+        + SearchVector(Value(normalize(university)), config=SEARCH_CONFIG, weight='C')
+        + SearchVector(Value(normalize(bio)), config=SEARCH_CONFIG, weight='D')
+    )
+    return name, specialties, vector
+
+
+def backfill_search_columns(apps, schema_editor):
+    Doctor = apps.get_model('users', 'Doctor')
+    doctors = Doctor.objects.select_related('user').prefetch_related('specialties')
+
+    batch = []
+    for doctor in doctors.iterator(chunk_size=500):
+        doctor.search_name, doctor.search_specialties, doctor.search_vector = build_search_values(
+            doctor.user.first_name,
+            doctor.user.last_name,
+            doctor.university,
+            doctor.bio,
+            [s.name for s in doctor.specialties.all()],
+        )
+        batch.append(doctor)
+        if len(batch) >= 500:
+            Doctor.objects.bulk_update(batch, ['search_name', 'search_specialties', 'search_vector'])
+            batch = []
+    if batch:
+        Doctor.objects.bulk_update(batch, ['search_name', 'search_specialties', 'search_vector'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_doctor_geo_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='doctor',
+            name='search_name',
+            field=models.CharField(blank=True, editable=False, max_length=301),
+        ),
+        migrations.AddField(
+            model_name='doctor',
+            name='search_specialties',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='doctor',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='doctor_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_name'], name='doctor_search_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_specialties'], name='doctor_search_spec_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(backfill_search_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:44
+
+from django.db import migrations, models
+
+
+def backfill_active_doctors_count(apps, schema_editor):
+    Specialty = apps.get_model('users', 'Specialty')
+    specialties = Specialty.objects.annotate(
+        total=models.Count(
+            'doctors',
+            filter=models.Q(doctors__is_active=True, doctors__deleted_at__isnull=True),
+        )
+    )
+    for specialty in specialties:
+        specialty.active_doctors_count = specialty.total
+    Specialty.objects.bulk_update(specialties, ['active_doctors_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_doctor_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='specialty',
+            name='active_doctors_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='doctores activos'),
+        ),
+        migrations.RunPython(backfill_active_doctors_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,137 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:49
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_search_documents(apps, schema_editor):
+    # Copia los doctores visibles con los valores de búsqueda que ya
+    # calculó 0005 (las columnas de Doctor se borran más abajo). Es una
+    # copia congelada de apps.users.directory.build_document.
+    Doctor = apps.get_model('users', 'Doctor')
+    Specialty = apps.get_model('users', 'Specialty')
+    DoctorSearchDocument = apps.get_model('users', 'DoctorSearchDocument')
+
+    doctors = Doctor.objects.filter(
+        is_active=True, deleted_at__isnull=True,
+    ).select_related('user').prefetch_related(
+        models.Prefetch('specialties', queryset=Specialty.objects.only('id', 'name').order_by('name')),
+    ).order_by('pk')
+
+    batch = []
+    for doctor in doctors.iterator(chunk_size=500):
+        user = doctor.user
+        specialties = list(doctor.specialties.all())
+        batch.append(DoctorSearchDocument(
+            doctor_id=doctor.pk,
+            full_name=f'{user.first_name} {user.last_name}'.strip() or user.email,
+            image_url=doctor.image_url,
+            address=doctor.address,
+            latitude=doctor.latitude,
+            longitude=doctor.longitude,
+            specialty_ids=[s.pk for s in specialties],
+            specialty_names=[s.name for s in specialties],
+            search_name=doctor.search_name,
+            search_specialties=doctor.search_specialties,
+            search_vector=doctor.search_vector,
+            created_at=doctor.created_at,
+        ))
+        if len(batch) >= 500:
+            DoctorSearchDocument.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        DoctorSearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_specialty_active_doctors_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoctorSearchDocument',
+            fields=[
+                ('doctor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='users.doctor', verbose_name='doctor')),
+                ('full_name', models.CharField(max_length=301, verbose_name='nombre completo')),
+                ('image_url', models.URLField(blank=True, max_length=500, verbose_name='foto de perfil')),
+                ('address', models.CharField(blank=True, max_length=255, verbose_name='dirección')),
+                ('latitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True, verbose_name='latitud')),
+                ('longitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True, verbose_name='longitud')),
+                ('specialty_ids', django.contrib.postgres.fields.ArrayField(base_field=models.UUIDField(), blank=True, default=list, size=None)),
+                ('specialty_names', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True, default=list, size=None)),
+                ('search_name', models.CharField(blank=True, max_length=301)),
+                ('search_specialties', models.TextField(blank=True)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(verbose_name='fecha de creación')),
+                ('refreshed_at', models.DateTimeField(auto_now=True, verbose_name='última actualización')),
+            ],
+            options={
+                'verbose_name': 'documento de búsqueda de doctor',
+                'verbose_name_plural': 'documentos de búsqueda de doctores',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='doctor',
+            name='doctor_public_keyset_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='doctor',
+            name='doctor_geo_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='doctor',
+            name='doctor_search_vector_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='doctor',
+            name='doctor_search_name_trgm',
+        ),
+        migrations.RemoveIndex(
+            model_name='doctor',
+            name='doctor_search_spec_trgm',
+        ),
+        migrations.RemoveField(
+            model_name='doctor',
+            name='search_name',
+        ),
+        migrations.RemoveField(
+            model_name='doctor',
+            name='search_specialties',
+        ),
+        migrations.RemoveField(
+            model_name='doctor',
+            name='search_vector',
+        ),
+        migrations.AddIndex(
+            model_name='doctorsearchdocument',
+            index=models.Index(fields=['-created_at', 'doctor'], name='doctor_doc_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctorsearchdocument',
+            index=models.Index(condition=models.Q(('latitude__isnull', False), ('longitude__isnull', False)), fields=['latitude', 'longitude'], name='doctor_doc_geo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctorsearchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['specialty_ids'], name='doctor_doc_specialty_ids_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctorsearchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='doctor_doc_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctorsearchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_name'], name='doctor_doc_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='doctorsearchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_specialties'], name='doctor_doc_spec_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
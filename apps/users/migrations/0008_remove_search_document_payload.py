@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:52
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_doctor_search_document'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='doctorsearchdocument',
+            name='payload',
+        ),
+    ]
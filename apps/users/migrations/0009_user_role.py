@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:15
+
+from django.db import migrations, models
+
+
+def backfill_role(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    User.objects.filter(doctor_profile__isnull=False).update(role='doctor')
+    User.objects.filter(patient_profile__isnull=False).update(role='patient')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_remove_search_document_payload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('none', 'Sin perfil'), ('doctor', 'Doctor'), ('patient', 'Paciente')], default='none', editable=False, max_length=10, verbose_name='rol'),
+        ),
+        migrations.RunPython(backfill_role, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,35 @@
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import Signal
 from django.utils.translation import gettext_lazy as _
 import uuid
 
+# Enviado por Doctor.set_specialties() con los vínculos agregados / quitados
+# (sets de ids de Specialty). Los cambios masivos sobre la tabla intermedia
+# no disparan m2m_changed. Los receivers están en apps/users/signals.py.
+doctor_specialties_changed = Signal()
+
+
+class DoctorQuerySet(models.QuerySet):
+    """QuerySet de Doctor con los filtros y cargas de los listados públicos"""
+    
+    def public(self):
+        """Doctores visibles en los endpoints públicos"""
+        return self.filter(is_active=True, deleted_at__isnull=True)
+    
+    def for_listing(self):
+        """
+        Carga todo lo que usa DoctorSerializer en un número fijo de queries:
+        - user por JOIN (is_doctor / is_patient salen de user.role)
+        - especialidades en un único prefetch para toda la página
+        """
+        from .specialty import Specialty
+        
+        return self.select_related(
+            'user',
+        ).prefetch_related(
+            models.Prefetch('specialties', queryset=Specialty.objects.only('id', 'name')),
+        )
+
 
 class Doctor(models.Model):
     """Perfil de Doctor"""
@@ -50,6 +78,8 @@ class Doctor(models.Model):
     created_at = models.DateTimeField(_('fecha de creación'), auto_now_add=True)
     updated_at = models.DateTimeField(_('última actualización'), auto_now=True)
     
+    objects = DoctorQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('doctor')
         verbose_name_plural = _('doctores')
@@ -60,4 +90,57 @@ class Doctor(models.Model):
         ]
     
     def __str__(self):
-        return f"Dr. {self.user.get_full_name()}"
\ No newline at end of file
+        return f"Dr. {self.user.get_full_name()}"
+    
+    @property
+    def is_public(self):
+        """Visible en los listados públicos (activo y no eliminado)"""
+        return self.is_active and self.deleted_at is None
+    
+    def set_specialties(self, specialty_ids):
+        """
+        Deja al doctor exactamente con esas especialidades.
+        
+        Calcula la diferencia con los vínculos actuales y la aplica con
+        un único DELETE y un único INSERT sobre la tabla intermedia; los
+        vínculos que no cambian no se tocan. Los ids inexistentes se
+        ignoran. Al final avisa una sola vez (doctor_specialties_changed)
+        para actualizar read model, contadores y cache.
+        
+        Bloquea la fila del doctor mientras lee los vínculos: dos llamadas
+        concurrentes no calculan la diferencia sobre el mismo estado (y no
+        ajustan dos veces los contadores).
+        
+        Devuelve (agregadas, quitadas) como sets de ids.
+        """
+        from .specialty import Specialty
+        
+        Link = Specialty.doctors.through
+        with transaction.atomic():
+            Doctor.objects.select_for_update().only('pk').get(pk=self.pk)
+            current = set(Link.objects.filter(doctor_id=self.pk).values_list('specialty_id', flat=True))
+            wanted = set(Specialty.objects.filter(id__in=specialty_ids).values_list('pk', flat=True))
+            
+            added = wanted - current
+            removed = current - wanted
+            if not added and not removed:
+                return added, removed
+            
+            if removed:
+                Link.objects.filter(doctor_id=self.pk, specialty_id__in=removed).delete()
+            if added:
+                Link.objects.bulk_create(
+                    [Link(doctor_id=self.pk, specialty_id=specialty_id) for specialty_id in added],
+                    ignore_conflicts=True,
+                )
+            
+            # Un prefetch previo quedó viejo
+            getattr(self, '_prefetched_objects_cache', {}).pop('specialties', None)
+            
+            doctor_specialties_changed.send(
+                sender=Doctor,
+                instance=self,
+                added=added,
+                removed=removed
+            )
+        return added, removed
\ No newline at end of file
@@ -0,0 +1,76 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class DoctorSearchDocument(models.Model):
+    """
+    Read model del directorio público de doctores.
+
+    Una fila por doctor visible (activo y no eliminado), con todo lo que
+    necesitan los listados y búsquedas ya resuelto: nombre, imagen,
+    dirección, coordenadas, especialidades y el documento de búsqueda.
+    Los listados públicos leen sólo esta tabla, sin JOINs ni distinct(),
+    y la devuelven como tarjetas (DoctorCardSerializer).
+
+    Se mantiene desde apps/users/signals.py (ver apps/users/directory.py)
+    y se reconstruye con `python manage.py rebuild_search_index`.
+    """
+
+    doctor = models.OneToOneField(
+        'users.Doctor',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document',
+        verbose_name=_('doctor')
+    )
+
+    full_name = models.CharField(_('nombre completo'), max_length=301)
+    image_url = models.URLField(_('foto de perfil'), max_length=500, blank=True)
+    address = models.CharField(_('dirección'), max_length=255, blank=True)
+    latitude = models.DecimalField(_('latitud'), max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(_('longitud'), max_digits=9, decimal_places=6, null=True, blank=True)
+
+    specialty_ids = ArrayField(models.UUIDField(), default=list, blank=True)
+    specialty_names = ArrayField(models.CharField(max_length=100), default=list, blank=True)
+
+    # Búsqueda (ver apps/users/search.py)
+    search_name = models.CharField(max_length=301, blank=True)
+    search_specialties = models.TextField(blank=True)
+    search_vector = SearchVectorField(null=True)
+
+    # Copia de Doctor.created_at: orden por defecto y cursor de paginación
+    created_at = models.DateTimeField(_('fecha de creación'))
+    refreshed_at = models.DateTimeField(_('última actualización'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('documento de búsqueda de doctor')
+        verbose_name_plural = _('documentos de búsqueda de doctores')
+        ordering = ['-created_at']
+        indexes = [
+            # Keyset de doctor_list: (-created_at, doctor_id)
+            models.Index(fields=['-created_at', 'doctor'], name='doctor_doc_keyset_idx'),
+            # Prefiltro por bounding box de doctor_nearby
+            models.Index(
+                fields=['latitude', 'longitude'],
+                name='doctor_doc_geo_idx',
+                condition=models.Q(latitude__isnull=False, longitude__isnull=False),
+            ),
+            GinIndex(fields=['specialty_ids'], name='doctor_doc_specialty_ids_idx'),
+            GinIndex(fields=['search_vector'], name='doctor_doc_vector_idx'),
+            GinIndex(
+                fields=['search_name'],
+                name='doctor_doc_name_trgm',
+                opclasses=['gin_trgm_ops'],
+            ),
+            GinIndex(
+                fields=['search_specialties'],
+                name='doctor_doc_spec_trgm',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ]
+
+    def __str__(self):
+        return self.full_name
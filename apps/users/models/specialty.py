@@ -1,8 +1,41 @@
 from django.db import models
+from django.db.models.functions import Coalesce, Greatest
 from django.utils.translation import gettext_lazy as _
 import uuid
 
 
+class SpecialtyQuerySet(models.QuerySet):
+    """Mantenimiento del contador desnormalizado active_doctors_count"""
+    
+    def adjust_active_doctors_count(self, delta):
+        """Suma `delta` al contador (nunca baja de 0) en un único UPDATE"""
+        if not delta:
+            return 0
+        return self.update(
+            active_doctors_count=Greatest(models.F('active_doctors_count') + delta, 0)
+        )
+    
+    def recompute_active_doctors_count(self):
+        """
+        Recalcula el contador desde la tabla intermedia.
+        
+        Devuelve la cantidad de especialidades cuyo contador estaba
+        desfasado (y fueron corregidas).
+        """
+        active_links = Specialty.doctors.through.objects.filter(
+            specialty_id=models.OuterRef('pk'),
+            doctor__is_active=True,
+            doctor__deleted_at__isnull=True,
+        ).order_by().values('specialty_id').annotate(
+            total=models.Count('doctor_id')
+        ).values('total')
+        
+        actual = Coalesce(models.Subquery(active_links), 0)
+        return self.annotate(actual=actual).exclude(
+            active_doctors_count=models.F('actual')
+        ).update(active_doctors_count=actual)
+
+
 class Specialty(models.Model):
     """Especialidades médicas"""
     
@@ -17,8 +50,19 @@ class Specialty(models.Model):
         blank=True
     )
     
+    # Desnormalizado: doctores activos y no eliminados con esta especialidad.
+    # Se mantiene desde apps/users/signals.py; `reconcile_specialty_counts`
+    # corrige cualquier desfasaje.
+    active_doctors_count = models.PositiveIntegerField(
+        _('doctores activos'),
+        default=0,
+        editable=False
+    )
+    
     created_at = models.DateTimeField(_('fecha de creación'), auto_now_add=True)
     
+    objects = SpecialtyQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('especialidad')
         verbose_name_plural = _('especialidades')
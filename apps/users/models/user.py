@@ -37,6 +37,11 @@ class User(AbstractUser):
     Custom User model
     """
     
+    class Role(models.TextChoices):
+        NONE = 'none', _('Sin perfil')
+        DOCTOR = 'doctor', _('Doctor')
+        PATIENT = 'patient', _('Paciente')
+    
     # UUID como primary key
     id = models.UUIDField(
         primary_key=True, 
@@ -75,6 +80,16 @@ class User(AbstractUser):
         }
     )
     
+    # Perfil que tiene (desnormalizado): lo mantienen los signals al
+    # crear / borrar el Doctor o Patient (apps/users/signals.py)
+    role = models.CharField(
+        _('rol'),
+        max_length=10,
+        choices=Role.choices,
+        default=Role.NONE,
+        editable=False
+    )
+    
     # Soft delete
     deleted_at = models.DateTimeField(
         _('fecha de eliminación'),
@@ -120,12 +135,12 @@ class User(AbstractUser):
     @property
     def is_doctor(self):
         """Verifica si el usuario es doctor"""
-        return hasattr(self, 'doctor_profile')
+        return self.role == self.Role.DOCTOR
     
     @property
     def is_patient(self):
         """Verifica si el usuario es paciente"""
-        return hasattr(self, 'patient_profile')
+        return self.role == self.Role.PATIENT
     
     def can_create_doctor_profile(self):
         """Verifica si puede crear perfil de doctor"""
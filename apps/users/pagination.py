@@ -0,0 +1,229 @@
+# apps/users/pagination.py
+"""
+Paginación por cursor (keyset) para los listados públicos.
+
+A diferencia de PageNumberPagination, no usa OFFSET ni COUNT(*):
+cada página se pide con un WHERE sobre la última fila vista, así que
+el costo es el mismo en la página 1 que en la página 5.000.
+"""
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from types import SimpleNamespace
+from urllib import parse
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación keyset sobre una tupla de campos de ordenamiento.
+
+    El último campo de `ordering` debe ser único (normalmente el id)
+    para que el orden sea total y no se repitan ni salteen filas.
+    Acepta querysets de modelos o de .values() que incluyan esos campos.
+
+    Se puede ordenar por anotaciones (ej. un ranking) declarándolas en
+    `annotation_fields` junto con la función que decodifica su valor.
+
+    Query params:
+    - cursor: cursor opaco devuelto en `next` / `previous`
+    - page_size: tamaño de página (máximo `max_page_size`)
+    """
+
+    ordering = ('-created_at', 'id')
+    annotation_fields = {}
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self._page_queryset(queryset, request)
+        return self._set_page(list(queryset), position, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Como paginate_queryset, leyendo la página con el ORM async"""
+        queryset, position, reverse = self._page_queryset(queryset, request)
+        return self._set_page([row async for row in queryset], position, reverse)
+
+    def _page_queryset(self, queryset, request):
+        """Queryset de la página pedida (con una fila de más), posición y sentido"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+
+        position, reverse = self.decode_cursor(request, self.model)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        # Pedimos una fila de más para saber si hay otra página
+        return queryset[:self.page_size + 1], position, reverse
+
+    def _set_page(self, results, position, reverse):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ])
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    # ------------------------------------------------------------------
+    # Cursores
+    # ------------------------------------------------------------------
+
+    def encode_cursor(self, obj, reverse):
+        """Arma la URL con el cursor posicionado en `obj`"""
+        payload = {
+            'p': [self._encode_value(obj, field) for field in self.ordering],
+            'r': int(reverse),
+        }
+        raw = json.dumps(payload, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model):
+        """
+        Devuelve (posición, reverse). La posición es None si no se
+        envió cursor (primera página).
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            raw = base64.urlsafe_b64decode(parse.unquote(encoded).encode('ascii'))
+            payload = json.loads(raw)
+            values = payload['p']
+            reverse = bool(payload.get('r', 0))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                self._decode_value(model, field, value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeError,
+                binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _name(field):
+        return field.lstrip('-')
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def _encode_value(self, obj, field):
+        name = self._name(field)
+        if isinstance(obj, dict):
+            # Filas de .values()
+            obj = SimpleNamespace(**obj)
+        if name in self.annotation_fields:
+            return getattr(obj, name)
+        # value_to_string conserva los microsegundos de los DateTimeField
+        return self.model._meta.get_field(name).value_to_string(obj)
+
+    def _decode_value(self, model, field, value):
+        name = self._name(field)
+        if name in self.annotation_fields:
+            return self.annotation_fields[name](value)
+        return model._meta.get_field(name).to_python(value)
+
+    def _after(self, ordering, position):
+        """
+        Condición lexicográfica "fila > posición" según `ordering`.
+
+        Para ('-created_at', 'id'):
+            created_at < c OR (created_at = c AND id > i)
+        """
+        condition = Q()
+        for i, field in enumerate(ordering):
+            name = self._name(field)
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{name}__{lookup}': position[i]})
+            for prev_field, prev_value in zip(ordering[:i], position[:i]):
+                step &= Q(**{self._name(prev_field): prev_value})
+            condition |= step
+        return condition
+
+
+class DoctorCursorPagination(KeysetPagination):
+    """Cursor sobre el directorio de doctores: (-created_at, doctor_id)"""
+
+    ordering = ('-created_at', 'doctor_id')
+
+
+class DoctorSearchPagination(KeysetPagination):
+    """Cursor sobre resultados de búsqueda: (-search_rank, doctor_id)"""
+
+    ordering = ('-search_rank', 'doctor_id')
+    annotation_fields = {'search_rank': float}
@@ -0,0 +1,37 @@
+# apps/users/parsers.py
+"""
+Parser JSON basado en orjson (pareja de apps/users/renderers.py).
+
+orjson rechaza NaN / Infinity, igual que el JSONParser de DRF con
+STRICT_JSON (el default).
+"""
+
+import codecs
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from apps.users.renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser de DRF, parseando con orjson"""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            raw = stream.read()
+            if codecs.lookup(encoding).name != 'utf-8':
+                raw = raw.decode(encoding)
+            return orjson.loads(raw)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,98 @@
+# apps/users/renderers.py
+"""
+Renderer JSON basado en orjson para toda la API.
+
+Produce los mismos bytes que rest_framework.renderers.JSONRenderer con la
+configuración por defecto (UNICODE_JSON, COMPACT_JSON):
+- UUID: orjson lo escribe igual que str(uuid)
+- datetime / date / time, Decimal, lazy strings, etc.: se delegan al
+  encoder de DRF (datetime UTC con 'Z', Decimal como float, ...)
+- \\u2028 y \\u2029 se escapan igual que en DRF
+- floats: orjson escribe 1e16 / 0.00005 donde DRF escribe 1e+16 / 5e-05,
+  y null para NaN / Infinity, que DRF (STRICT_JSON) rechaza con ValueError.
+  Antes de serializar se recorre `data` (_needs_drf) y los Decimal se
+  revisan al convertirlos (_default): si aparece uno de esos floats se usa
+  el renderer de DRF. Las respuestas de la API no los tienen y salen sólo
+  por orjson.
+
+Con indentación (BrowsableAPI, 'application/json; indent=4') o con
+UNICODE_JSON / COMPACT_JSON desactivados se usa el renderer de DRF,
+porque orjson sólo sabe indentar a 2 espacios y no escapa a ASCII.
+"""
+
+import math
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Los tipos de fecha van al encoder de DRF para mantener su formato
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+_drf_default = JSONEncoder().default
+
+
+def _formats_like_drf(number):
+    """orjson y json.dumps escriben igual los floats finitos sin exponente (repr)"""
+    return math.isfinite(number) and (not number or 1e-4 <= abs(number) < 1e16)
+
+
+# Valores que no hay que mirar al buscar floats
+_SCALARS = frozenset({str, int, bool, type(None)})
+
+
+def _needs_drf(data):
+    """
+    True si data tiene algún float que orjson escribiría distinto que DRF.
+
+    Recorre dicts, listas y tuplas sin recursión. Los demás tipos los
+    convierte el encoder de DRF; los Decimal (que pasan a float) se
+    revisan en _default.
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            value = value.values()
+        elif not isinstance(value, (list, tuple)):
+            continue
+        for item in value:
+            cls = type(item)
+            if cls in _SCALARS:
+                continue
+            if cls is float:
+                if not _formats_like_drf(item):
+                    return True
+            else:
+                stack.append(item)
+    return False
+
+
+def _default(obj):
+    value = _drf_default(obj)
+    if type(value) is float and not _formats_like_drf(value):
+        # orjson lo convierte en JSONEncodeError: render() usa DRF
+        raise TypeError('float que orjson escribe distinto que DRF')
+    return value
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer de DRF, serializando con orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is not None or self.ensure_ascii or not self.compact or _needs_drf(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Tipos que orjson no acepta (ej. enteros de más de 64 bits) o
+            # un Decimal que se convierte en un float con exponente
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
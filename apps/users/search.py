@@ -0,0 +1,106 @@
+# apps/users/search.py
+"""
+Búsqueda de doctores con full-text (tsvector) + trigramas (pg_trgm).
+
+Cada DoctorSearchDocument (read model, ver apps/users/directory.py)
+guarda tres columnas de búsqueda:
+- search_name: nombre completo normalizado (índice GIN trigram)
+- search_specialties: nombres de especialidades normalizados (índice GIN trigram)
+- search_vector: tsvector ponderado (índice GIN)
+    A = nombre, B = especialidades, C = universidad, D = biografía
+
+La normalización (minúsculas y sin acentos) se hace en Python tanto al
+indexar como al buscar, así "cardiologia" encuentra "Cardiología" sin
+depender de la extensión unaccent.
+"""
+
+import re
+import unicodedata
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import Cast
+
+SEARCH_CONFIG = 'spanish'
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Minúsculas, sin acentos y con espacios colapsados"""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.lower().split())
+
+
+def build_search_values(first_name, last_name, university, bio, specialty_names):
+    """
+    Valores de las columnas de búsqueda a partir de datos planos.
+
+    Devuelve (search_name, search_specialties, search_vector), donde
+    search_vector es una expresión para asignar en save()/bulk_update().
+    """
+    name = normalize(f'{first_name} {last_name}')
+    specialties = normalize(' '.join(sorted(specialty_names)))
+
+    vector = (
+        SearchVector(Value(name), config=SEARCH_CONFIG, weight='A')
+        + SearchVector(Value(specialties), config=SEARCH_CONFIG, weight='B')
+        + SearchVector(Value(normalize(university)), config=SEARCH_CONFIG, weight='C')
+        + SearchVector(Value(normalize(bio)), config=SEARCH_CONFIG, weight='D')
+    )
+    return name, specialties, vector
+
+
+def _prefix_query(term):
+    """tsquery con prefijo por palabra: 'card gonz' -> 'card:* & gonz:*'"""
+    tokens = _TOKEN_RE.findall(normalize(term))
+    if not tokens:
+        return None
+    return SearchQuery(
+        ' & '.join(f'{token}:*' for token in tokens),
+        config=SEARCH_CONFIG,
+        search_type='raw',
+    )
+
+
+def search_doctors(queryset, term):
+    """
+    Filtra por `term` y anota `search_rank` (mayor = más relevante).
+
+    Coincide por full-text (con prefijo) sobre nombre, especialidades,
+    universidad y biografía, o por similitud de trigramas sobre el
+    nombre para tolerar errores de tipeo.
+    """
+    name = normalize(term)
+    query = _prefix_query(term)
+    if query is None:
+        # Con search_rank igual: la paginación por relevancia ordena por él
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+
+    return queryset.filter(
+        Q(search_vector=query) | Q(search_name__trigram_word_similar=name)
+    ).annotate(
+        # double precision: el valor viaja exacto en los cursores de paginación
+        search_rank=Cast(
+            SearchRank('search_vector', query) + TrigramWordSimilarity(name, 'search_name'),
+            FloatField(),
+        )
+    )
+
+
+def filter_by_specialty(queryset, specialty):
+    """
+    Filtra por nombre de especialidad (parcial, sin acentos).
+
+    Usa la columna desnormalizada search_specialties (LIKE servido por
+    el índice trigram), sin JOIN a la tabla intermedia ni distinct().
+    """
+    return queryset.filter(search_specialties__contains=normalize(specialty))
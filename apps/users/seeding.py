@@ -0,0 +1,423 @@
+# apps/users/seeding.py
+"""
+Dataset sintético y determinístico para benchmarks, tests de carga y
+pruebas a escala (manage.py seed_scale).
+
+seed_dataset() genera usuarios, doctores, pacientes y especialidades con
+un random.Random(seed): la misma semilla y los mismos tamaños dan
+siempre los mismos ids, emails y vínculos, así los resultados se pueden
+comparar entre commits.
+
+Los datos imitan a los de producción: nombres y teléfonos argentinos,
+doctores repartidos por las ciudades de todas las provincias (en
+proporción a su población) con matrícula nacional o provincial y
+universidad, pacientes con DNI, fecha de nacimiento y obra social o
+prepaga, y especialidades con la distribución despareja de la realidad
+(muchos clínicos y pediatras, pocos genetistas).
+
+Como el importador (apps/users/importer.py), inserta con bulk_create
+por lotes y sin signals; al final reconstruye el read model y los
+contadores de especialidades e invalida el cache. Todos los usuarios
+comparten un único password, hasheado una sola vez.
+"""
+
+import datetime
+import itertools
+import random
+import unicodedata
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+
+from apps.users.cache import bump_on_commit
+from apps.users.directory import refresh_directory
+from apps.users.models import Doctor, Patient, Specialty, User
+
+# Password de todos los usuarios generados
+SEED_PASSWORD = 'seed-password-123'
+
+# Dominio reservado: los emails generados nunca llegan a nadie
+SEED_EMAIL_DOMAIN = 'seed.example.com'
+
+# Fecha de referencia para las edades (no date.today(): el dataset no cambia con el día)
+REFERENCE_DATE = datetime.date(2025, 1, 1)
+
+FIRST_NAMES = (
+    'Juan', 'María', 'Carlos', 'Ana', 'Luis', 'Laura', 'Jorge', 'Lucía', 'Diego', 'Sofía',
+    'Martín', 'Valentina', 'Pablo', 'Camila', 'Federico', 'Florencia', 'Santiago', 'Julieta',
+    'Mateo', 'Micaela', 'Nicolás', 'Agustina', 'Facundo', 'Carolina', 'Gonzalo', 'Romina',
+    'Matías', 'Paula', 'Alejandro', 'Silvia', 'Ricardo', 'Mónica', 'Sergio', 'Graciela',
+    'Hernán', 'Natalia', 'Ezequiel', 'Victoria', 'Tomás', 'Milagros', 'Bautista', 'Delfina',
+)
+# En orden de frecuencia (se eligen con peso decreciente)
+LAST_NAMES = (
+    'González', 'Rodríguez', 'Gómez', 'Fernández', 'López', 'Díaz', 'Martínez', 'Pérez',
+    'García', 'Sánchez', 'Romero', 'Sosa', 'Álvarez', 'Torres', 'Ruiz', 'Ramírez',
+    'Flores', 'Benítez', 'Acosta', 'Medina', 'Herrera', 'Suárez', 'Aguirre', 'Giménez',
+    'Gutiérrez', 'Pereyra', 'Rojas', 'Molina', 'Castro', 'Ortiz', 'Silva', 'Núñez',
+    'Luna', 'Juárez', 'Cabrera', 'Ríos', 'Ferreyra', 'Godoy', 'Morales', 'Domínguez',
+    'Moreno', 'Peralta', 'Vega', 'Carrizo', 'Quiroga', 'Castillo', 'Ledesma', 'Muñoz',
+)
+# En orden de frecuencia (la especialidad principal se elige con peso decreciente)
+SPECIALTY_NAMES = (
+    'Clínica Médica', 'Pediatría', 'Ginecología', 'Cardiología', 'Traumatología',
+    'Medicina Familiar', 'Dermatología', 'Oftalmología', 'Psiquiatría', 'Cirugía General',
+    'Gastroenterología', 'Neurología', 'Endocrinología', 'Urología', 'Otorrinolaringología',
+    'Neumonología', 'Nefrología', 'Reumatología', 'Oncología', 'Hematología', 'Infectología',
+    'Obstetricia', 'Anestesiología', 'Diagnóstico por Imágenes', 'Terapia Intensiva', 'Geriatría', 'Nutrición', 'Alergia e Inmunología', 'Neonatología',
+    'Cirugía Plástica', 'Neurocirugía', 'Cirugía Cardiovascular', 'Mastología',
+    'Coloproctología', 'Medicina del Deporte', 'Medicina Laboral', 'Flebología',
+    'Cirugía Pediátrica', 'Cardiología Infantil', 'Medicina Nuclear', 'Radioterapia',
+    'Genética Médica', 'Toxicología',
+)
+
+# (ciudad, código de provincia ISO 3166-2:AR, latitud, longitud,
+#  característica telefónica, universidad local con Medicina o None, peso)
+# Peso: población aproximada en miles; el conurbano va por zonas.
+CITIES = (
+    ('Ciudad Autónoma de Buenos Aires', 'C', -34.6037, -58.3816, '11', 'Universidad de Buenos Aires', 3100),
+    ('San Isidro', 'B', -34.4708, -58.5286, '11', 'Universidad de Buenos Aires', 1500),
+    ('Lomas de Zamora', 'B', -34.7606, -58.4063, '11', 'Universidad de Buenos Aires', 1800),
+    ('Morón', 'B', -34.6534, -58.6198, '11', 'Universidad Nacional de La Matanza', 1700),
+    ('La Plata', 'B', -34.9214, -57.9545, '221', 'Universidad Nacional de La Plata', 900),
+    ('Mar del Plata', 'B', -38.0055, -57.5426, '223', 'Universidad Nacional de La Plata', 650),
+    ('Bahía Blanca', 'B', -38.7183, -62.2663, '291', 'Universidad Nacional del Sur', 310),
+    ('Córdoba', 'X', -31.4201, -64.1888, '351', 'Universidad Nacional de Córdoba', 1500),
+    ('Río Cuarto', 'X', -33.1232, -64.3493, '358', 'Universidad Nacional de Córdoba', 160),
+    ('Rosario', 'S', -32.9442, -60.6505, '341', 'Universidad Nacional de Rosario', 1300),
+    ('Santa Fe', 'S', -31.6333, -60.7000, '342', 'Universidad Nacional del Litoral', 500),
+    ('Mendoza', 'M', -32.8895, -68.8458, '261', 'Universidad Nacional de Cuyo', 1000),
+    ('San Miguel de Tucumán', 'T', -26.8083, -65.2176, '381', 'Universidad Nacional de Tucumán', 900),
+    ('Salta', 'A', -24.7821, -65.4232, '387', None, 620),
+    ('San Salvador de Jujuy', 'Y', -24.1858, -65.2995, '388', None, 330),
+    ('Resistencia', 'H', -27.4606, -58.9839, '362', 'Universidad Nacional del Nordeste', 400),
+    ('Corrientes', 'W', -27.4692, -58.8306, '379', 'Universidad Nacional del Nordeste', 380),
+    ('Posadas', 'N', -27.3671, -55.8961, '376', None, 360),
+    ('Paraná', 'E', -31.7319, -60.5238, '343', None, 270),
+    ('Santiago del Estero', 'G', -27.7951, -64.2615, '385', None, 270),
+    ('San Fernando del Valle de Catamarca', 'K', -28.4696, -65.7852, '383', None, 160),
+    ('La Rioja', 'F', -29.4131, -66.8558, '380', None, 180),
+    ('San Juan', 'J', -31.5375, -68.5364, '264', None, 470),
+    ('San Luis', 'D', -33.2950, -66.3356, '266', None, 200),
+    ('Santa Rosa', 'L', -36.6167, -64.2833, '2954', None, 110),
+    ('Neuquén', 'Q', -38.9516, -68.0591, '299', 'Universidad Nacional del Comahue', 340),
+    ('San Carlos de Bariloche', 'R', -41.1335, -71.3103, '294', 'Universidad Nacional del Comahue', 130),
+    ('Viedma', 'R', -40.8135, -62.9967, '2920', None, 60),
+    ('Comodoro Rivadavia', 'U', -45.8641, -67.4966, '297', None, 180),
+    ('Río Gallegos', 'Z', -51.6230, -69.2168, '2966', None, 100),
+    ('Ushuaia', 'V', -54.8019, -68.3030, '2901', None, 80),
+    ('Formosa', 'P', -26.1775, -58.1781, '370', None, 230),
+)
+
+# Facultades de Medicina, con peso por cantidad de egresados
+UNIVERSITIES = (
+    ('Universidad de Buenos Aires', 30),
+    ('Universidad Nacional de Córdoba', 12),
+    ('Universidad Nacional de La Plata', 10),
+    ('Universidad Nacional de Rosario', 9),
+    ('Universidad Nacional de Tucumán', 6),
+    ('Universidad Nacional de Cuyo', 4),
+    ('Universidad Nacional del Nordeste', 5),
+    ('Universidad Nacional del Litoral', 3),
+    ('Universidad Nacional de La Matanza', 2),
+    ('Universidad Nacional del Sur', 1),
+    ('Universidad Nacional del Comahue', 1),
+    ('Universidad del Salvador', 3),
+    ('Pontificia Universidad Católica Argentina', 2),
+    ('Universidad Austral', 2),
+    ('Instituto Universitario del Hospital Italiano', 2),
+    ('Universidad Favaloro', 1),
+    ('Universidad Maimónides', 2),
+    ('Universidad Abierta Interamericana', 3),
+)
+
+STREETS = (
+    'Av. San Martín', 'Belgrano', 'Av. Rivadavia', 'Sarmiento', 'Mitre', 'Av. 9 de Julio',
+    'Moreno', 'Güemes', 'Urquiza', 'Av. Colón', 'Italia', 'Entre Ríos', 'Av. Independencia',
+    'Lavalle', 'Tucumán', 'Córdoba', 'Av. Pellegrini', 'Alem', 'Dorrego', 'Las Heras',
+)
+
+# (obra social / prepaga, planes, peso)
+INSURANCE_PROVIDERS = (
+    ('OSDE', ('210', '310', '410', '450', '510'), 18),
+    ('Swiss Medical', ('SMG20', 'SMG30', 'SMG40', 'SMG50'), 10),
+    ('Galeno', ('Azul 220', 'Plata 330', 'Oro 550'), 6),
+    ('Medifé', ('Bronce', 'Plata', 'Oro', 'Platinum'), 6),
+    ('Sancor Salud', ('1000', '2000', '3000', '4000'), 5),
+    ('Omint', ('Clásico', 'Global', 'Premium'), 3),
+    ('OSECAC', ('PMO',), 12),
+    ('Unión Personal', ('Classic', 'Accord 210', 'Accord 310'), 6),
+    ('IOMA', ('Único',), 10),
+    ('OSPRERA', ('PMO',), 4),
+    ('OSDEPYM', ('Bronce', 'Plata', 'Oro'), 4),
+    ('Accord Salud', ('110', '210', '310'), 4),
+)
+# Mayores de 65: PAMI casi siempre
+PAMI = 'PAMI'
+UNINSURED_RATE = 0.15
+INACTIVE_DOCTOR_RATE = 0.04
+
+
+def _ascii(text):
+    """'Núñez' -> 'nunez' (para emails)"""
+    normalized = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return normalized.lower().replace(' ', '')
+
+
+def _cum_weights(weights):
+    return list(itertools.accumulate(weights))
+
+
+def _decreasing(count):
+    """Pesos 1, 1/2, 1/3, ...: los primeros de la lista son los más comunes"""
+    return _cum_weights(1 / (rank + 1) for rank in range(count))
+
+
+def seed_username(index):
+    return f'user{index}'
+
+
+@dataclass
+class SeedResult:
+    users: int
+    doctors: int
+    patients: int
+    specialties: int
+    links: int
+
+
+def _init_worker():
+    # Con 'spawn' los workers arrancan sin Django configurado
+    if not apps.ready:
+        django.setup()
+    # Con DEBUG, connection.queries guarda (y re-renderiza) cada INSERT de varios MB
+    settings.DEBUG = False
+
+
+class DatasetSeeder:
+    """
+    Genera el dataset por lotes de batch_size usuarios.
+
+    Los doctores son los primeros `doctors` usuarios y los pacientes los
+    siguientes `patients`; el resto queda sin perfil. Los doctores se
+    vinculan con las especialidades nuevas y con las que ya existían.
+
+    Cada usuario sale de su propio random.Random(seed, índice): el
+    resultado no depende de batch_size ni de workers.
+
+    first_user / first_specialty: primer índice (emails, matrículas, DNI,
+    nombres de especialidades), para agregar datos a un dataset existente.
+    workers: procesos que generan e insertan lotes en paralelo, cada uno
+    con su conexión y su transacción (0 = en el proceso actual, dentro
+    de la transacción del llamador).
+    """
+
+    def __init__(self, seed=42, batch_size=5000, password=SEED_PASSWORD, workers=0):
+        self.seed = seed
+        self.rng = None
+        self.batch_size = batch_size
+        self.workers = workers
+        self.password = make_password(password)
+        self.ascii_names = {name: _ascii(name) for name in FIRST_NAMES + LAST_NAMES}
+        self.last_name_weights = _decreasing(len(LAST_NAMES))
+        self.city_weights = _cum_weights(city[-1] for city in CITIES)
+        self.university_weights = _cum_weights(weight for _, weight in UNIVERSITIES)
+        self.insurance_weights = _cum_weights(weight for *_, weight in INSURANCE_PROVIDERS)
+
+    def reseed(self, kind, index):
+        """Random propio de cada fila: ('user', 17) genera siempre el mismo usuario"""
+        self.rng = random.Random(f'{self.seed}:{kind}:{index}')
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def specialties(self, count, first=0):
+        specialties = []
+        for index in range(first, first + count):
+            self.reseed('specialty', index)
+            # Más de las conocidas: "Cardiología 2", "Cardiología 3", ...
+            name = SPECIALTY_NAMES[index % len(SPECIALTY_NAMES)]
+            round_ = index // len(SPECIALTY_NAMES)
+            if round_:
+                name = f'{name} {round_ + 1}'
+            specialties.append(Specialty(id=self.uuid(), name=name))
+        return specialties
+
+    def city(self):
+        """Ciudad de CITIES, con probabilidad proporcional a su población"""
+        return self.rng.choices(CITIES, cum_weights=self.city_weights)[0]
+
+    def user(self, index, role, city):
+        rng = self.rng
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choices(LAST_NAMES, cum_weights=self.last_name_weights)[0]
+        # Característica + número: 10 dígitos en total
+        area_code = city[4]
+        local = rng.randrange(10 ** (9 - len(area_code)), 10 ** (10 - len(area_code)))
+        return User(
+            id=self.uuid(),
+            email=(
+                f'{self.ascii_names[first_name]}.{self.ascii_names[last_name]}{index}'
+                f'@{SEED_EMAIL_DOMAIN}'
+            ),
+            username=seed_username(index),
+            first_name=first_name,
+            last_name=last_name,
+            phone=f'+549{area_code}{local}',
+            password=self.password,
+            role=role,
+        )
+
+    def doctor(self, index, user, city):
+        rng = self.rng
+        city, province, latitude, longitude, _, local_university, _ = city
+        if local_university and rng.random() < 0.65:
+            university = local_university
+        else:
+            university = rng.choices(UNIVERSITIES, cum_weights=self.university_weights)[0][0]
+        # Matrícula nacional en CABA, provincial en el resto
+        if province == 'C':
+            license_number = f'MN-{index:07d}'
+        else:
+            license_number = f'MP-{province}-{index:07d}'
+        return Doctor(
+            id=self.uuid(),
+            user=user,
+            license_number=license_number,
+            university=university,
+            bio=f'Formación: {university}. Atiende en consultorio desde {rng.randint(1985, 2024)}.',
+            address=f'{rng.choice(STREETS)} {rng.randint(1, 3000)}, {city}',
+            # ~5 km alrededor del centro de la ciudad
+            latitude=round(latitude + rng.gauss(0, 0.045), 6),
+            longitude=round(longitude + rng.gauss(0, 0.045), 6),
+            is_active=rng.random() >= INACTIVE_DOCTOR_RATE,
+        )
+
+    def patient(self, index, user):
+        rng = self.rng
+        age = rng.triangular(0, 95, 35)
+        birth_date = REFERENCE_DATE - datetime.timedelta(days=int(age * 365.25))
+        provider = plan = number = ''
+        if age >= 65 and rng.random() < 0.8:
+            provider, plan = PAMI, 'Único'
+        elif rng.random() >= UNINSURED_RATE:
+            provider, plans, _ = rng.choices(INSURANCE_PROVIDERS, cum_weights=self.insurance_weights)[0]
+            plan = rng.choice(plans)
+        if provider:
+            number = f'{rng.randrange(10 ** 10, 10 ** 11)}'
+        return Patient(
+            id=self.uuid(),
+            user=user,
+            dni=f'{20_000_000 + index}',
+            birth_date=birth_date,
+            insurance_provider=provider,
+            insurance_plan=plan,
+            insurance_number=number,
+        )
+
+    def doctor_specialties(self, specialty_ids, weights):
+        """Una especialidad principal (las comunes más seguido) y hasta dos más"""
+        chosen = {self.rng.choices(specialty_ids, cum_weights=weights)[0]}
+        for _ in range(self.rng.choice((0, 0, 1, 1, 2))):
+            chosen.add(self.rng.choice(specialty_ids))
+        return sorted(chosen)
+
+    def batch(self, start, stop, plan):
+        """Genera e inserta los usuarios [start, stop); devuelve la cantidad de vínculos"""
+        first_user, doctors, patients, specialty_ids, specialty_weights = plan
+        Link = Specialty.doctors.through
+        batch_users, batch_doctors, batch_patients, batch_links = [], [], [], []
+        for index in range(start, stop):
+            self.reseed('user', index)
+            position = index - first_user
+            if position < doctors:
+                role = User.Role.DOCTOR
+            elif position < doctors + patients:
+                role = User.Role.PATIENT
+            else:
+                role = User.Role.NONE
+            city = self.city()
+            user = self.user(index, role, city)
+            batch_users.append(user)
+
+            if role == User.Role.DOCTOR:
+                doctor = self.doctor(index, user, city)
+                batch_doctors.append(doctor)
+                if specialty_ids:
+                    batch_links.extend(
+                        Link(doctor_id=doctor.pk, specialty_id=pk)
+                        for pk in self.doctor_specialties(specialty_ids, specialty_weights)
+                    )
+            elif role == User.Role.PATIENT:
+                batch_patients.append(self.patient(index, user))
+
+        with transaction.atomic():
+            User.objects.bulk_create(batch_users)
+            Doctor.objects.bulk_create(batch_doctors)
+            Patient.objects.bulk_create(batch_patients)
+            Link.objects.bulk_create(batch_links)
+        return len(batch_links)
+
+    def run(self, users, doctors, patients, specialties, first_user=0, first_specialty=0, progress=None):
+        """progress: callable(usuarios creados, total), después de cada lote"""
+        if doctors + patients > users:
+            raise ValueError('doctors + patients no puede superar a users')
+
+        Specialty.objects.bulk_create(self.specialties(specialties, first_specialty), batch_size=self.batch_size)
+        # En el orden de SPECIALTY_NAMES (por frecuencia), con los nombres repetidos al final
+        specialty_ids = [
+            pk for pk, _ in sorted(
+                Specialty.objects.values_list('pk', 'name'),
+                key=lambda item: (
+                    SPECIALTY_NAMES.index(item[1]) if item[1] in SPECIALTY_NAMES else len(SPECIALTY_NAMES),
+                    item[1],
+                ),
+            )
+        ]
+        plan = (first_user, doctors, patients, specialty_ids, _decreasing(len(specialty_ids)))
+
+        end = first_user + users
+        ranges = [(start, min(start + self.batch_size, end)) for start in range(first_user, end, self.batch_size)]
+        links = done = 0
+        if self.workers:
+            # Los workers no pueden heredar la conexión abierta del proceso padre
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool:
+                futures = {pool.submit(self.batch, start, stop, plan): stop - start for start, stop in ranges}
+                for future in as_completed(futures):
+                    links += future.result()
+                    done += futures[future]
+                    if progress:
+                        progress(done, users)
+        else:
+            for start, stop in ranges:
+                links += self.batch(start, stop, plan)
+                done += stop - start
+                if progress:
+                    progress(done, users)
+
+        # bulk_create no dispara signals (ver apps/users/signals.py)
+        with transaction.atomic():
+            refresh_directory(batch_size=self.batch_size)
+            Specialty.objects.recompute_active_doctors_count()
+            bump_on_commit('doctors', 'specialties')
+
+        return SeedResult(users, doctors, patients, specialties, links)
+
+
+def seed_dataset(users, doctors, specialties, patients=None, seed=42, batch_size=5000,
+                 first_user=0, first_specialty=0, progress=None, workers=0):
+    """
+    Genera el dataset. patients=None: todos los usuarios que no son doctores.
+    """
+    if patients is None:
+        patients = users - doctors
+    return DatasetSeeder(seed, batch_size, workers=workers).run(
+        users, doctors, patients, specialties, first_user, first_specialty, progress
+    )
@@ -1,17 +1,26 @@
 # apps/users/serializers/__init__.py
 
+from .fieldsets import SparseFieldsetMixin, wants_fieldset
 from .user import UserSerializer, UserCreateSerializer
 from .auth import RegisterSerializer, LoginSerializer
-from .doctor import DoctorSerializer, DoctorCreateSerializer, DoctorUpdateSerializer
+from .doctor import (
+    DoctorSerializer,
+    DoctorCardSerializer,
+    DoctorCreateSerializer,
+    DoctorUpdateSerializer,
+)
 from .patient import PatientSerializer, PatientCreateSerializer, PatientUpdateSerializer
 from .specialty import SpecialtySerializer
 
 __all__ = [
+    'SparseFieldsetMixin',
+    'wants_fieldset',
     'UserSerializer',
     'UserCreateSerializer',
     'RegisterSerializer',
     'LoginSerializer',
     'DoctorSerializer',
+    'DoctorCardSerializer',
     'DoctorCreateSerializer',
     'DoctorUpdateSerializer',
     'PatientSerializer',
@@ -7,9 +7,10 @@ LoginSerializer: Validar credenciales y devolver tokens
 
 from rest_framework import serializers
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from apps.users import hashing
 from apps.users.models import User
+from apps.users.tokens import RefreshToken
 
 
 class RegisterSerializer(serializers.Serializer):
@@ -80,8 +81,12 @@ class RegisterSerializer(serializers.Serializer):
         validated_data.pop('password_confirm')
         account_type = validated_data.pop('account_type')
         
-        # Crear usuario
-        user = User.objects.create_user(**validated_data)
+        # Crear usuario (el password se hashea en el pool de apps/users/hashing.py)
+        password = validated_data.pop('password')
+        validated_data['email'] = User.objects.normalize_email(validated_data['email'])
+        user = User(**validated_data)
+        user.password = hashing.make_password(password)
+        user.save()
         
         # Generar tokens JWT
         refresh = RefreshToken.for_user(user)
@@ -128,8 +133,8 @@ class LoginSerializer(serializers.Serializer):
                 'email': 'Esta cuenta está desactivada.'
             })
         
-        # Verificar password
-        if not user.check_password(password):
+        # Verificar password (en el pool acotado; 503 si está saturado)
+        if not hashing.check_password(user, password):
             raise serializers.ValidationError({
                 'password': 'Contraseña incorrecta.'
             })
@@ -2,15 +2,18 @@
 Serializers para el modelo Doctor.
 
 DoctorSerializer: Ver perfil de doctor
+DoctorCardSerializer: Tarjeta compacta para listados
 DoctorCreateSerializer: Crear perfil de doctor
 """
 
+from django.db.models import Prefetch
 from rest_framework import serializers
 from apps.users.models import Doctor, Specialty
+from .fieldsets import SparseFieldsetMixin
 from .user import UserSerializer
 
 
-class DoctorSerializer(serializers.ModelSerializer):
+class DoctorSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer para VER perfil de doctor.
     
@@ -18,6 +21,9 @@ class DoctorSerializer(serializers.ModelSerializer):
     - Datos del doctor
     - Datos del usuario (anidado)
     - Lista de especialidades
+    
+    Soporta ?fields= / ?expand= (ver fieldsets.py) cuando recibe el request
+    en el context; setup_queryset() carga sólo lo pedido.
     """
     
     # Anidamos los datos del usuario
@@ -44,15 +50,60 @@ class DoctorSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        expandable_fields = ['user']
+        field_prefetches = {
+            'specialties': Prefetch('specialties', queryset=Specialty.objects.only('id', 'name')),
+        }
     
     def get_specialties(self, obj):
-        """Devuelve lista de especialidades con id y nombre"""
+        """
+        Devuelve lista de especialidades con id y nombre.
+        
+        Con Doctor.objects.for_listing() o setup_queryset() lee el
+        prefetch, así que no genera una query por doctor.
+        """
         return [
             {'id': str(s.id), 'name': s.name}
             for s in obj.specialties.all()
         ]
 
 
+class DoctorCardSerializer(serializers.BaseSerializer):
+    """
+    Tarjeta compacta de doctor para LISTADOS.
+    
+    Sólo lo que muestra un listado: nombre, foto, dirección y
+    especialidades. Se arma desde filas de
+    DoctorSearchDocument.objects.values(*DoctorCardSerializer.source_fields),
+    sin instanciar modelos ni pasar por el to_representation campo por
+    campo de ModelSerializer.
+    
+    Los UUID quedan como objetos: el renderer los escribe igual que str().
+    """
+    
+    # Columnas del read model que necesita to_representation
+    source_fields = (
+        'doctor_id',
+        'full_name',
+        'image_url',
+        'address',
+        'specialty_ids',
+        'specialty_names',
+    )
+    
+    def to_representation(self, row):
+        return {
+            'id': row['doctor_id'],
+            'full_name': row['full_name'],
+            'image_url': row['image_url'],
+            'address': row['address'],
+            'specialties': [
+                {'id': specialty_id, 'name': name}
+                for specialty_id, name in zip(row['specialty_ids'], row['specialty_names'])
+            ],
+        }
+
+
 class DoctorCreateSerializer(serializers.ModelSerializer):
     """
     Serializer para CREAR perfil de doctor.
@@ -110,11 +161,9 @@ class DoctorCreateSerializer(serializers.ModelSerializer):
         # Crear doctor
         doctor = Doctor.objects.create(user=user, **validated_data)
         
-        # Asignar especialidades
+        # Asignar especialidades (un único INSERT en la tabla intermedia)
         if specialty_ids:
-            specialties = Specialty.objects.filter(id__in=specialty_ids)
-            for specialty in specialties:
-                specialty.doctors.add(doctor)
+            doctor.set_specialties(specialty_ids)
         
         return doctor
 
@@ -154,15 +203,8 @@ class DoctorUpdateSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
         
-        # Actualizar especialidades si se enviaron
+        # Actualizar especialidades si se enviaron: sólo se tocan las que cambian
         if specialty_ids is not None:
-            # Quitar de todas las especialidades actuales
-            for specialty in instance.specialties.all():
-                specialty.doctors.remove(instance)
-            
-            # Agregar a las nuevas especialidades
-            specialties = Specialty.objects.filter(id__in=specialty_ids)
-            for specialty in specialties:
-                specialty.doctors.add(instance)
+            instance.set_specialties(specialty_ids)
         
         return instance
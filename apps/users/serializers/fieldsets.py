@@ -0,0 +1,160 @@
+# apps/users/serializers/fieldsets.py
+"""
+Campos a pedido para los serializers de lectura (?fields= / ?expand=).
+
+    ?fields=id,bio,user          sólo esos campos; `user` sale como id
+    ?fields=id,user.full_name    sub-campos de una relación anidada
+    ?expand=user                 la relación anidada completa
+
+Sin parámetros se devuelve la representación completa de siempre.
+
+Además de recortar la respuesta, setup_queryset() arma el only() /
+select_related() / prefetch_related() justo para esos campos: las
+columnas, JOINs y prefetches que nadie pidió no se leen.
+"""
+
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def _split(value):
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+
+def _group(paths):
+    """['id', 'user.full_name', 'user.email'] -> {'id': [], 'user': ['full_name', 'email']}"""
+    grouped = {}
+    for path in paths:
+        name, _, rest = path.partition('.')
+        grouped.setdefault(name, [])
+        if rest:
+            grouped[name].append(rest)
+    return grouped
+
+
+def wants_fieldset(request):
+    """True si el request pide campos a medida"""
+    return FIELDS_PARAM in request.query_params or EXPAND_PARAM in request.query_params
+
+
+class SparseFieldsetMixin:
+    """
+    Mixin para ModelSerializer de lectura.
+
+    El serializer raíz lee ?fields= / ?expand= del request del context;
+    también se pueden pasar explícitos: Serializer(obj, fields=[...], expand=[...]).
+
+    Opciones en Meta:
+    - expandable_fields: serializers anidados; si no se expanden se
+      devuelven como id (la columna FK, sin JOIN)
+    - field_sources: rutas del ORM que necesita cada campo que no es una
+      columna con su mismo nombre (propiedades, SerializerMethodField)
+    - field_prefetches: Prefetch que necesita cada campo
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._requested_fields = fields
+        self._requested_expand = expand
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fieldset(self):
+        """(campos, expand); campos es None para la representación completa"""
+        fields, expand = self._requested_fields, self._requested_expand
+        if fields is None and expand is None and self._is_root():
+            request = self.context.get('request')
+            if request is not None:
+                fields = _split(request.query_params.get(FIELDS_PARAM)) or None
+                expand = _split(request.query_params.get(EXPAND_PARAM))
+        return fields, expand or []
+
+    def get_fields(self):
+        all_fields = super().get_fields()
+        fields, expand = self.get_fieldset()
+        if fields is None and not expand:
+            return all_fields
+
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+        selected = _group(fields) if fields is not None else {name: [] for name in all_fields}
+        expanded = _group(expand)
+
+        unknown = [name for name in [*selected, *expanded] if name not in all_fields]
+        if unknown:
+            raise ValidationError({'error': f'Campos desconocidos: {", ".join(unknown)}'})
+        not_expandable = [
+            name for name in [*expanded, *(n for n, sub in selected.items() if sub)]
+            if name not in expandable
+        ]
+        if not_expandable:
+            raise ValidationError({'error': f'Campos no expandibles: {", ".join(not_expandable)}'})
+
+        result = {}
+        for name, field in all_fields.items():
+            if name not in selected and name not in expanded:
+                continue
+            if name in expandable:
+                if fields is not None and name not in expanded and not selected[name]:
+                    # Sin expandir: sólo el id, leído de la columna FK
+                    source = field.source or name
+                    field = serializers.PrimaryKeyRelatedField(
+                        read_only=True,
+                        **({'source': source} if source != name else {})
+                    )
+                else:
+                    field._requested_fields = selected.get(name) or None
+                    field._requested_expand = expanded.get(name) or []
+            result[name] = field
+        return result
+
+    def get_queryset_plan(self, prefix=''):
+        """(only, select_related, prefetch_related) para los campos actuales"""
+        model = self.Meta.model
+        sources = getattr(self.Meta, 'field_sources', {})
+        prefetches = getattr(self.Meta, 'field_prefetches', {})
+
+        only = [prefix + model._meta.pk.name]
+        related = []
+        prefetch = []
+        for name, field in self.fields.items():
+            if isinstance(field, SparseFieldsetMixin):
+                path = prefix + field.source.replace('.', '__')
+                related.append(path)
+                nested_only, nested_related, nested_prefetch = field.get_queryset_plan(path + '__')
+                only += nested_only
+                related += nested_related
+                prefetch += nested_prefetch
+            elif name in prefetches:
+                lookup = prefetches[name]
+                prefetch.append(Prefetch(
+                    prefix + lookup.prefetch_through,
+                    queryset=lookup.queryset,
+                    to_attr=lookup.to_attr,
+                ))
+            else:
+                for source in sources.get(name, (field.source,)):
+                    if source == '*':
+                        continue
+                    source = source.replace('.', '__')
+                    if '__' in source:
+                        related.append(prefix + source.rsplit('__', 1)[0])
+                    only.append(prefix + source)
+        return only, related, prefetch
+
+    def setup_queryset(self, queryset):
+        """Limita el queryset a las columnas, JOINs y prefetches de los campos pedidos"""
+        only, related, prefetch = self.get_queryset_plan()
+        queryset = queryset.only(*only)
+        if related:
+            queryset = queryset.select_related(*related)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
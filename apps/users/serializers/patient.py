@@ -7,10 +7,11 @@ PatientCreateSerializer: Crear perfil de paciente
 
 from rest_framework import serializers
 from apps.users.models import Patient
+from .fieldsets import SparseFieldsetMixin
 from .user import UserSerializer
 
 
-class PatientSerializer(serializers.ModelSerializer):
+class PatientSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer para VER perfil de paciente.
     
@@ -42,6 +43,10 @@ class PatientSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        expandable_fields = ['user']
+        field_sources = {
+            'age': ('birth_date',),
+        }
 
 
 class PatientCreateSerializer(serializers.ModelSerializer):
@@ -4,9 +4,10 @@ Serializer para el modelo Specialty.
 
 from rest_framework import serializers
 from apps.users.models import Specialty
+from .fieldsets import SparseFieldsetMixin
 
 
-class SpecialtySerializer(serializers.ModelSerializer):
+class SpecialtySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer para especialidades médicas.
     
@@ -15,8 +16,11 @@ class SpecialtySerializer(serializers.ModelSerializer):
     - Mostrar detalles de una especialidad
     """
     
-    # Cantidad de doctores con esta especialidad
-    doctors_count = serializers.SerializerMethodField()
+    # Cantidad de doctores activos (contador desnormalizado, sin COUNT por fila)
+    doctors_count = serializers.IntegerField(
+        source='active_doctors_count',
+        read_only=True
+    )
     
     class Meta:
         model = Specialty
@@ -28,7 +32,3 @@ class SpecialtySerializer(serializers.ModelSerializer):
             'created_at',
         ]
         read_only_fields = ['id', 'created_at']
-    
-    def get_doctors_count(self, obj):
-        """Cuenta los doctores activos con esta especialidad"""
-        return obj.doctors.filter(is_active=True).count()
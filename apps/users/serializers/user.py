@@ -8,9 +8,10 @@ UserCreateSerializer: Para CREAR usuarios (POST) - usado internamente
 
 from rest_framework import serializers
 from apps.users.models import User
+from .fieldsets import SparseFieldsetMixin
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer para VER datos del usuario.
     
@@ -50,6 +51,12 @@ class UserSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
         ]
+        # Columnas que leen las propiedades (para ?fields=)
+        field_sources = {
+            'full_name': ('first_name', 'last_name', 'email'),
+            'is_doctor': ('role',),
+            'is_patient': ('role',),
+        }
 
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,265 @@
+# apps/users/signals.py
+"""
+Signals de la app users.
+
+Mantienen al día los datos desnormalizados:
+- Read model DoctorSearchDocument (apps/users/directory.py) cuando
+  cambian el doctor, su usuario o sus especialidades.
+- Specialty.active_doctors_count cuando cambian los vínculos
+  doctor <-> especialidad o la visibilidad (is_active / deleted_at)
+  de un doctor.
+- Versiones del cache de respuestas públicas (apps/users/cache.py).
+- Doctor.updated_at cuando cambian sus especialidades (Last-Modified
+  del perfil).
+- User.role cuando se crea o borra su perfil de doctor o paciente.
+- Snapshot del usuario autenticado (apps/users/authentication.py).
+"""
+
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.users.authentication import invalidate_user
+from apps.users.cache import bump_on_commit, doctor_namespace
+from apps.users.directory import refresh_directory
+from apps.users.models import Doctor, Patient, Specialty, User
+from apps.users.models.doctor import doctor_specialties_changed
+
+# Campos de User que se muestran anidados en las respuestas de doctores
+USER_PUBLIC_FIELDS = {
+    'email', 'username', 'first_name', 'last_name', 'phone', 'is_active', 'updated_at',
+}
+
+# Campos que definen si un doctor cuenta como activo
+DOCTOR_VISIBILITY_FIELDS = {'is_active', 'deleted_at'}
+
+
+def _touches(update_fields, relevant):
+    """False si el save() sólo actualizó campos que no nos importan"""
+    return update_fields is None or bool(relevant & set(update_fields))
+
+
+def _touch_doctors(doctor_ids):
+    """
+    Mueve updated_at de los doctores cuyas especialidades cambiaron: el
+    Last-Modified de su perfil sale de ahí y el cambio no pasa por save().
+    """
+    now = timezone.now()
+    if doctor_ids:
+        Doctor.objects.filter(pk__in=doctor_ids).update(updated_at=now)
+    return now
+
+
+# ----------------------------------------------------------------------
+# Doctor
+# ----------------------------------------------------------------------
+
+@receiver(post_init, sender=Doctor)
+def doctor_loaded(sender, instance, **kwargs):
+    # Estado de visibilidad con el que se cargó, para detectar cambios en post_save.
+    # Si los campos están diferidos no los leemos (evita una query por instancia).
+    if DOCTOR_VISIBILITY_FIELDS & instance.get_deferred_fields():
+        instance._was_public = None
+    else:
+        instance._was_public = instance.is_public
+
+
+@receiver(post_save, sender=Doctor)
+def doctor_saved(sender, instance, created, update_fields=None, **kwargs):
+    refresh_directory([instance.pk])
+    bump_on_commit('doctors', doctor_namespace(instance.pk))
+
+    # Un save(update_fields=...) sin is_active / deleted_at no cambia la
+    # visibilidad en la base, aunque la instancia los tenga modificados
+    if not _touches(update_fields, DOCTOR_VISIBILITY_FIELDS):
+        return
+
+    # Un doctor recién creado todavía no tiene especialidades
+    was_public = instance._was_public
+    instance._was_public = instance.is_public
+    if created or was_public is None or was_public == instance.is_public:
+        return
+
+    Specialty.objects.filter(doctors=instance).adjust_active_doctors_count(
+        1 if instance.is_public else -1
+    )
+    bump_on_commit('specialties')
+
+
+@receiver(pre_delete, sender=Doctor)
+def doctor_deleting(sender, instance, **kwargs):
+    # Los vínculos se borran en cascada sin m2m_changed
+    if instance.is_public:
+        Specialty.objects.filter(doctors=instance).adjust_active_doctors_count(-1)
+    bump_on_commit('doctors', 'specialties', doctor_namespace(instance.pk))
+
+
+@receiver(doctor_specialties_changed, sender=Doctor)
+def doctor_specialties_updated(sender, instance, added, removed, **kwargs):
+    refresh_directory([instance.pk])
+    instance.updated_at = _touch_doctors([instance.pk])
+    if instance.is_public:
+        Specialty.objects.filter(pk__in=added).adjust_active_doctors_count(1)
+        Specialty.objects.filter(pk__in=removed).adjust_active_doctors_count(-1)
+    bump_on_commit('specialties', doctor_namespace(instance.pk))
+
+
+# ----------------------------------------------------------------------
+# User
+# ----------------------------------------------------------------------
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Cualquier save (también soft_delete() / restore() y last_login) deja viejo el snapshot
+    if not created:
+        invalidate_user(instance.pk)
+
+    # Un usuario nuevo todavía no tiene perfil de doctor; login sólo toca last_login
+    if created or not _touches(update_fields, USER_PUBLIC_FIELDS):
+        return
+
+    doctor_ids = list(Doctor.objects.filter(user_id=instance.pk).values_list('pk', flat=True))
+    if not doctor_ids:
+        return
+
+    refresh_directory(doctor_ids)
+    bump_on_commit('doctors', *(doctor_namespace(pk) for pk in doctor_ids))
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+PROFILE_ROLES = {
+    Doctor: User.Role.DOCTOR,
+    Patient: User.Role.PATIENT,
+}
+
+
+def _set_role(profile, role):
+    """
+    Guarda el rol con un UPDATE (sin pasar por User.save()) y lo copia al
+    usuario ya cargado en el perfil, si lo hay, para que un save() posterior
+    de esa instancia no lo pise.
+    """
+    User.objects.filter(pk=profile.user_id).update(role=role)
+    if type(profile).user.is_cached(profile):
+        profile.user.role = role
+    # El snapshot de autenticación guarda el rol
+    invalidate_user(profile.user_id)
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_save, sender=Patient)
+def profile_saved(sender, instance, created, **kwargs):
+    if created:
+        _set_role(instance, PROFILE_ROLES[sender])
+
+
+@receiver(post_delete, sender=Doctor)
+@receiver(post_delete, sender=Patient)
+def profile_deleted(sender, instance, **kwargs):
+    _set_role(instance, User.Role.NONE)
+
+
+# ----------------------------------------------------------------------
+# Specialty
+# ----------------------------------------------------------------------
+
+@receiver(post_save, sender=Specialty)
+def specialty_saved(sender, instance, created, **kwargs):
+    if not created:
+        doctor_ids = list(instance.doctors.values_list('pk', flat=True))
+        refresh_directory(doctor_ids)
+        _touch_doctors(doctor_ids)
+    bump_on_commit('specialties')
+
+
+@receiver(pre_delete, sender=Specialty)
+def specialty_deleting(sender, instance, **kwargs):
+    # Las filas de la tabla intermedia se borran en cascada sin m2m_changed
+    instance._affected_doctor_ids = list(instance.doctors.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Specialty)
+def specialty_deleted(sender, instance, **kwargs):
+    doctor_ids = getattr(instance, '_affected_doctor_ids', [])
+    refresh_directory(doctor_ids)
+    _touch_doctors(doctor_ids)
+    bump_on_commit('specialties')
+
+
+# ----------------------------------------------------------------------
+# Doctor <-> Specialty
+# ----------------------------------------------------------------------
+
+@receiver(m2m_changed, sender=Specialty.doctors.through)
+def specialty_doctors_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    specialty.doctors.add(doctor)  -> instance=Specialty, reverse=False, pk_set=ids de doctores
+    doctor.specialties.add(spec)   -> instance=Doctor,    reverse=True,  pk_set=ids de especialidades
+
+    En post_add, pk_set trae sólo los vínculos realmente creados. En
+    remove/clear hay que mirar antes del cambio qué vínculos existían.
+    """
+    if action.startswith('pre_'):
+        _remember_links(instance, action, reverse, pk_set)
+        return
+
+    if reverse:
+        doctor_ids = [instance.pk]
+    elif action == 'post_clear':
+        doctor_ids = instance._removed_doctor_ids
+    else:
+        doctor_ids = pk_set or []
+
+    refresh_directory(doctor_ids)
+    _touch_doctors(doctor_ids)
+    _update_counts(instance, action, reverse, pk_set)
+    # Las respuestas de doctores dependen también de 'specialties'
+    bump_on_commit('specialties', *(doctor_namespace(pk) for pk in doctor_ids))
+
+
+def _remember_links(instance, action, reverse, pk_set):
+    """Guarda en la instancia los vínculos activos que se van a quitar"""
+    if action == 'pre_add':
+        return
+
+    if reverse:
+        # instance es un Doctor: especialidades vinculadas que se quitan
+        specialties = instance.specialties.all()
+        if action == 'pre_remove':
+            specialties = specialties.filter(pk__in=pk_set)
+        instance._removed_specialty_ids = list(specialties.values_list('pk', flat=True))
+    else:
+        # instance es una Specialty: doctores vinculados que se quitan
+        doctors = instance.doctors.all()
+        if action == 'pre_remove':
+            doctors = doctors.filter(pk__in=pk_set)
+        instance._removed_doctor_ids = list(doctors.values_list('pk', flat=True))
+        instance._removed_active_count = doctors.public().count()
+
+
+def _update_counts(instance, action, reverse, pk_set):
+    if reverse:
+        if not instance.is_public:
+            return
+        if action == 'post_add':
+            specialty_ids, delta = pk_set, 1
+        else:
+            specialty_ids, delta = instance._removed_specialty_ids, -1
+        Specialty.objects.filter(pk__in=specialty_ids).adjust_active_doctors_count(delta)
+        return
+
+    if action == 'post_add':
+        delta = Doctor.objects.filter(pk__in=pk_set).public().count() if pk_set else 0
+    else:
+        delta = -instance._removed_active_count
+    Specialty.objects.filter(pk=instance.pk).adjust_active_doctors_count(delta)
@@ -0,0 +1,16 @@
+# apps/users/tasks.py
+"""
+Tareas de Celery de la app users.
+
+La agenda de beat está en settings.CELERY_BEAT_SCHEDULE.
+"""
+
+from celery import shared_task
+
+from apps.users.token_tables import prune_token_tables
+
+
+@shared_task(ignore_result=True)
+def prune_jwt_tokens():
+    """Retención de las tablas de token_blacklist (apps/users/token_tables.py)"""
+    prune_token_tables()
@@ -1,3 +1,1780 @@
-from django.test import TestCase
+# apps/users/tests.py
+"""
+Tests de la app users.
 
-# Create your tests here.
+APIBenchmark: benchmark de carga de todos los endpoints de apps/users/urls.
+No corre con el resto de los tests (tarda minutos); se activa con
+API_BENCHMARK=1 y usa la base de tests de Postgres y el Redis de CACHES
+(las claves de cache llevan un prefijo propio y se borran al terminar):
+
+    API_BENCHMARK=1 python manage.py test apps.users.tests.APIBenchmark
+
+Tamaño y carga por variables de entorno (todas opcionales):
+    API_BENCHMARK_USERS=100000 API_BENCHMARK_DOCTORS=20000
+    API_BENCHMARK_SPECIALTIES=60 API_BENCHMARK_SEED=42
+    API_BENCHMARK_CONCURRENCY=8     clientes concurrentes (threads)
+    API_BENCHMARK_REQUESTS=200      requests por endpoint
+    API_BENCHMARK_SLOW_REQUESTS=20  requests para los que hashean passwords
+    API_BENCHMARK_OUTPUT=benchmark.json
+    API_BENCHMARK_BASELINE=otro.json  imprime la comparación con otra corrida
+
+Por endpoint reporta p50 / p95 / p99 de latencia (ms), requests por
+segundo, queries por request (del header Server-Timing de
+InstrumentationMiddleware) y códigos de respuesta.
+
+QueryBudgetTests: corre con el resto. Fija la cantidad máxima de queries
+SQL de cada endpoint (QUERY_BUDGETS: la API, las views async, /metrics y
+los listados del admin) y verifica que no crezca con el dataset:
+
+    python manage.py test apps.users.tests.QueryBudgetTests
+
+Si un cambio baja las queries de un endpoint, bajar su presupuesto en
+el mismo commit; si las sube a propósito, subirlo y explicar por qué.
+
+El resto son tests de comportamiento: listados públicos (paginación,
+cercanía, búsqueda, campos a pedido, exportación), datos desnormalizados,
+cache, autenticación, importación y dataset sintético; todos usan un
+prefijo de cache propio (IsolatedCacheTestCase).
+"""
+
+import base64
+import csv
+import importlib
+import io
+import itertools
+import json
+import logging
+import math
+import os
+import re
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, path, reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.users import views
+from apps.users.authentication import USER_CACHE_KEY, get_user_snapshot
+from apps.users.directory import refresh_directory
+from apps.users.geo import bounding_box
+from apps.users.hashing import HashingBusy, HashingPool
+from apps.users.importer import DoctorImporter
+from apps.users.instrumentation import sql_shape
+from apps.users.models import Doctor, DoctorSearchDocument, Patient, Specialty, User
+from apps.users.renderers import ORJSONRenderer
+from apps.users.seeding import SEED_PASSWORD, seed_dataset
+from apps.users.token_tables import maintain_partitions, partition_token_tables
+from apps.users.tokens import RefreshToken
+
+# El nombre del módulo empieza con un número: no se puede importar con from
+backfill_role = importlib.import_module('apps.users.migrations.0009_user_role').backfill_role
+
+
+def _env(name, default, cast=int):
+    return cast(os.environ.get(f'API_BENCHMARK_{name}', default))
+
+
+def url_names(urlconf='apps.users.urls'):
+    """Nombres de todas las rutas de un urlconf (recorre los include)"""
+    names = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                names.add(pattern.name)
+
+    walk(get_resolver(urlconf).url_patterns)
+    return names
+
+
+def percentile(ordered, fraction):
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class BenchmarkContext:
+    """Datos del dataset que usan los escenarios (ids, emails, tokens)"""
+
+    def __init__(self, requests):
+        doctors = Doctor.objects.public().order_by('pk')
+        self.doctor_ids = [str(pk) for pk in doctors.values_list('pk', flat=True)[:1000]]
+        self.specialty_ids = [str(pk) for pk in Specialty.objects.values_list('pk', flat=True)]
+        self.specialty_names = list(Specialty.objects.values_list('name', flat=True))
+        self.coordinates = list(doctors.exclude(latitude=None).values_list('latitude', 'longitude')[:200])
+        # Sólo los del dataset: los que crea el escenario de register tienen otro password
+        seeded = User.objects.filter(username__regex=r'^user[0-9]+$')
+        self.login_emails = list(seeded.order_by('email').values_list('email', flat=True)[:1000])
+
+        doctor_user = doctors.select_related('user').first().user
+        patient_user = Patient.objects.select_related('user').order_by('pk').first().user
+        admin = User.objects.filter(email='benchmark-admin@seed.example.com').first() or User.objects.create_superuser(
+            email='benchmark-admin@seed.example.com', username='benchmark-admin', password=SEED_PASSWORD
+        )
+        self.admin = admin
+        self.doctor_auth = self._auth(doctor_user)
+        self.patient_auth = self._auth(patient_user)
+        self.admin_auth = self._auth(admin)
+
+        # Refresh / logout invalidan el refresh token: uno nuevo por request
+        self.refresh_tokens = [str(RefreshToken.for_user(patient_user)) for _ in range(requests)]
+        self.logout_tokens = [str(RefreshToken.for_user(patient_user)) for _ in range(requests)]
+
+        # Emails de register únicos aunque se creen varios contextos sobre la misma base
+        self.run_id = uuid.uuid4().hex[:8]
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _auth(user):
+        return {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+    def unique(self):
+        with self._lock:
+            return next(self._counter)
+
+
+def _get(url_name, query='', auth_attr=None, kwargs=None):
+    def scenario(ctx, client, i):
+        url = reverse(f'users:{url_name}', kwargs=kwargs(ctx, i) if kwargs else None)
+        auth = getattr(ctx, auth_attr) if auth_attr else {}
+        return client.get(url + (query(ctx, i) if callable(query) else query), **auth)
+    return scenario
+
+
+def _post(url_name, body, auth_attr=None):
+    def scenario(ctx, client, i):
+        auth = getattr(ctx, auth_attr) if auth_attr else {}
+        return client.post(
+            reverse(f'users:{url_name}'), body(ctx, i), content_type='application/json', **auth
+        )
+    return scenario
+
+
+def _register_body(ctx, i):
+    n = f'{ctx.run_id}-{ctx.unique()}'
+    return {
+        'email': f'bench-register-{n}@seed.example.com',
+        'username': f'bench-register-{n}',
+        'password': 'Benchmark-pass-1',
+        'password_confirm': 'Benchmark-pass-1',
+        'first_name': 'Bench',
+        'last_name': 'Mark',
+        'account_type': 'patient',
+    }
+
+
+def _doctor_list_query(ctx, i):
+    variants = (
+        '',
+        '?page_size=50',
+        f'?specialty={ctx.specialty_names[i % len(ctx.specialty_names)]}',
+        '?search=gonzalez',
+        '?fields=id,user,specialties&expand=user',
+    )
+    return variants[i % len(variants)]
+
+
+def _doctor_kwargs(ctx, i):
+    return {'doctor_id': ctx.doctor_ids[i % len(ctx.doctor_ids)]}
+
+
+def _specialty_kwargs(ctx, i):
+    return {'specialty_id': ctx.specialty_ids[i % len(ctx.specialty_ids)]}
+
+
+def _nearby_query(ctx, i):
+    lat, lng = ctx.coordinates[i % len(ctx.coordinates)]
+    return f'?lat={lat}&lng={lng}&radius_km=5'
+
+
+# url_name -> (escenario, lento); lento = hashea passwords o recorre todo el directorio
+SCENARIOS = {
+    'register': (_post('register', _register_body), True),
+    'login': (_post('login', lambda ctx, i: {
+        'email': ctx.login_emails[i % len(ctx.login_emails)], 'password': SEED_PASSWORD,
+    }), True),
+    'logout': (_post('logout', lambda ctx, i: {'refresh': ctx.logout_tokens[i]}, 'patient_auth'), False),
+    'profile': (_get('profile', auth_attr='patient_auth'), False),
+    'token_refresh': (_post('token_refresh', lambda ctx, i: {'refresh': ctx.refresh_tokens[i]}), False),
+    'doctor_list': (_get('doctor_list', _doctor_list_query), False),
+    'doctor_profile': (_get('doctor_profile', auth_attr='doctor_auth'), False),
+    'doctor_nearby': (_get('doctor_nearby', _nearby_query), False),
+    'doctor_export': (_get('doctor_export', '?output=jsonl', 'admin_auth'), True),
+    'doctor_detail': (_get('doctor_detail', kwargs=_doctor_kwargs), False),
+    'patient_profile': (_get('patient_profile', auth_attr='patient_auth'), False),
+    'specialty_list': (_get('specialty_list'), False),
+    'specialty_detail': (_get('specialty_detail', kwargs=_specialty_kwargs), False),
+}
+
+
+@skipUnless(os.environ.get('API_BENCHMARK'), 'Benchmark de carga: correr con API_BENCHMARK=1')
+@override_settings(
+    # Server-Timing en todas las respuestas (queries por request)
+    INSTRUMENTATION_SAMPLE_RATE=1,
+    SERVER_TIMING_HEADER=True,
+    METRICS_ENABLED=False,
+)
+class APIBenchmark(TransactionTestCase):
+    """Latencia, throughput y queries por request de cada endpoint"""
+
+    def setUp(self):
+        # Cache aislado del de desarrollo: prefijo propio, borrado al terminar
+        caches = {'default': {**settings.CACHES['default'], 'KEY_PREFIX': f'bench-{uuid.uuid4().hex[:8]}'}}
+        self.cache_override = override_settings(CACHES=caches)
+        self.cache_override.enable()
+        # El resumen y los avisos de N+1 por request no aportan acá
+        logging.getLogger('apps.users.instrumentation').setLevel(logging.ERROR)
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+    def tearDown(self):
+        cache.delete_pattern('*')
+        self.cache_override.disable()
+        logging.getLogger('apps.users.instrumentation').setLevel(logging.NOTSET)
+        logging.getLogger('django.request').setLevel(logging.NOTSET)
+
+    def test_all_endpoints(self):
+        dataset = {
+            'users': _env('USERS', 100_000),
+            'doctors': _env('DOCTORS', 20_000),
+            'specialties': _env('SPECIALTIES', 60),
+            'seed': _env('SEED', 42),
+        }
+        concurrency = _env('CONCURRENCY', 8)
+        requests = _env('REQUESTS', 200)
+        slow_requests = _env('SLOW_REQUESTS', 20)
+
+        missing = url_names() - set(SCENARIOS)
+        self.assertFalse(missing, f'Rutas sin escenario de benchmark: {sorted(missing)}')
+
+        started = time.perf_counter()
+        seed_dataset(
+            dataset['users'], dataset['doctors'], dataset['specialties'], seed=dataset['seed']
+        )
+        seed_seconds = time.perf_counter() - started
+
+        ctx = BenchmarkContext(max(requests, slow_requests))
+        results = {}
+        for name, (scenario, slow) in SCENARIOS.items():
+            results[name] = self.run_scenario(ctx, scenario, slow_requests if slow else requests, concurrency)
+
+        report = {
+            'commit': _git_commit(),
+            'finished_at': timezone.now().isoformat(),
+            'dataset': dataset,
+            'seed_seconds': round(seed_seconds, 1),
+            'concurrency': concurrency,
+            'endpoints': results,
+        }
+        output = os.environ.get('API_BENCHMARK_OUTPUT', 'benchmark.json')
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        self.print_report(report, os.environ.get('API_BENCHMARK_BASELINE'))
+        for name, result in results.items():
+            self.assertFalse(
+                result['status_codes'].get('500'), f'{name}: respuestas 500 durante el benchmark'
+            )
+
+    def run_scenario(self, ctx, scenario, total, concurrency):
+        """Corre `total` requests repartidos en `concurrency` clientes"""
+        samples = []
+        lock = threading.Lock()
+        indexes = iter(range(total))
+
+        def worker():
+            client = Client()
+            local = []
+            try:
+                while True:
+                    with lock:
+                        i = next(indexes, None)
+                    if i is None:
+                        break
+                    t0 = time.perf_counter()
+                    response = scenario(ctx, client, i)
+                    if response.streaming:
+                        # El tiempo incluye generar todo el cuerpo
+                        for _ in response.streaming_content:
+                            pass
+                    local.append((time.perf_counter() - t0, response.status_code, response.get('Server-Timing')))
+            finally:
+                connections.close_all()
+            with lock:
+                samples.extend(local)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            for future in [executor.submit(worker) for _ in range(concurrency)]:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(duration * 1000 for duration, _, _ in samples)
+        queries = [_queries_from_timing(timing) for _, _, timing in samples]
+        queries = [q for q in queries if q is not None]
+        status_codes = {}
+        for _, code, _ in samples:
+            status_codes[str(code)] = status_codes.get(str(code), 0) + 1
+
+        return {
+            'requests': len(samples),
+            'rps': round(len(samples) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'queries_per_request': round(statistics.mean(queries), 2) if queries else None,
+            'max_queries': max(queries) if queries else None,
+            'status_codes': status_codes,
+        }
+
+    def print_report(self, report, baseline_path):
+        baseline = {}
+        if baseline_path:
+            with open(baseline_path) as f:
+                baseline = json.load(f)['endpoints']
+
+        print(f"\n\nBenchmark {report['commit'] or ''} - dataset {report['dataset']}, "
+              f"concurrencia {report['concurrency']} (seed {report['seed_seconds']} s)")
+        print(f"{'endpoint':<18}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}  códigos")
+        for name, result in report['endpoints'].items():
+            line = (
+                f"{name:<18}{result['rps']:>9}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+                f"{result['p99_ms']:>10}{result['queries_per_request'] if result['queries_per_request'] is not None else '-':>9}"
+                f"  {result['status_codes']}"
+            )
+            before = baseline.get(name)
+            if before:
+                line += f"  (p95 {_delta(before['p95_ms'], result['p95_ms'])}, req/s {_delta(before['rps'], result['rps'])})"
+            print(line)
+
+
+def _queries_from_timing(timing):
+    # db;dur=3.1;desc="5 queries", ...
+    if not timing:
+        return None
+    desc = timing.split('desc="', 1)[1]
+    return int(desc.split(' ', 1)[0])
+
+
+def _delta(before, after):
+    if not before:
+        return '-'
+    return f'{(after - before) / before * 100:+.0f}%'
+
+
+# ----------------------------------------------------------------------
+# Presupuesto de queries por endpoint
+# ----------------------------------------------------------------------
+
+# Las views async se prueban con su propio urlconf (ROOT_URLCONF=__name__)
+urlpatterns = [
+    path('doctors/', views.doctor_list_async, name='doctor_list_async'),
+    path('doctors/<uuid:doctor_id>/', views.doctor_detail_async, name='doctor_detail_async'),
+    path('specialties/', views.specialty_list_async, name='specialty_list_async'),
+    path('specialties/<uuid:specialty_id>/', views.specialty_detail_async, name='specialty_detail_async'),
+]
+
+# Máximo de queries SQL por request, con el cache vacío. Sin los
+# SAVEPOINT de ATOMIC_REQUESTS (en producción son BEGIN / COMMIT, que no
+# pasan por el cursor); en el admin incluyen la sesión y el usuario.
+QUERY_BUDGETS = {
+    'register': 3,
+    'login': 1,
+    'logout': 1,
+    'profile': 1,
+    'token_refresh': 0,
+    'doctor_list': 3,
+    'doctor_profile': 3,
+    'doctor_nearby': 1,
+    'doctor_export': 2,
+    'doctor_detail': 2,
+    'patient_profile': 2,
+    'specialty_list': 2,
+    'specialty_detail': 2,
+    'metrics': 0,
+    'doctor_list_async': 1,
+    'doctor_detail_async': 2,
+    'specialty_list_async': 1,
+    'specialty_detail_async': 2,
+    'admin:users_user_changelist': 7,
+    'admin:users_doctor_changelist': 9,
+    'admin:users_patient_changelist': 8,
+    'admin:users_specialty_changelist': 5,
+}
+
+# Requests por endpoint (variantes de query string / ids)
+BUDGET_VARIANTS = 5
+
+
+def _async_get(url_name, kwargs=None):
+    def scenario(ctx, client, i):
+        with override_settings(ROOT_URLCONF=__name__):
+            return client.get(reverse(url_name, kwargs=kwargs(ctx, i) if kwargs else None))
+    return scenario
+
+
+def _admin_get(url_name):
+    # El client ya tiene la sesión de ctx.admin (QueryBudgetTests.measure)
+    def scenario(ctx, client, i):
+        return client.get(reverse(url_name) + ('?q=a' if i % 2 else ''))
+    return scenario
+
+
+_SAVEPOINT = re.compile(r'(RELEASE |ROLLBACK TO )?SAVEPOINT ')
+
+
+class _QueryRecorder:
+    """execute_wrapper que guarda el SQL sin parámetros (para agrupar repeticiones)"""
+
+    def __init__(self):
+        self.executed = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not _SAVEPOINT.match(sql):
+            self.executed.append(sql)
+        return execute(sql, params, many, context)
+
+# url_name -> (escenario, variantes); una sola variante para los que hashean passwords
+BUDGET_SCENARIOS = {
+    **{name: (scenario, 1 if slow else BUDGET_VARIANTS) for name, (scenario, slow) in SCENARIOS.items()},
+    'metrics': (
+        lambda ctx, client, i: client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer test-token'), 1,
+    ),
+    'doctor_list_async': (_async_get('doctor_list_async'), 1),
+    'doctor_detail_async': (_async_get('doctor_detail_async', _doctor_kwargs), BUDGET_VARIANTS),
+    'specialty_list_async': (_async_get('specialty_list_async'), 1),
+    'specialty_detail_async': (_async_get('specialty_detail_async', _specialty_kwargs), BUDGET_VARIANTS),
+    **{name: (_admin_get(name), 2) for name in QUERY_BUDGETS if name.startswith('admin:')},
+}
+
+
+class IsolatedCacheTestCase(TestCase):
+    """TestCase con un prefijo de cache propio (el Redis de CACHES es compartido)"""
+
+    def setUp(self):
+        caches = {'default': {**settings.CACHES['default'], 'KEY_PREFIX': f'test-{uuid.uuid4().hex[:8]}'}}
+        self.cache_override = override_settings(CACHES=caches)
+        self.cache_override.enable()
+
+    def tearDown(self):
+        cache.delete_pattern('*')
+        self.cache_override.disable()
+
+
+@override_settings(INSTRUMENTATION_SAMPLE_RATE=0, METRICS_ENABLED=True, METRICS_TOKEN='test-token')
+class QueryBudgetTests(IsolatedCacheTestCase):
+    """
+    Queries por request de cada endpoint, con el cache vacío, en dos
+    tamaños de dataset.
+
+    Falla si un endpoint supera su presupuesto (QUERY_BUDGETS) o si hace
+    más queries con el dataset grande que con el chico (el síntoma de
+    un N+1). El mensaje muestra las queries repetidas.
+    """
+
+    SMALL = {'users': 24, 'doctors': 8, 'specialties': 4}
+    LARGE = {'users': 72, 'doctors': 24, 'specialties': 8}
+
+    def measure(self, ctx, name):
+        """SQL ejecutado por cada variante del endpoint"""
+        scenario, variants = BUDGET_SCENARIOS[name]
+        executed = []
+        for i in range(variants):
+            cache.delete_pattern('*')
+            client = Client()
+            if name.startswith('admin:'):
+                client.force_login(ctx.admin)
+            recorder = _QueryRecorder()
+            with connection.execute_wrapper(recorder):
+                response = scenario(ctx, client, i)
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+            self.assertLess(response.status_code, 300, f'{name} (variante {i}): {response.status_code}')
+            executed.append(recorder.executed)
+        return executed
+
+    def measure_all(self):
+        ctx = BenchmarkContext(BUDGET_VARIANTS)
+        return {name: self.measure(ctx, name) for name in QUERY_BUDGETS}
+
+    def test_every_view_has_a_budget(self):
+        routes = url_names() | url_names(__name__) | {'metrics'}
+        self.assertFalse(routes - set(QUERY_BUDGETS), 'Rutas sin presupuesto de queries')
+
+    def test_query_budgets(self):
+        seed_dataset(**self.SMALL)
+        small = self.measure_all()
+        seed_dataset(
+            **self.LARGE, seed=43,
+            first_user=self.SMALL['users'], first_specialty=self.SMALL['specialties'],
+        )
+        large = self.measure_all()
+
+        failures = []
+        for name, budget in QUERY_BUDGETS.items():
+            for i, (before, after) in enumerate(zip(small[name], large[name])):
+                if len(after) <= budget and len(after) <= len(before):
+                    continue
+                repeated = [
+                    f'    {count}x {sql[:300]}'
+                    for sql, count in Counter(sql_shape(sql) for sql in after).most_common()
+                    if count > 1
+                ]
+                failures.append('\n'.join([
+                    f'{name} (variante {i}): {len(before)} queries con el dataset chico, '
+                    f'{len(after)} con el grande (presupuesto {budget})',
+                    *repeated,
+                ]))
+        if failures:
+            self.fail('\n\n' + '\n\n'.join(failures))
+
+
+# ----------------------------------------------------------------------
+# Listados públicos
+# ----------------------------------------------------------------------
+
+def make_doctor(number, specialties=(), first_name='', last_name='', **fields):
+    # Sin password (no se loguea): hashearlo es lo más lento de crear un doctor
+    user = User.objects.create_user(
+        email=f'doctor{number}@example.com', username=f'doctor{number}',
+        first_name=first_name, last_name=last_name,
+    )
+    doctor = Doctor.objects.create(user=user, license_number=f'MN-T{number}', **fields)
+    if specialties:
+        doctor.specialties.add(*specialties)
+    return doctor
+
+
+class KeysetPaginationTests(IsolatedCacheTestCase):
+    """doctor_list: los cursores recorren todo el directorio y un cursor inválido es 404"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        doctors = [make_doctor(i) for i in range(7)]
+        # Empates en created_at: el orden lo desempata doctor_id
+        tie = timezone.now() - timedelta(days=1)
+        Doctor.objects.filter(pk__in=[d.pk for d in doctors[:4]]).update(created_at=tie)
+        refresh_directory()
+        self.ids = {str(d.pk) for d in doctors}
+
+    def walk(self, url, link):
+        """ids de cada página siguiendo `link` ('next' o 'previous') hasta el final"""
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            seen.append([item['id'] for item in body['results']])
+            url = body[link]
+        return seen
+
+    def test_next_visits_every_doctor_once(self):
+        pages = self.walk(reverse('users:doctor_list') + '?page_size=2', 'next')
+        ids = [pk for page in pages for pk in page]
+        self.assertEqual(len(pages), 4)
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), self.ids)
+
+    def test_previous_walks_back_in_the_same_order(self):
+        pages = self.walk(reverse('users:doctor_list') + '?page_size=3', 'next')
+        last = self.client.get(reverse('users:doctor_list') + '?page_size=3')
+        for _ in range(len(pages) - 1):
+            last = self.client.get(last.json()['next'])
+        back = self.walk(last.json()['previous'], 'previous')
+        self.assertEqual(list(reversed(back)), pages[:-1])
+
+    def test_invalid_cursor_is_404(self):
+        def encode(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        cursors = [
+            'no-es-un-cursor',
+            '%%%',
+            encode(['lista']),
+            encode({'p': ['2026-01-01T00:00:00Z']}),
+            encode({'p': ['no es una fecha', str(uuid.uuid4())]}),
+            encode({'p': ['2026-01-01T00:00:00Z', 'no es un uuid']}),
+        ]
+        for cursor in cursors:
+            for query in ('', '&search=doctor'):
+                response = self.client.get(f"{reverse('users:doctor_list')}?cursor={cursor}{query}")
+                self.assertEqual(response.status_code, 404, cursor)
+
+
+class DoctorNearbyTests(IsolatedCacheTestCase):
+    """doctor_nearby: orden por distancia, corte por radio y validación de parámetros"""
+
+    LAT, LNG, RADIUS_KM = -34.6037, -58.3816, 5
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        min_lat, max_lat, min_lng, max_lng = bounding_box(self.LAT, self.LNG, self.RADIUS_KM)
+        delta_lat, delta_lng = max_lat - self.LAT, max_lng - self.LNG
+        points = {
+            'lejos': (self.LAT + 0.03, self.LNG),              # ~3.3 km
+            'cerca': (self.LAT + 0.01, self.LNG),              # ~1.1 km
+            'medio': (self.LAT, self.LNG - 0.02),              # ~1.8 km
+            'borde': (self.LAT - 0.95 * delta_lat, self.LNG),  # ~4.75 km
+            # Dentro del rectángulo pero fuera del círculo (~6.7 km)
+            'esquina': (self.LAT + 0.95 * delta_lat, self.LNG + 0.95 * delta_lng),
+            'fuera': (self.LAT + 2 * delta_lat, self.LNG),
+        }
+        self.doctors = {
+            name: str(make_doctor(
+                i,
+                latitude=Decimal(f'{lat:.6f}'),
+                longitude=Decimal(f'{lng:.6f}'),
+            ).pk)
+            for i, (name, (lat, lng)) in enumerate(points.items())
+        }
+        make_doctor(len(points))  # sin coordenadas
+        refresh_directory()
+
+    def nearby(self, **params):
+        params = {'lat': self.LAT, 'lng': self.LNG, 'radius_km': self.RADIUS_KM, **params}
+        return self.client.get(reverse('users:doctor_nearby'), params)
+
+    def test_results_in_ascending_distance(self):
+        response = self.nearby()
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        names = {pk: name for name, pk in self.doctors.items()}
+        self.assertEqual([names[item['id']] for item in results], ['cerca', 'medio', 'lejos', 'borde'])
+        distances = [item['distance_km'] for item in results]
+        self.assertEqual(distances, sorted(distances))
+        self.assertAlmostEqual(distances[0], 1.11, delta=0.01)
+        self.assertLessEqual(distances[-1], self.RADIUS_KM)
+
+    def test_radius_excludes_bounding_box_corners(self):
+        ids = {item['id'] for item in self.nearby().json()['results']}
+        self.assertNotIn(self.doctors['esquina'], ids)
+        self.assertNotIn(self.doctors['fuera'], ids)
+
+        # Con un radio mayor la esquina entra
+        ids = {item['id'] for item in self.nearby(radius_km=8).json()['results']}
+        self.assertIn(self.doctors['esquina'], ids)
+
+    def test_invalid_params_are_400(self):
+        cases = [
+            {'lat': ''},
+            {'lng': ''},
+            {'lat': 'abc'},
+            {'lng': 'nan'},
+            {'lat': 90.5},
+            {'lat': -91},
+            {'lng': 180.1},
+            {'lng': -181},
+            {'radius_km': 0},
+            {'radius_km': -1},
+            {'radius_km': 'inf'},
+            {'radius_km': 200.5},
+            {'page_size': 'x'},
+        ]
+        for params in cases:
+            response = self.nearby(**params)
+            self.assertEqual(response.status_code, 400, params)
+
+        # Sin lat / lng
+        for missing in ('lat', 'lng'):
+            params = {'lat': self.LAT, 'lng': self.LNG}
+            del params[missing]
+            response = self.client.get(reverse('users:doctor_nearby'), params)
+            self.assertEqual(response.status_code, 400, missing)
+
+
+class DoctorSearchTests(IsolatedCacheTestCase):
+    """doctor_list?search=: sin acentos, tolerante a errores de tipeo y ordenado por relevancia"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        cardiology = Specialty.objects.create(name='Cardiología')
+        self.doctors = {
+            'bio': make_doctor(0, first_name='Ana', last_name='Ruiz', bio='Discípula de la Dra. González'),
+            'universidad': make_doctor(1, first_name='Luis', last_name='Díaz', university='Fundación González'),
+            'nombre': make_doctor(2, [cardiology], first_name='Martín', last_name='González'),
+            'otro': make_doctor(3, first_name='Lucía', last_name='Fernández'),
+        }
+        refresh_directory()
+
+    def search(self, term):
+        response = self.client.get(reverse('users:doctor_list'), {'search': term})
+        self.assertEqual(response.status_code, 200)
+        names = {str(doctor.pk): name for name, doctor in self.doctors.items()}
+        return [names[item['id']] for item in response.json()['results']]
+
+    def test_accent_free_query_matches(self):
+        self.assertIn('nombre', self.search('gonzalez'))
+        self.assertEqual(self.search('martin cardiologia'), ['nombre'])
+        self.assertEqual(self.search('FERNANDEZ'), ['otro'])
+
+    def test_typo_matches_by_trigram(self):
+        # Sin prefijo común con el documento: sólo matchea por trigramas del nombre
+        self.assertEqual(self.search('Gonzalex'), ['nombre'])
+        self.assertEqual(self.search('fernandex'), ['otro'])
+
+    def test_better_match_first(self):
+        # El nombre suma además la similitud de trigramas; universidad y
+        # biografía empatan (ts_rank de una tsquery con prefijo)
+        results = self.search('gonzalez')
+        self.assertEqual(results[0], 'nombre')
+        self.assertCountEqual(results[1:], ['universidad', 'bio'])
+
+    def test_no_match_is_empty(self):
+        self.assertEqual(self.search('xyzzy'), [])
+        self.assertEqual(self.search('!!!'), [])
+
+
+class SparseFieldsetTests(IsolatedCacheTestCase):
+    """?fields= / ?expand= (apps/users/serializers/fieldsets.py) en el listado y el detalle"""
+
+    USER_KEYS = {
+        'id', 'email', 'username', 'first_name', 'last_name', 'full_name', 'phone',
+        'is_active', 'is_doctor', 'is_patient', 'created_at', 'updated_at',
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.doctor = make_doctor(1, first_name='Ana', last_name='Ruiz', bio='Bio')
+        self.urls = [
+            reverse('users:doctor_list'),
+            reverse('users:doctor_detail', kwargs={'doctor_id': self.doctor.pk}),
+        ]
+
+    def get(self, url, query, status_code=200):
+        response = self.client.get(url + query)
+        self.assertEqual(response.status_code, status_code, url + query)
+        body = response.json()
+        return body['results'][0] if 'results' in body else body
+
+    def test_unrequested_fields_are_pruned(self):
+        for url in self.urls:
+            self.assertEqual(self.get(url, '?fields=id,bio'), {'id': str(self.doctor.pk), 'bio': 'Bio'})
+            # Sin expandir, la relación es el id
+            self.assertEqual(self.get(url, '?fields=id,user')['user'], str(self.doctor.user_id))
+            self.assertEqual(self.get(url, '?fields=user.full_name'), {'user': {'full_name': 'Ana Ruiz'}})
+
+    def test_expand_user_nests_the_object(self):
+        for url in self.urls:
+            item = self.get(url, '?fields=id&expand=user')
+            self.assertEqual(set(item), {'id', 'user'})
+            self.assertEqual(set(item['user']), self.USER_KEYS)
+            self.assertEqual(item['user']['full_name'], 'Ana Ruiz')
+
+            # Sólo expand: todos los campos del perfil, con el usuario completo
+            item = self.get(url, '?expand=user')
+            self.assertIn('specialties', item)
+            self.assertEqual(set(item['user']), self.USER_KEYS)
+
+    def test_unknown_fields_are_400(self):
+        for url in self.urls:
+            for query in ('?fields=id,nope', '?expand=nope', '?expand=bio', '?fields=bio.x', '?fields=user.nope'):
+                body = self.get(url, query, status_code=400)
+                self.assertIn('error', body)
+
+
+class DoctorCardTests(IsolatedCacheTestCase):
+    """Los listados devuelven exactamente las claves de DoctorCardSerializer"""
+
+    CARD = {'id', 'full_name', 'image_url', 'address', 'specialties'}
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.cardio = Specialty.objects.create(name='Cardiología')
+        self.doctor = make_doctor(
+            1, [self.cardio], first_name='Ana', last_name='Ruiz', address='Calle 1',
+            image_url='https://example.com/ana.jpg', bio='No va en la tarjeta',
+            latitude=Decimal('-34.600000'), longitude=Decimal('-58.400000'),
+        )
+
+    def get(self, url, urlconf=None, **params):
+        with override_settings(ROOT_URLCONF=urlconf or settings.ROOT_URLCONF):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def assertCard(self, card, extra=()):
+        self.assertEqual(set(card), self.CARD | set(extra))
+        self.assertEqual(card['id'], str(self.doctor.pk))
+        self.assertEqual(
+            (card['full_name'], card['image_url'], card['address']),
+            ('Ana Ruiz', 'https://example.com/ana.jpg', 'Calle 1'),
+        )
+        self.assertEqual(card['specialties'], [{'id': str(self.cardio.pk), 'name': 'Cardiología'}])
+
+    def test_doctor_list(self):
+        self.assertCard(self.get(reverse('users:doctor_list'))['results'][0])
+        self.assertCard(self.get(reverse('users:doctor_list'), search='ruiz')['results'][0])
+        async_url = reverse('doctor_list_async', urlconf=__name__)
+        self.assertCard(self.get(async_url, urlconf=__name__)['results'][0])
+
+    def test_nearby_adds_only_the_distance(self):
+        card = self.get(reverse('users:doctor_nearby'), lat=-34.6, lng=-58.4)['results'][0]
+        self.assertCard(card, extra={'distance_km'})
+
+    def test_specialty_detail(self):
+        kwargs = {'specialty_id': self.cardio.pk}
+        self.assertCard(self.get(reverse('users:specialty_detail', kwargs=kwargs))['doctors'][0])
+        async_url = reverse('specialty_detail_async', urlconf=__name__, kwargs=kwargs)
+        self.assertCard(self.get(async_url, urlconf=__name__)['doctors'][0])
+
+
+class DoctorExportTests(IsolatedCacheTestCase):
+    """doctor_export: cada doctor visible una vez, con las columnas de docs/API_DOCUMENTATION.md"""
+
+    COLUMNS = [
+        'id', 'full_name', 'first_name', 'last_name', 'license_number', 'university', 'address',
+        'latitude', 'longitude', 'image_url', 'specialties', 'created_at', 'updated_at',
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        cardio = Specialty.objects.create(name='Cardiología')
+        pediatria = Specialty.objects.create(name='Pediatría')
+        self.doctor = make_doctor(
+            1, [pediatria, cardio], first_name='Ana', last_name='Ruiz, "hija"',
+            university='UBA', latitude=Decimal('-34.600000'), longitude=Decimal('-58.400000'),
+        )
+        self.visible = {str(self.doctor.pk)} | {str(make_doctor(i, [cardio]).pk) for i in range(2, 5)}
+        make_doctor(5, [cardio], is_active=False)
+        make_doctor(6, [cardio], deleted_at=timezone.now())
+
+        admin = User.objects.create_user(email='admin@example.com', username='admin', is_staff=True)
+        user = User.objects.create_user(email='user@example.com', username='user')
+        self.admin_auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(admin).access_token}'}
+        self.user_auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+    def export(self, output):
+        response = self.client.get(reverse('users:doctor_export'), {'output': output}, **self.admin_auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn(f'.{output}"', response['Content-Disposition'])
+        return b''.join(response.streaming_content).decode()
+
+    def test_jsonl(self):
+        records = [json.loads(line) for line in self.export('jsonl').splitlines()]
+        ids = [record['id'] for record in records]
+        self.assertEqual(ids, sorted(self.visible))
+        for record in records:
+            self.assertEqual(list(record), self.COLUMNS)
+
+        record = records[ids.index(str(self.doctor.pk))]
+        self.assertEqual(record['full_name'], 'Ana Ruiz, "hija"')
+        self.assertEqual(record['specialties'], ['Cardiología', 'Pediatría'])
+        self.assertEqual((record['latitude'], record['longitude']), ('-34.600000', '-58.400000'))
+        self.assertEqual(record['created_at'], self.doctor.created_at.isoformat())
+
+    def test_csv(self):
+        header, *rows = csv.reader(io.StringIO(self.export('csv')))
+        self.assertEqual(header, self.COLUMNS)
+        ids = [row[0] for row in rows]
+        self.assertEqual(ids, sorted(self.visible))
+
+        row = dict(zip(header, rows[ids.index(str(self.doctor.pk))]))
+        self.assertEqual(row['last_name'], 'Ruiz, "hija"')
+        self.assertEqual(row['specialties'], 'Cardiología|Pediatría')
+        self.assertEqual(row['university'], 'UBA')
+        # Sin coordenadas: celdas vacías
+        other = dict(zip(header, next(r for r in rows if r[0] != str(self.doctor.pk))))
+        self.assertEqual((other['latitude'], other['longitude'], other['specialties']), ('', '', 'Cardiología'))
+
+    def test_only_staff(self):
+        url = reverse('users:doctor_export')
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.assertEqual(self.client.get(url, **self.user_auth).status_code, 403)
+        self.assertEqual(self.client.get(url, {'output': 'xml'}, **self.admin_auth).status_code, 400)
+
+
+# ----------------------------------------------------------------------
+# Instrumentación
+# ----------------------------------------------------------------------
+
+@override_settings(INSTRUMENTATION_SAMPLE_RATE=1, METRICS_ENABLED=False, SERVER_TIMING_HEADER=False)
+class ServerTimingTests(IsolatedCacheTestCase):
+    """Server-Timing sólo para staff o con SERVER_TIMING_HEADER; el log siempre"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(
+            email='paciente@example.com', username='paciente', password=SEED_PASSWORD,
+        )
+
+    def get(self, user=None):
+        auth = {}
+        if user is not None:
+            auth['HTTP_AUTHORIZATION'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+        with self.assertLogs('apps.users.instrumentation', 'INFO'):
+            response = Client().get(reverse('users:profile'), **auth)
+        return response
+
+    def test_hidden_from_anonymous_and_regular_users(self):
+        self.assertNotIn('Server-Timing', self.get())
+        self.assertNotIn('Server-Timing', self.get(self.user))
+
+    def test_sent_to_staff(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.assertIn('db;dur=', self.get(self.user)['Server-Timing'])
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_sent_to_everyone_when_enabled(self):
+        self.assertIn('Server-Timing', self.get())
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_TOKEN='test-token')
+class MetricsEndpointTests(TestCase):
+    """/metrics pide METRICS_TOKEN; la IP del cliente no alcanza"""
+
+    def get(self, **headers):
+        return Client().get(reverse('metrics'), REMOTE_ADDR='127.0.0.1', **headers)
+
+    def test_requires_token(self):
+        self.assertEqual(self.get().status_code, 404)
+        self.assertEqual(self.get(HTTP_AUTHORIZATION='Bearer otro-token').status_code, 404)
+        response = self.get(HTTP_AUTHORIZATION='Bearer test-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'http_request_duration_seconds', response.content)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_disabled_without_token(self):
+        self.assertEqual(self.get(HTTP_AUTHORIZATION='Bearer ').status_code, 404)
+
+
+# ----------------------------------------------------------------------
+# Renderer JSON
+# ----------------------------------------------------------------------
+
+class RendererParityTests(IsolatedCacheTestCase):
+    """ORJSONRenderer escribe los mismos bytes que el JSONRenderer de DRF"""
+
+    def assertSameBytes(self, data, label):
+        self.assertEqual(
+            ORJSONRenderer().render(data), JSONRenderer().render(data), f'{label}: difiere de DRF'
+        )
+
+    def test_real_payloads(self):
+        seed_dataset(**QueryBudgetTests.SMALL)
+        ctx = BenchmarkContext(BUDGET_VARIANTS)
+        rendered = 0
+        for name, (scenario, slow) in SCENARIOS.items():
+            for i in range(1 if slow else BUDGET_VARIANTS):
+                response = scenario(ctx, Client(), i)
+                if getattr(response, 'data', None) is None:
+                    continue
+                self.assertSameBytes(response.data, f'{name} (variante {i})')
+                rendered += 1
+        self.assertGreater(rendered, len(SCENARIOS))
+
+    def test_floats(self):
+        for value in (0.1, -0.0, 1e15, 1e16, 1.2345678901234568e17, 1e-4, 5e-05, -1.5e-7, 2.5e300):
+            self.assertSameBytes({'results': [{'distance_km': value}]}, repr(value))
+            self.assertSameBytes({'results': [{'latitude': Decimal(repr(value))}]}, f'Decimal({value!r})')
+
+    def test_non_finite_floats(self):
+        # Como DRF (STRICT_JSON): NaN / Infinity son un error, no null
+        for value in (math.nan, math.inf, Decimal('NaN')):
+            with self.assertRaises(ValueError):
+                ORJSONRenderer().render({'results': [(1, value)]})
+
+    def test_doctor_page_does_not_fall_back_to_drf(self):
+        seed_dataset(**QueryBudgetTests.SMALL)
+        data = Client().get(reverse('users:doctor_list')).data
+        self.assertTrue(data['results'])
+        expected = JSONRenderer().render(data)
+
+        # Los UUID (con 'e' entre sus dígitos) no obligan a renderizar dos veces
+        with mock.patch.object(JSONRenderer, 'render', side_effect=AssertionError('render de DRF')):
+            self.assertEqual(ORJSONRenderer().render(data), expected)
+
+
+# ----------------------------------------------------------------------
+# Autenticación
+# ----------------------------------------------------------------------
+
+class AuthSnapshotTests(IsolatedCacheTestCase):
+    """CachedJWTAuthentication: snapshot del usuario en Redis y su invalidación por signals"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.user = User.objects.create_user(email='ana@example.com', username='ana', first_name='Ana')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        self.key = USER_CACHE_KEY.format(self.user.pk)
+
+    def profile(self):
+        return self.client.get(reverse('users:profile'), **self.auth)
+
+    def assertSnapshotCleared(self, change):
+        """Con el snapshot en cache, `change` lo borra"""
+        self.assertEqual(self.profile().status_code, 200)
+        self.assertIsNotNone(cache.get(self.key))
+        change()
+        self.assertIsNone(cache.get(self.key))
+
+    def test_request_reads_the_snapshot(self):
+        self.assertEqual(self.profile().status_code, 200)
+        recorder = _QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.profile()
+        self.assertEqual(response.json()['first_name'], 'Ana')
+        self.assertEqual(recorder.executed, [])
+
+    def test_save_invalidates(self):
+        def rename():
+            self.user.first_name = 'Ana María'
+            self.user.save()
+
+        self.assertSnapshotCleared(rename)
+        self.assertEqual(self.profile().json()['first_name'], 'Ana María')
+
+    def test_deactivated_user_is_rejected(self):
+        def deactivate():
+            self.user.is_active = False
+            self.user.save(update_fields=['is_active'])
+
+        # El token sigue siendo válido (y está en el LRU de tokens)
+        self.assertSnapshotCleared(deactivate)
+        response = self.profile()
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'user_inactive')
+
+    def test_soft_deleted_user_is_rejected(self):
+        self.assertSnapshotCleared(self.user.soft_delete)
+        self.assertEqual(self.profile().status_code, 401)
+
+        # restore() también invalida: vuelve a entrar con el mismo token
+        self.assertIsNotNone(get_user_snapshot(self.user.pk))
+        self.user.restore()
+        self.assertIsNone(cache.get(self.key))
+        self.assertEqual(self.profile().status_code, 200)
+
+    def test_deleted_user_is_rejected(self):
+        self.assertSnapshotCleared(self.user.delete)
+        response = self.profile()
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'user_not_found')
+
+
+# ----------------------------------------------------------------------
+# Pool de hashing
+# ----------------------------------------------------------------------
+
+class HashingPoolTests(TestCase):
+    """Backpressure de HashingPool y sus métricas en /metrics"""
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_rejects_when_full_and_exports_counters(self):
+        pool = HashingPool(workers=1, max_pending=1, timeout=5)
+        started, release = threading.Event(), threading.Event()
+        rejected = self.sample('password_hashing_requests_total', result='rejected')
+        completed = self.sample('password_hashing_requests_total', result='completed')
+
+        def slow_hash():
+            started.set()
+            release.wait(5)
+            return 'hash'
+
+        with ThreadPoolExecutor(1) as requests:
+            first = requests.submit(pool.run, slow_hash)
+            started.wait(5)
+            self.assertEqual(self.sample('password_hashing_tasks', state='in_flight'), 1)
+            with self.assertRaises(HashingBusy):
+                pool.run(slow_hash)
+            release.set()
+            self.assertEqual(first.result(), 'hash')
+
+        self.assertEqual(self.sample('password_hashing_tasks', state='in_flight'), 0)
+        self.assertEqual(self.sample('password_hashing_requests_total', result='rejected'), rejected + 1)
+        self.assertEqual(self.sample('password_hashing_requests_total', result='completed'), completed + 1)
+        self.assertEqual(pool.metrics()['rejected'], 1)
+
+
+# ----------------------------------------------------------------------
+# Blacklist de refresh tokens
+# ----------------------------------------------------------------------
+
+class RefreshTokenBlacklistTests(IsolatedCacheTestCase):
+    """Rotación y logout contra la blacklist en Redis (apps/users/tokens.py)"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(
+            email='paciente@example.com', username='paciente', password=SEED_PASSWORD,
+        )
+        self.client = Client()
+
+    def refresh(self, token):
+        return self.client.post(
+            reverse('users:token_refresh'), {'refresh': token}, content_type='application/json',
+        )
+
+    def test_reused_rotated_token_is_rejected(self):
+        token = str(RefreshToken.for_user(self.user))
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        rotated = response.json()['refresh']
+
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(self.refresh(rotated).status_code, 200)
+
+    def test_refresh_after_logout_is_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        response = self.client.post(
+            reverse('users:logout'), {'refresh': str(token)}, content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {token.access_token}',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(str(token)).status_code, 401)
+
+    def test_redis_error_rejects_the_token(self):
+        token = str(RefreshToken.for_user(self.user))
+        # Nada escucha en el puerto 1: la blacklist falla cerrada
+        with override_settings(JWT_BLACKLIST_REDIS_URL='redis://localhost:1/0'):
+            self.assertEqual(self.refresh(token).status_code, 401)
+        # El token no llegó a rotarse: con Redis de vuelta sigue sirviendo
+        self.assertEqual(self.refresh(token).status_code, 200)
+
+
+class TokenTablesRetentionTests(IsolatedCacheTestCase):
+    """Retención de las tablas de token_blacklist particionadas (apps/users/token_tables.py)"""
+
+    def test_dropping_outstanding_partitions_removes_orphan_blacklist(self):
+        user = User.objects.create_user(
+            email='paciente@example.com', username='paciente', password=SEED_PASSWORD,
+        )
+        month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        expired = OutstandingToken.objects.create(
+            user=user, jti='expired', token='x', expires_at=month_start - timedelta(hours=1),
+        )
+        valid = OutstandingToken.objects.create(
+            user=user, jti='valid', token='x', expires_at=timezone.now() + timedelta(days=7),
+        )
+        BlacklistedToken.objects.create(token=expired)
+        BlacklistedToken.objects.create(token=valid)
+        # blacklisted_at es auto_now_add: el expirado se blacklisteó el mes pasado
+        BlacklistedToken.objects.filter(token=expired).update(blacklisted_at=month_start - timedelta(days=1))
+
+        # Los chequeos de FK diferidos de los INSERT impedirían el ALTER TABLE
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        self.assertTrue(partition_token_tables())
+        # Primeros días del mes: la partición de tokens del mes pasado ya se
+        # borra, la de su blacklist recién después de REFRESH_TOKEN_LIFETIME
+        result = maintain_partitions(month_start + timedelta(days=2))
+
+        last_month = f'{month_start - timedelta(days=1):%Y%m}'
+        self.assertEqual(result['dropped_partitions'], [f'{OutstandingToken._meta.db_table}_p{last_month}'])
+        self.assertEqual(result['deleted_orphans'], 1)
+        self.assertEqual(
+            [entry.token.jti for entry in BlacklistedToken.objects.all()], ['valid'],
+        )
+
+
+# ----------------------------------------------------------------------
+# Datos desnormalizados
+# ----------------------------------------------------------------------
+
+class ActiveDoctorsCountTests(IsolatedCacheTestCase):
+    """Specialty.active_doctors_count (apps/users/signals.py) después de cada cambio"""
+
+    def setUp(self):
+        super().setUp()
+        self.cardio = Specialty.objects.create(name='Cardiología')
+        self.pediatria = Specialty.objects.create(name='Pediatría')
+
+    def assertCounts(self, cardio, pediatria):
+        self.cardio.refresh_from_db()
+        self.pediatria.refresh_from_db()
+        self.assertEqual(
+            (self.cardio.active_doctors_count, self.pediatria.active_doctors_count), (cardio, pediatria)
+        )
+        # Lo mismo que da recalcularlo desde la tabla intermedia
+        self.assertEqual(Specialty.objects.recompute_active_doctors_count(), 0)
+
+    def test_create(self):
+        make_doctor(1, [self.cardio, self.pediatria])
+        make_doctor(2, [self.cardio])
+        make_doctor(3, [self.cardio], is_active=False)
+        self.assertCounts(2, 1)
+
+    def test_deactivate_and_reactivate(self):
+        doctor = make_doctor(1, [self.cardio, self.pediatria])
+        doctor.is_active = False
+        doctor.save()
+        self.assertCounts(0, 0)
+        doctor.is_active = True
+        doctor.save()
+        self.assertCounts(1, 1)
+
+    def test_soft_delete_and_restore(self):
+        doctor = make_doctor(1, [self.cardio])
+        doctor.deleted_at = timezone.now()
+        doctor.save()
+        self.assertCounts(0, 0)
+        doctor.deleted_at = None
+        doctor.save()
+        self.assertCounts(1, 0)
+
+    def test_delete(self):
+        make_doctor(1, [self.cardio]).delete()
+        make_doctor(2, [self.cardio], is_active=False).delete()
+        self.assertCounts(0, 0)
+
+    def test_add_remove_clear_from_doctor(self):
+        doctor = make_doctor(1)
+        doctor.specialties.add(self.cardio, self.pediatria)
+        self.assertCounts(1, 1)
+        doctor.specialties.add(self.cardio)
+        self.assertCounts(1, 1)
+        doctor.specialties.remove(self.cardio)
+        self.assertCounts(0, 1)
+        doctor.specialties.clear()
+        self.assertCounts(0, 0)
+
+    def test_add_remove_clear_from_specialty(self):
+        active, other = make_doctor(1), make_doctor(2)
+        inactive = make_doctor(3, is_active=False)
+        self.cardio.doctors.add(active, other, inactive)
+        self.assertCounts(2, 0)
+        self.cardio.doctors.remove(other, inactive)
+        self.assertCounts(1, 0)
+        self.cardio.doctors.clear()
+        self.assertCounts(0, 0)
+
+    def test_inactive_doctor_links_do_not_count(self):
+        doctor = make_doctor(1, is_active=False)
+        doctor.specialties.add(self.cardio)
+        doctor.specialties.remove(self.cardio)
+        doctor.specialties.add(self.pediatria)
+        self.assertCounts(0, 0)
+
+    def test_set_specialties(self):
+        doctor = make_doctor(1, [self.cardio])
+        doctor.set_specialties([self.pediatria.pk])
+        self.assertCounts(0, 1)
+
+    def test_update_fields_without_visibility(self):
+        doctor = make_doctor(1, [self.cardio])
+        # is_active cambia sólo en memoria: el save parcial no lo escribe
+        doctor.is_active = False
+        doctor.bio = 'Nueva bio'
+        doctor.save(update_fields=['bio'])
+        self.assertCounts(1, 0)
+        # Un save posterior que sí lo escribe descuenta una sola vez
+        doctor.save(update_fields=['is_active'])
+        self.assertCounts(0, 0)
+        doctor.save()
+        self.assertCounts(0, 0)
+
+    def test_update_fields_with_visibility(self):
+        doctor = make_doctor(1, [self.cardio])
+        doctor.deleted_at = timezone.now()
+        doctor.save(update_fields=['deleted_at', 'updated_at'])
+        self.assertCounts(0, 0)
+
+
+class DoctorSearchDocumentTests(IsolatedCacheTestCase):
+    """Read model DoctorSearchDocument (apps/users/directory.py) después de cada cambio"""
+
+    def setUp(self):
+        super().setUp()
+        self.cardio = Specialty.objects.create(name='Cardiología')
+        self.pediatria = Specialty.objects.create(name='Pediatría')
+        self.client = Client()
+
+    def document(self, doctor):
+        return DoctorSearchDocument.objects.filter(doctor=doctor).first()
+
+    def listed_ids(self):
+        response = self.client.get(reverse('users:doctor_list'))
+        self.assertEqual(response.status_code, 200)
+        return {item['id'] for item in response.json()['results']}
+
+    def test_doctor_and_user_edits(self):
+        doctor = make_doctor(1, [self.cardio], first_name='Ana', last_name='Ruiz', address='Calle 1')
+        document = self.document(doctor)
+        self.assertEqual(
+            (document.full_name, document.address, document.specialty_names),
+            ('Ana Ruiz', 'Calle 1', ['Cardiología']),
+        )
+
+        doctor.address = 'Calle 2'
+        doctor.latitude, doctor.longitude = Decimal('-34.600000'), Decimal('-58.400000')
+        doctor.save()
+        doctor.user.last_name = 'Gómez'
+        doctor.user.save()
+
+        document = self.document(doctor)
+        self.assertEqual((document.full_name, document.address), ('Ana Gómez', 'Calle 2'))
+        self.assertEqual((document.latitude, document.longitude), (doctor.latitude, doctor.longitude))
+        self.assertEqual(document.search_name, 'ana gomez')
+
+    def test_specialty_edits(self):
+        doctor = make_doctor(1, [self.cardio])
+        doctor.specialties.add(self.pediatria)
+        self.assertCountEqual(self.document(doctor).specialty_ids, [self.cardio.pk, self.pediatria.pk])
+
+        self.cardio.name = 'Cardiología Clínica'
+        self.cardio.save()
+        document = self.document(doctor)
+        self.assertCountEqual(document.specialty_names, ['Cardiología Clínica', 'Pediatría'])
+        self.assertEqual(document.search_specialties, 'cardiologia clinica pediatria')
+
+        doctor.set_specialties([self.pediatria.pk])
+        self.assertEqual(self.document(doctor).specialty_names, ['Pediatría'])
+
+        self.pediatria.delete()
+        self.assertEqual(self.document(doctor).specialty_ids, [])
+
+    def test_deleted_when_hidden(self):
+        doctor = make_doctor(1, [self.cardio])
+
+        doctor.is_active = False
+        doctor.save()
+        self.assertIsNone(self.document(doctor))
+        doctor.is_active = True
+        doctor.save()
+        self.assertIsNotNone(self.document(doctor))
+
+        doctor.deleted_at = timezone.now()
+        doctor.save(update_fields=['deleted_at', 'updated_at'])
+        self.assertIsNone(self.document(doctor))
+        # Editar un doctor oculto no lo vuelve a publicar
+        doctor.bio = 'Nueva bio'
+        doctor.save()
+        self.assertIsNone(self.document(doctor))
+
+    def test_list_drops_hidden_doctors_without_cache_flush(self):
+        inactive = make_doctor(1, [self.cardio])
+        deleted = make_doctor(2, [self.cardio])
+        visible = make_doctor(3)
+        self.assertEqual(self.listed_ids(), {str(inactive.pk), str(deleted.pk), str(visible.pk)})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inactive.is_active = False
+            inactive.save()
+        self.assertEqual(self.listed_ids(), {str(deleted.pk), str(visible.pk)})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted.deleted_at = timezone.now()
+            deleted.save()
+        self.assertEqual(self.listed_ids(), {str(visible.pk)})
+
+
+class UserRoleTests(IsolatedCacheTestCase):
+    """User.role (apps/users/signals.py) y su backfill en la migración 0009"""
+
+    def make_user(self, name):
+        return User.objects.create_user(email=f'{name}@example.com', username=name)
+
+    def role(self, user):
+        return User.objects.values_list('role', flat=True).get(pk=user.pk)
+
+    def test_profiles_set_and_clear_the_role(self):
+        doctor_user, patient_user = self.make_user('doctor'), self.make_user('patient')
+        self.assertEqual(self.role(doctor_user), User.Role.NONE)
+
+        doctor = Doctor.objects.create(user=doctor_user, license_number='MN-R1')
+        patient = Patient.objects.create(user=patient_user, dni='30111222')
+        self.assertEqual(self.role(doctor_user), User.Role.DOCTOR)
+        self.assertEqual(self.role(patient_user), User.Role.PATIENT)
+        # El usuario cargado en el perfil también lo ve, y su save() no lo pisa
+        self.assertTrue(doctor.user.is_doctor)
+        doctor.user.first_name = 'Ana'
+        doctor.user.save()
+        self.assertEqual(self.role(doctor_user), User.Role.DOCTOR)
+        self.assertEqual(doctor.user.can_create_patient_profile()[0], False)
+
+        # Editar el perfil no cambia el rol; borrarlo lo limpia
+        patient.insurance_provider = 'OSDE'
+        patient.save()
+        self.assertEqual(self.role(patient_user), User.Role.PATIENT)
+        doctor.delete()
+        patient.delete()
+        self.assertEqual(self.role(doctor_user), User.Role.NONE)
+        self.assertEqual(self.role(patient_user), User.Role.NONE)
+
+    def test_role_change_reaches_the_auth_snapshot(self):
+        client = Client()
+        user = self.make_user('ana')
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+        self.assertFalse(client.get(reverse('users:profile'), **auth).json()['is_patient'])
+
+        patient = Patient.objects.create(user=user, dni='30111222')
+        self.assertTrue(client.get(reverse('users:profile'), **auth).json()['is_patient'])
+        patient.delete()
+        self.assertFalse(client.get(reverse('users:profile'), **auth).json()['is_patient'])
+
+    def test_backfill_matches_profile_probes(self):
+        users = {name: self.make_user(name) for name in ('none', 'doctor', 'patient', 'hidden_doctor', 'inactive')}
+        Doctor.objects.create(user=users['doctor'], license_number='MN-R1')
+        Doctor.objects.create(
+            user=users['hidden_doctor'], license_number='MN-R2', is_active=False, deleted_at=timezone.now()
+        )
+        Patient.objects.create(user=users['inactive'], dni='30111222')
+        users['inactive'].soft_delete()
+        Patient.objects.create(user=users['patient'], dni='30111223')
+
+        # Como antes de la migración: sin rol guardado
+        User.objects.update(role=User.Role.NONE)
+        backfill_role(django_apps, None)
+
+        for name, user in users.items():
+            # Lo que respondían is_doctor / is_patient (hasattr del perfil)
+            probes = (
+                Doctor.objects.filter(user=user).exists(),
+                Patient.objects.filter(user=user).exists(),
+            )
+            user.refresh_from_db()
+            self.assertEqual((user.is_doctor, user.is_patient), probes, name)
+
+
+class SetSpecialtiesConcurrencyTests(TransactionTestCase):
+    """Doctor.set_specialties() concurrente sobre el mismo doctor (cada thread con su conexión)"""
+
+    def setUp(self):
+        caches = {'default': {**settings.CACHES['default'], 'KEY_PREFIX': f'test-{uuid.uuid4().hex[:8]}'}}
+        self.cache_override = override_settings(CACHES=caches)
+        self.cache_override.enable()
+
+    def tearDown(self):
+        cache.delete_pattern('*')
+        self.cache_override.disable()
+
+    def test_same_links_from_two_requests(self):
+        cardio = Specialty.objects.create(name='Cardiología')
+        doctor = make_doctor(1)
+        barrier = threading.Barrier(2)
+
+        def assign():
+            try:
+                barrier.wait()
+                Doctor.objects.get(pk=doctor.pk).set_specialties([cardio.pk])
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(2) as pool:
+            for future in [pool.submit(assign) for _ in range(2)]:
+                future.result()
+
+        cardio.refresh_from_db()
+        self.assertEqual(cardio.active_doctors_count, 1)
+        self.assertEqual(Specialty.objects.recompute_active_doctors_count(), 0)
+
+
+class ResponseCacheTests(IsolatedCacheTestCase):
+    """Una escritura incrementa las versiones (bump_on_commit) y el GET siguiente no usa el cache"""
+
+    def setUp(self):
+        super().setUp()
+        self.cardio = Specialty.objects.create(name='Cardiología')
+        self.doctor = make_doctor(1, [self.cardio])
+        self.client = Client()
+        self.detail_url = reverse('users:doctor_detail', kwargs={'doctor_id': self.doctor.pk})
+        self.list_url = reverse('users:doctor_list')
+
+    def get(self, url, urlconf=None):
+        with override_settings(ROOT_URLCONF=urlconf or settings.ROOT_URLCONF):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def assertCached(self, url):
+        """El GET sale del cache: ninguna query"""
+        recorder = _QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            self.get(url)
+        self.assertEqual(recorder.executed, [])
+
+    def test_api_write_refreshes_detail_and_list(self):
+        self.assertEqual(self.get(self.detail_url)['address'], '')
+        self.assertEqual(self.get(self.list_url)['results'][0]['address'], '')
+        self.assertCached(self.detail_url)
+        self.assertCached(self.list_url)
+
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.doctor.user).access_token}'}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                reverse('users:doctor_profile'), {'address': 'Av. Corrientes 1234'},
+                content_type='application/json', **auth,
+            )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.get(self.detail_url)['address'], 'Av. Corrientes 1234')
+        self.assertEqual(self.get(self.list_url)['results'][0]['address'], 'Av. Corrientes 1234')
+
+    def test_async_views_share_versions(self):
+        async_url = reverse('doctor_detail_async', urlconf=__name__, kwargs={'doctor_id': self.doctor.pk})
+        self.assertEqual(self.get(async_url, urlconf=__name__)['bio'], '')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doctor.bio = 'Nueva bio'
+            self.doctor.save()
+
+        self.assertEqual(self.get(async_url, urlconf=__name__)['bio'], 'Nueva bio')
+        self.assertEqual(self.get(self.detail_url)['bio'], 'Nueva bio')
+
+    def test_specialty_and_visibility_changes(self):
+        self.assertEqual(self.get(reverse('users:specialty_list'))['results'][0]['doctors_count'], 1)
+        self.assertEqual(len(self.get(self.list_url)['results']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cardio.name = 'Cardiología Clínica'
+            self.cardio.save()
+            self.doctor.is_active = False
+            self.doctor.save()
+
+        specialty = self.get(reverse('users:specialty_list'))['results'][0]
+        self.assertEqual((specialty['name'], specialty['doctors_count']), ('Cardiología Clínica', 0))
+        self.assertEqual(self.get(self.list_url)['results'], [])
+
+    def test_bump_waits_for_commit(self):
+        self.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.doctor.bio = 'Nueva bio'
+            self.doctor.save()
+        # Sin commit todavía: la versión no cambió
+        self.assertEqual(self.get(self.detail_url)['bio'], '')
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.get(self.detail_url)['bio'], 'Nueva bio')
+
+    def test_profile_last_modified_follows_specialties(self):
+        """Un cliente que sólo manda If-Modified-Since ve los cambios de especialidades"""
+        url = reverse('users:doctor_profile')
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.doctor.user).access_token}'}
+        pediatria = Specialty.objects.create(name='Pediatría')
+        # Last-Modified tiene resolución de segundos: el perfil se modificó hace un rato
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        User.objects.filter(pk=self.doctor.user_id).update(updated_at=an_hour_ago)
+
+        def assertModified(change):
+            Doctor.objects.filter(pk=self.doctor.pk).update(updated_at=an_hour_ago)
+            last_modified = self.client.get(url, **auth)['Last-Modified']
+            self.assertEqual(
+                self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified, **auth).status_code, 304
+            )
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            self.assertEqual(
+                self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified, **auth).status_code, 200
+            )
+
+        assertModified(lambda: self.doctor.specialties.add(pediatria))
+        assertModified(lambda: pediatria.doctors.remove(self.doctor))
+        assertModified(lambda: self.doctor.set_specialties([pediatria.pk]))
+
+        def rename():
+            pediatria.name = 'Pediatría General'
+            pediatria.save()
+
+        assertModified(rename)
+
+
+# ----------------------------------------------------------------------
+# Importación
+# ----------------------------------------------------------------------
+
+class ImportDoctorsTests(IsolatedCacheTestCase):
+    """`manage.py import_doctors` (apps/users/importer.py)"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = directory.name
+
+    def row(self, number, **fields):
+        return {
+            'email': f'import{number}@example.com',
+            'first_name': 'Ana',
+            'last_name': f'Import{number}',
+            'license_number': f'MN-I{number}',
+            **fields,
+        }
+
+    def write(self, rows, name='doctores.jsonl'):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w', encoding='utf-8') as output:
+            for row in rows:
+                output.write((row if isinstance(row, str) else json.dumps(row)) + '\n')
+        return path
+
+    def run_import(self, path, **options):
+        out = io.StringIO()
+        call_command('import_doctors', path, workers=0, stdout=out, stderr=io.StringIO(), **options)
+        return out.getvalue()
+
+    def rejected(self, errors_path):
+        with open(errors_path, encoding='utf-8') as source:
+            return {line['row']: line['errors'] for line in map(json.loads, source)}
+
+    def imported(self):
+        return set(User.objects.filter(email__startswith='import').values_list('email', flat=True))
+
+    def test_duplicate_rows_are_rejected(self):
+        make_doctor(0)
+        errors = os.path.join(self.dir, 'rechazados.jsonl')
+        path = self.write([
+            self.row(1),
+            self.row(2, email='IMPORT1@example.com'),   # email (y username) repetido, distinto caso
+            self.row(3, license_number='MN-I1'),       # matrícula de un lote ya importado
+            self.row(4, email='doctor0@example.com'),  # email ya en la base
+            self.row(5, license_number='MN-T0'),       # matrícula ya en la base
+            self.row(6),
+        ])
+        self.run_import(path, batch_size=2, errors=errors)
+
+        self.assertEqual(self.imported(), {'import1@example.com', 'import6@example.com'})
+        rejected = self.rejected(errors)
+        self.assertEqual(rejected, {
+            2: {'email': ['Repetido en el archivo.'], 'username': ['Repetido en el archivo.']},
+            3: {'license_number': ['Ya existe.']},
+            4: {'email': ['Ya existe.']},
+            5: {'license_number': ['Ya existe.']},
+        })
+
+    def test_invalid_rows_are_rejected(self):
+        errors = os.path.join(self.dir, 'rechazados.jsonl')
+        path = self.write([
+            self.row(1, specialties=['Cardiología']),
+            self.row(2, email='no-es-un-email'),
+            {'email': 'import3@example.com', 'first_name': 'Sin matrícula', 'last_name': 'X'},
+            self.row(4, password='corta'),
+            self.row(5, latitude='no-es-un-numero'),
+            '{"email": ',
+            self.row(7, password='Password-larga-1'),
+        ])
+        output = self.run_import(path, batch_size=10, errors=errors)
+
+        self.assertIn('2 doctores importados, 5 filas rechazadas', output)
+        self.assertEqual(self.imported(), {'import1@example.com', 'import7@example.com'})
+        rejected = self.rejected(errors)
+        self.assertEqual(sorted(rejected), [2, 3, 4, 5, 6])
+        self.assertIn('email', rejected[2])
+        self.assertIn('license_number', rejected[3])
+        self.assertIn('password', rejected[4])
+        self.assertIn('latitude', rejected[5])
+        self.assertIn('row', rejected[6])
+
+        # Los importados quedan publicados, con su rol y su password (o pendiente de invitación)
+        doctor = Doctor.objects.select_related('user').get(user__email='import1@example.com')
+        self.assertEqual(doctor.user.role, User.Role.DOCTOR)
+        self.assertFalse(doctor.user.has_usable_password())
+        self.assertTrue(User.objects.get(email='import7@example.com').check_password('Password-larga-1'))
+        self.assertEqual(DoctorSearchDocument.objects.get(doctor=doctor).specialty_names, ['Cardiología'])
+
+    def test_resume_from_checkpoint(self):
+        path = self.write([self.row(number) for number in range(1, 6)])
+        create = DoctorImporter.create
+        calls = []
+
+        def crash_on_second_batch(importer, rows):
+            calls.append([number for number, _ in rows])
+            if len(calls) == 2:
+                raise RuntimeError('corte')
+            return create(importer, rows)
+
+        with mock.patch.object(DoctorImporter, 'create', crash_on_second_batch):
+            with self.assertRaises(RuntimeError):
+                self.run_import(path, batch_size=2)
+        self.assertEqual(self.imported(), {'import1@example.com', 'import2@example.com'})
+        with open(f'{path}.checkpoint', encoding='utf-8') as source:
+            self.assertEqual(json.load(source)['rows_done'], 2)
+
+        # Retoma en la fila 3: las ya importadas no se reintentan (serían "Ya existe.")
+        output = self.run_import(path, batch_size=2)
+        self.assertIn('Retomando después de la fila 2.', output)
+        self.assertIn('5 doctores importados, 0 filas rechazadas', output)
+        self.assertEqual(self.imported(), {f'import{number}@example.com' for number in range(1, 6)})
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+    def test_specialties_match_ignoring_case_and_accents(self):
+        cardio = Specialty.objects.create(name='Cardiología')
+        path = self.write([
+            self.row(1, specialties=['cardiologia', 'CARDIOLOGÍA']),
+            self.row(2, specialties=['Cardiología', 'pediatría']),
+            self.row(3, specialties=['Pediatria']),
+        ])
+        self.run_import(path, batch_size=2)
+
+        self.assertEqual(sorted(Specialty.objects.values_list('name', flat=True)), ['Cardiología', 'pediatría'])
+        pediatria = Specialty.objects.get(name='pediatría')
+        links = Specialty.doctors.through.objects.filter(doctor__user__email__startswith='import')
+        self.assertEqual(
+            Counter(links.values_list('specialty_id', flat=True)), {cardio.pk: 2, pediatria.pk: 2}
+        )
+        cardio.refresh_from_db()
+        pediatria.refresh_from_db()
+        self.assertEqual((cardio.active_doctors_count, pediatria.active_doctors_count), (2, 2))
+
+
+# ----------------------------------------------------------------------
+# Dataset sintético
+# ----------------------------------------------------------------------
+
+class SeedDatasetTests(IsolatedCacheTestCase):
+    """seed_dataset(): la misma semilla da los mismos datos, con cualquier tamaño de lote"""
+
+    def dataset(self, **options):
+        seed_dataset(**QueryBudgetTests.SMALL, workers=0, **options)
+        Link = Doctor.specialties.through
+        data = {
+            'users': sorted(User.objects.values_list('pk', 'email', 'username', 'role')),
+            'specialties': sorted(Specialty.objects.values_list('pk', 'name')),
+            'doctors': sorted(Doctor.objects.values_list('pk', 'user_id', 'license_number', 'latitude')),
+            'patients': sorted(Patient.objects.values_list('pk', 'user_id', 'dni')),
+            'links': sorted(Link.objects.values_list('doctor_id', 'specialty_id')),
+        }
+        User.objects.all().delete()
+        Specialty.objects.all().delete()
+        return data
+
+    def test_same_seed_same_dataset(self):
+        first = self.dataset(batch_size=5)
+        second = self.dataset(batch_size=7)
+        self.assertEqual(len(first['users']), QueryBudgetTests.SMALL['users'])
+        self.assertTrue(first['links'])
+        for name in first:
+            self.assertEqual(first[name], second[name], name)
+
+        other = self.dataset(batch_size=5, seed=7)
+        self.assertNotEqual(first['users'], other['users'])
@@ -0,0 +1,344 @@
+# apps/users/token_tables.py
+"""
+Retención de las tablas de token_blacklist (OutstandingToken / BlacklistedToken).
+
+simplejwt agrega filas y nunca las borra. prune_token_tables() (la corre
+Celery beat cada hora, ver apps/users/tasks.py) trabaja en dos modos:
+
+- Tablas comunes: borra los tokens vencidos en lotes de
+  JWT_PRUNE_BATCH_SIZE, cada lote en su propia transacción corta
+  (FOR UPDATE SKIP LOCKED: no espera a filas bloqueadas por otros) y
+  con una pausa entre lotes para no acaparar I/O.
+
+- Tablas particionadas por mes (ver partition_token_tables()): la
+  retención es un DROP de las particiones viejas, y se crean de antemano
+  las de los próximos meses.
+      outstandingtoken   por expires_at: una partición se borra cuando
+                         termina su mes (todos sus tokens vencieron)
+      blacklistedtoken   por blacklisted_at: se borra cuando terminó su
+                         mes + REFRESH_TOKEN_LIFETIME (ningún token
+                         blacklisteado en ese mes sigue vigente)
+  Las ventanas no coinciden y no hay FK entre las tablas: al borrar una
+  partición de outstandingtoken, en la misma transacción se borran las
+  entradas de blacklist de esos tokens (si no, BlacklistedToken.token
+  lanzaría DoesNotExist). No hay ventana con huérfanos.
+
+Cada corrida devuelve y guarda en el cache (PRUNE_STATS_KEY) la
+duración, lo borrado y el tamaño de las tablas, para métricas.
+"""
+
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+logger = logging.getLogger(__name__)
+
+PRUNE_STATS_KEY = 'jwt:prune:last'
+
+OUTSTANDING = OutstandingToken._meta.db_table
+BLACKLISTED = BlacklistedToken._meta.db_table
+
+# (tabla, columna de partición)
+PARTITIONED_TABLES = (
+    (OUTSTANDING, 'expires_at'),
+    (BLACKLISTED, 'blacklisted_at'),
+)
+
+# Meses por delante con partición ya creada
+PARTITION_MONTHS_AHEAD = 3
+
+
+# ----------------------------------------------------------------------
+# Helpers de SQL
+# ----------------------------------------------------------------------
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+def _month_start(moment):
+    return datetime(moment.year, moment.month, 1, tzinfo=dt_timezone.utc)
+
+
+def _add_months(moment, months):
+    month = moment.month - 1 + months
+    return moment.replace(year=moment.year + month // 12, month=month % 12 + 1)
+
+
+def _partition_name(table, month):
+    return f'{table}_p{month:%Y%m}'
+
+
+def is_partitioned(table=OUTSTANDING):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def table_stats():
+    """
+    Filas (estimadas por el planner, sin COUNT) y bytes en disco de cada
+    tabla, sumando sus particiones.
+    """
+    stats = {}
+    with connection.cursor() as cursor:
+        for table, _ in PARTITIONED_TABLES:
+            cursor.execute(
+                """
+                SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint,
+                       COALESCE(SUM(pg_total_relation_size(c.oid)), 0)::bigint,
+                       COUNT(*) FILTER (WHERE c.relispartition)
+                FROM pg_class c
+                WHERE c.relkind = 'r'
+                  AND (c.oid = to_regclass(%s)
+                       OR c.oid IN (SELECT relid FROM pg_partition_tree(%s)))
+                """,
+                [table, table],
+            )
+            rows, size, partitions = cursor.fetchone()
+            stats[table] = {'rows': rows, 'bytes': size, 'partitions': partitions}
+    return stats
+
+
+# ----------------------------------------------------------------------
+# Modo tablas comunes: DELETE en lotes
+# ----------------------------------------------------------------------
+
+def delete_expired_batch(now, batch_size):
+    """
+    Borra hasta batch_size tokens vencidos (y sus entradas de blacklist).
+
+    Un solo statement: los lotes salen en orden de id, que sigue al de
+    vencimiento (todos los refresh tienen la misma duración), así que
+    recorre el índice de la PK desde el principio.
+    Devuelve (outstanding borrados, blacklisted borrados).
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH batch AS (
+                SELECT id FROM {_qn(OUTSTANDING)}
+                WHERE expires_at < %s
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            ), blacklisted AS (
+                DELETE FROM {_qn(BLACKLISTED)}
+                WHERE token_id IN (SELECT id FROM batch)
+                RETURNING 1
+            ), outstanding AS (
+                DELETE FROM {_qn(OUTSTANDING)}
+                WHERE id IN (SELECT id FROM batch)
+                RETURNING 1
+            )
+            SELECT (SELECT COUNT(*) FROM outstanding), (SELECT COUNT(*) FROM blacklisted)
+            """,
+            [now, batch_size],
+        )
+        return cursor.fetchone()
+
+
+def delete_expired(now, batch_size, pause):
+    deleted_outstanding = deleted_blacklisted = batches = 0
+    while True:
+        outstanding, blacklisted = delete_expired_batch(now, batch_size)
+        deleted_outstanding += outstanding
+        deleted_blacklisted += blacklisted
+        batches += 1
+        if outstanding < batch_size:
+            break
+        time.sleep(pause)
+    return {
+        'deleted_outstanding': deleted_outstanding,
+        'deleted_blacklisted': deleted_blacklisted,
+        'batches': batches,
+    }
+
+
+# ----------------------------------------------------------------------
+# Modo particionado
+# ----------------------------------------------------------------------
+
+def _existing_partitions(cursor, table):
+    """{nombre de partición: fin del rango} (sin la DEFAULT)"""
+    cursor.execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        """,
+        [table],
+    )
+    partitions = {}
+    for name, bound in cursor.fetchall():
+        if bound == 'DEFAULT':
+            continue
+        # FOR VALUES FROM ('2026-01-01 00:00:00+00') TO ('2026-02-01 00:00:00+00')
+        upper = bound.rsplit("('", 1)[1].split("')", 1)[0]
+        partitions[name] = datetime.fromisoformat(upper)
+    return partitions
+
+
+def _create_partition(cursor, table, month):
+    name = _partition_name(table, month)
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {_qn(name)} PARTITION OF {_qn(table)} "
+        f"FOR VALUES FROM (%s) TO (%s)",
+        [month, _add_months(month, 1)],
+    )
+    return name
+
+
+def delete_orphan_blacklisted(cursor, before):
+    """
+    Borra las entradas de blacklist cuyo token ya no está en outstandingtoken.
+
+    Sólo pueden ser de tokens que vencieron antes de `before` (el inicio del
+    mes actual, hasta donde llegan las particiones borradas) y un token se
+    blacklistea antes de vencer: alcanza con mirar blacklisted_at < before.
+    """
+    cursor.execute(
+        f"""
+        DELETE FROM {_qn(BLACKLISTED)} b
+        WHERE b.blacklisted_at < %s
+          AND NOT EXISTS (SELECT 1 FROM {_qn(OUTSTANDING)} o WHERE o.id = b.token_id)
+        """,
+        [before],
+    )
+    return cursor.rowcount
+
+
+def maintain_partitions(now):
+    """Crea las particiones de los próximos meses y borra las vencidas"""
+    created, dropped = [], []
+    deleted_orphans = 0
+    current = _month_start(now)
+    retention = {
+        OUTSTANDING: now,
+        BLACKLISTED: now - api_settings.REFRESH_TOKEN_LIFETIME,
+    }
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table, _ in PARTITIONED_TABLES:
+            existing = _existing_partitions(cursor, table)
+            for offset in range(PARTITION_MONTHS_AHEAD + 1):
+                month = _add_months(current, offset)
+                if _partition_name(table, month) not in existing:
+                    created.append(_create_partition(cursor, table, month))
+            for name, upper in sorted(existing.items()):
+                if upper <= retention[table]:
+                    cursor.execute(f'DROP TABLE {_qn(name)}')
+                    dropped.append(name)
+        # Sólo aparecen huérfanos al borrar tokens (incluye los de corridas anteriores)
+        if any(name.startswith(f'{OUTSTANDING}_p') for name in dropped):
+            deleted_orphans = delete_orphan_blacklisted(cursor, current)
+    return {
+        'created_partitions': created,
+        'dropped_partitions': dropped,
+        'deleted_orphans': deleted_orphans,
+    }
+
+
+def partition_token_tables():
+    """
+    Convierte las dos tablas a particionadas por mes (una sola vez).
+
+    Copia las filas a la tabla nueva dentro de una transacción con las
+    tablas bloqueadas: correrlo en una ventana de mantenimiento. Postgres
+    exige que la PK y los UNIQUE incluyan la columna de partición, así
+    que quedan (id, <columna>) y (jti, expires_at) / (token_id,
+    blacklisted_at), y se quita la FK blacklistedtoken -> outstandingtoken.
+    Una partición DEFAULT recibe lo que caiga fuera de los meses creados.
+    """
+    if is_partitioned(OUTSTANDING):
+        return False
+
+    now = timezone.now()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {_qn(OUTSTANDING)}, {_qn(BLACKLISTED)} IN ACCESS EXCLUSIVE MODE')
+
+        # FK blacklisted -> outstanding (no se puede apuntar a una tabla particionada sin la clave)
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) "
+            "AND confrelid = to_regclass(%s) AND contype = 'f'",
+            [BLACKLISTED, OUTSTANDING],
+        )
+        for (name,) in cursor.fetchall():
+            cursor.execute(f'ALTER TABLE {_qn(BLACKLISTED)} DROP CONSTRAINT {_qn(name)}')
+
+        for table, column in PARTITIONED_TABLES:
+            legacy = f'{table}_legacy'
+            sequence = f'{table}_id_seq'
+            cursor.execute(f'ALTER TABLE {_qn(table)} RENAME TO {_qn(legacy)}')
+            cursor.execute(
+                f'CREATE TABLE {_qn(table)} (LIKE {_qn(legacy)} INCLUDING DEFAULTS) '
+                f'PARTITION BY RANGE ({_qn(column)})'
+            )
+
+            # Particiones: desde el mes de la fila más vieja hasta PARTITION_MONTHS_AHEAD
+            cursor.execute(f'SELECT MIN({_qn(column)}) FROM {_qn(legacy)}')
+            oldest = cursor.fetchone()[0] or now
+            month = _month_start(oldest)
+            last = _add_months(_month_start(now), PARTITION_MONTHS_AHEAD)
+            while month <= last:
+                _create_partition(cursor, table, month)
+                month = _add_months(month, 1)
+            cursor.execute(f'CREATE TABLE {_qn(table + "_default")} PARTITION OF {_qn(table)} DEFAULT')
+
+            cursor.execute(f'INSERT INTO {_qn(table)} SELECT * FROM {_qn(legacy)}')
+            cursor.execute(f'DROP TABLE {_qn(legacy)}')
+
+            # La identity no se copia con LIKE: secuencia propia desde el último id
+            cursor.execute(f'CREATE SEQUENCE {_qn(sequence)} OWNED BY {_qn(table)}.id')
+            cursor.execute(
+                f"SELECT setval(%s, COALESCE((SELECT MAX(id) FROM {_qn(table)}), 0) + 1, false)",
+                [sequence],
+            )
+            cursor.execute(
+                f"ALTER TABLE {_qn(table)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)",
+                [sequence],
+            )
+            cursor.execute(f'ALTER TABLE {_qn(table)} ADD PRIMARY KEY (id, {_qn(column)})')
+
+        cursor.execute(f'ALTER TABLE {_qn(OUTSTANDING)} ADD UNIQUE (jti, expires_at)')
+        cursor.execute(f'CREATE INDEX ON {_qn(OUTSTANDING)} (jti)')
+        cursor.execute(f'CREATE INDEX ON {_qn(OUTSTANDING)} (user_id)')
+        cursor.execute(
+            f'ALTER TABLE {_qn(OUTSTANDING)} ADD FOREIGN KEY (user_id) '
+            f'REFERENCES {_qn(OutstandingToken._meta.get_field("user").related_model._meta.db_table)} (id) '
+            f'DEFERRABLE INITIALLY DEFERRED'
+        )
+        cursor.execute(f'ALTER TABLE {_qn(BLACKLISTED)} ADD UNIQUE (token_id, blacklisted_at)')
+    return True
+
+
+# ----------------------------------------------------------------------
+# Entrada principal
+# ----------------------------------------------------------------------
+
+def prune_token_tables(batch_size=None, pause=None):
+    """Aplica la retención según el modo de las tablas y devuelve las métricas"""
+    batch_size = batch_size or settings.JWT_PRUNE_BATCH_SIZE
+    pause = settings.JWT_PRUNE_PAUSE if pause is None else pause
+
+    started = time.perf_counter()
+    now = timezone.now()
+    if is_partitioned(OUTSTANDING):
+        result = {'mode': 'partitions', **maintain_partitions(now)}
+    else:
+        result = {'mode': 'delete', **delete_expired(now, batch_size, pause)}
+    result['duration_seconds'] = round(time.perf_counter() - started, 3)
+    result['finished_at'] = timezone.now().isoformat()
+    result['tables'] = table_stats()
+
+    cache.set(PRUNE_STATS_KEY, result, timeout=None)
+    logger.info('Retención de tokens JWT: %s', result)
+    return result
@@ -0,0 +1,142 @@
+# apps/users/tokens.py
+"""
+Blacklist de refresh tokens en Redis.
+
+Con ROTATE_REFRESH_TOKENS + BLACKLIST_AFTER_ROTATION, simplejwt escribe
+en las tablas de token_blacklist en cada /api/auth/token/refresh/ y en
+cada logout, y las consulta al verificar. Acá la blacklist vive en Redis:
+- una clave jwt:bl:<jti> por token, con TTL hasta su `exp` (después el
+  token ya no sirve, así que no hace falta recordarlo)
+- al rotar, SET NX revisa y agrega en un solo round-trip: si dos
+  requests intentan rotar el mismo token a la vez, sólo uno gana
+- si Redis no responde, el token se rechaza (la blacklist falla cerrada)
+
+No usa el Redis del cache (CACHES), que es descartable: un FLUSHDB o la
+eviction por memoria borrarían claves y un token ya rotado volvería a
+servir. Va a JWT_BLACKLIST_REDIS_URL, una instancia configurada con
+maxmemory-policy noeviction (y persistencia): si se llena, rechaza las
+escrituras y el refresh falla cerrado en vez de olvidar tokens.
+
+Con JWT_BLACKLIST_DB_AUDIT = True además se escriben OutstandingToken /
+BlacklistedToken como antes, para auditoría (con su costo en Postgres).
+"""
+
+import time
+
+import redis
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from redis.exceptions import RedisError
+from rest_framework import serializers
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+BLACKLIST_KEY = 'jwt:bl:{}'
+
+# Segundos antes de dar a Redis por caído (y rechazar el token)
+REDIS_TIMEOUT = 2
+
+_clients = {}
+
+
+def _redis():
+    """Cliente de JWT_BLACKLIST_REDIS_URL (uno por URL, con su pool de conexiones)"""
+    url = settings.JWT_BLACKLIST_REDIS_URL
+    client = _clients.get(url)
+    if client is None:
+        client = _clients[url] = redis.Redis.from_url(
+            url, socket_timeout=REDIS_TIMEOUT, socket_connect_timeout=REDIS_TIMEOUT,
+        )
+    return client
+
+
+def is_blacklisted(jti):
+    try:
+        return bool(_redis().exists(BLACKLIST_KEY.format(jti)))
+    except (RedisError, OSError):
+        raise TokenError(_('No se pudo verificar el token. Reintentá en unos segundos.'))
+
+
+def add_to_blacklist(jti, exp):
+    """
+    Agrega el jti hasta su vencimiento.
+
+    Devuelve False si ya estaba (otro request lo blacklisteó antes).
+    """
+    ttl = int(exp - time.time()) + 1
+    if ttl <= 0:
+        # Ya vencido: lo rechaza la verificación de exp, no hace falta guardarlo
+        return True
+    try:
+        return bool(_redis().set(BLACKLIST_KEY.format(jti), 1, nx=True, ex=ttl))
+    except (RedisError, OSError):
+        raise TokenError(_('No se pudo invalidar el token. Reintentá en unos segundos.'))
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    RefreshToken de simplejwt con la blacklist en Redis.
+
+    skip_blacklist_check: verifica firma, tipo y vencimiento pero no la
+    blacklist (la rotación la resuelve con el SET NX de blacklist()).
+    """
+
+    def __init__(self, token=None, verify=True, skip_blacklist_check=False):
+        self.skip_blacklist_check = skip_blacklist_check
+        super().__init__(token, verify)
+
+    def check_blacklist(self):
+        if self.skip_blacklist_check:
+            return
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        """Blacklistea el token. Devuelve False si ya estaba blacklisteado."""
+        added = add_to_blacklist(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        if added and settings.JWT_BLACKLIST_DB_AUDIT:
+            super().blacklist()
+        return added
+
+    @classmethod
+    def for_user(cls, user):
+        if settings.JWT_BLACKLIST_DB_AUDIT:
+            # Registra el OutstandingToken (BlacklistMixin)
+            return super().for_user(user)
+        # Salteamos BlacklistMixin.for_user: sin INSERT por login
+        return super(tokens.BlacklistMixin, cls).for_user(user)
+
+
+class TokenRefreshSerializer(serializers.Serializer):
+    """
+    /api/auth/token/refresh/ sin Postgres.
+
+    Igual que el de simplejwt, pero la rotación blacklistea con SET NX:
+    si el token ya había sido rotado (reuso o dos refresh simultáneos)
+    se rechaza en vez de emitir otro par de tokens. Los TokenError los
+    convierte en 401 TokenRefreshView.
+    """
+
+    refresh = serializers.CharField()
+    access = serializers.CharField(read_only=True)
+
+    def validate(self, attrs):
+        rotate = api_settings.ROTATE_REFRESH_TOKENS
+        blacklist_after = rotate and api_settings.BLACKLIST_AFTER_ROTATION
+
+        refresh = RefreshToken(attrs['refresh'], skip_blacklist_check=blacklist_after)
+
+        data = {'access': str(refresh.access_token)}
+
+        if rotate:
+            if blacklist_after and not refresh.blacklist():
+                raise TokenError(_('Token is blacklisted'))
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+
+            data['refresh'] = str(refresh)
+
+        return data
@@ -9,6 +9,7 @@ URLs de autenticación.
 /api/auth/token/refresh/ POST   Refrescar token JWT
 """
 
+from django.db import transaction
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 
@@ -20,6 +21,11 @@ urlpatterns = [
     path('logout/', logout, name='logout'),
     path('profile/', profile, name='profile'),
     
-    # JWT token refresh (viene de simplejwt)
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    # JWT token refresh (viene de simplejwt; blacklist en Redis, ver apps/users/tokens.py).
+    # Fuera de ATOMIC_REQUESTS: no toca Postgres, no hace falta abrir una transacción
+    path(
+        'token/refresh/',
+        transaction.non_atomic_requests(TokenRefreshView.as_view()),
+        name='token_refresh'
+    ),
 ]
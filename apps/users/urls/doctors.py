@@ -4,15 +4,33 @@ URLs de doctores.
 
 /api/doctors/               GET         Listar doctores
 /api/doctors/profile/       GET/POST/PUT Mi perfil de doctor
+/api/doctors/nearby/        GET         Doctores cerca de un punto
+/api/doctors/export/        GET         Exportar directorio (JSONL / CSV, staff)
 /api/doctors/<uuid:id>/     GET         Detalle de un doctor
+
+Con ASYNC_PUBLIC_VIEWS el listado y el detalle usan las views async.
 """
 
+from django.conf import settings
 from django.urls import path
 
-from apps.users.views import doctor_profile, doctor_list, doctor_detail
+from apps.users.views import (
+    doctor_profile,
+    doctor_list,
+    doctor_list_async,
+    doctor_nearby,
+    doctor_detail,
+    doctor_detail_async,
+    doctor_export,
+)
+
+if settings.ASYNC_PUBLIC_VIEWS:
+    doctor_list, doctor_detail = doctor_list_async, doctor_detail_async
 
 urlpatterns = [
     path('', doctor_list, name='doctor_list'),
     path('profile/', doctor_profile, name='doctor_profile'),
+    path('nearby/', doctor_nearby, name='doctor_nearby'),
+    path('export/', doctor_export, name='doctor_export'),
     path('<uuid:doctor_id>/', doctor_detail, name='doctor_detail'),
 ]
@@ -4,11 +4,22 @@ URLs de especialidades.
 
 /api/specialties/               GET     Listar especialidades
 /api/specialties/<uuid:id>/     GET     Detalle de especialidad
+
+Con ASYNC_PUBLIC_VIEWS se usan las views async.
 """
 
+from django.conf import settings
 from django.urls import path
 
-from apps.users.views import specialty_list, specialty_detail
+from apps.users.views import (
+    specialty_list,
+    specialty_list_async,
+    specialty_detail,
+    specialty_detail_async,
+)
+
+if settings.ASYNC_PUBLIC_VIEWS:
+    specialty_list, specialty_detail = specialty_list_async, specialty_detail_async
 
 urlpatterns = [
     path('', specialty_list, name='specialty_list'),
@@ -1,9 +1,16 @@
 # apps/users/views/__init__.py
 
 from .auth import register, login, logout, profile
-from .doctor import doctor_profile, doctor_list, doctor_detail
+from .doctor import doctor_profile, doctor_list, doctor_nearby, doctor_detail, doctor_export
 from .patient import patient_profile
 from .specialty import specialty_list, specialty_detail
+from .metrics import metrics
+from .public_async import (
+    doctor_list_async,
+    doctor_detail_async,
+    specialty_list_async,
+    specialty_detail_async,
+)
 
 __all__ = [
     # Auth
@@ -14,10 +21,19 @@ __all__ = [
     # Doctor
     'doctor_profile',
     'doctor_list',
+    'doctor_nearby',
     'doctor_detail',
+    'doctor_export',
     # Patient
     'patient_profile',
     # Specialty
     'specialty_list',
     'specialty_detail',
-]
\ No newline at end of file
+    # Métricas (Prometheus)
+    'metrics',
+    # Lectura pública async (ASGI)
+    'doctor_list_async',
+    'doctor_detail_async',
+    'specialty_list_async',
+    'specialty_detail_async',
+]
@@ -7,13 +7,13 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from apps.users.serializers import (
     RegisterSerializer,
     LoginSerializer,
     UserSerializer,
 )
+from apps.users.tokens import RefreshToken
 
 
 @api_view(['POST'])
@@ -3,19 +3,32 @@
 Views para doctores.
 """
 
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
-from django.db.models import Q
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 
-from apps.users.models import Doctor
+from apps.users.cache import cache_response, doctor_namespace, get_versions
+from apps.users.conditional import etag_from_versions, make_etag, not_modified, set_validators
+from apps.users.export import CONTENT_TYPES, EXPORT_FORMATS, export_chunks
+from apps.users.geo import bounding_box, haversine_expression
+from apps.users.models import Doctor, DoctorSearchDocument
+from apps.users.pagination import DoctorCursorPagination, DoctorSearchPagination
+from apps.users.search import filter_by_specialty, search_doctors
 from apps.users.serializers import (
     DoctorSerializer,
+    DoctorCardSerializer,
     DoctorCreateSerializer,
     DoctorUpdateSerializer,
+    wants_fieldset,
 )
 
+# Búsqueda por cercanía
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 200
+
 
 @api_view(['GET', 'POST', 'PUT'])
 @permission_classes([IsAuthenticated])
@@ -24,7 +37,7 @@ def doctor_profile(request):
     Gestionar MI perfil de doctor.
     
     GET /api/doctors/profile/
-    - Ver mi perfil de doctor
+    - Ver mi perfil de doctor (soporta If-None-Match / If-Modified-Since)
     
     POST /api/doctors/profile/
     - Crear mi perfil de doctor
@@ -48,8 +61,27 @@ def doctor_profile(request):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        serializer = DoctorSerializer(request.user.doctor_profile)
-        return Response(serializer.data)
+        doctor = request.user.doctor_profile
+        
+        # Validadores con lo ya cargado + versión del cache. Los cambios de
+        # especialidades (vínculos o renombres) también mueven doctor.updated_at
+        last_modified = max(doctor.updated_at, request.user.updated_at)
+        etag = make_etag(
+            doctor.pk,
+            last_modified.isoformat(),
+            *get_versions((doctor_namespace(doctor.pk), 'specialties')),
+        )
+        response = not_modified(request, etag=etag, last_modified=last_modified, private=True)
+        if response is not None:
+            return response
+        
+        serializer = DoctorSerializer(doctor)
+        return set_validators(
+            Response(serializer.data),
+            etag=etag,
+            last_modified=last_modified,
+            private=True
+        )
     
     elif request.method == 'POST':
         serializer = DoctorCreateSerializer(
@@ -92,6 +124,10 @@ def doctor_profile(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_response(
+    ('doctors', 'specialties'),
+    cacheable_params={'cursor', 'page_size', 'fields', 'expand'}
+)
 def doctor_list(request):
     """
     Listar todos los doctores activos (público).
@@ -99,61 +135,195 @@ def doctor_list(request):
     GET /api/doctors/
     
     Query params:
-    - specialty: filtrar por especialidad
-    - search: buscar por nombre
+    - specialty: filtrar por especialidad (sin acentos, parcial)
+    - search: buscar por nombre, especialidad, universidad o biografía
+      (ordena por relevancia)
+    - cursor: cursor opaco de `next` / `previous`
+    - page_size: resultados por página (máx. 100)
+    - fields / expand: campos de DoctorSerializer a devolver
+      (ej. ?fields=id,bio,user.full_name)
     
     Response (200):
     {
-        "count": 10,
-        "results": [...]
+        "next": "http://.../api/doctors/?cursor=...",
+        "previous": null,
+        "results": [{ "id", "full_name", "image_url", "address", "specialties" }, ...]
     }
+    
+    Por defecto devuelve tarjetas compactas (DoctorCardSerializer) leídas
+    con .values() del read model DoctorSearchDocument, sin JOINs. Con
+    ?fields= / ?expand= el read model sólo resuelve la página (ids) y los
+    campos pedidos se leen de Doctor con only() / prefetch a medida.
     """
-    queryset = Doctor.objects.filter(
-        is_active=True,
-        deleted_at__isnull=True
-    ).select_related('user')
+    sparse = wants_fieldset(request)
+    if sparse:
+        queryset = DoctorSearchDocument.objects.values('doctor_id', 'created_at')
+    else:
+        queryset = DoctorSearchDocument.objects.values(
+            *DoctorCardSerializer.source_fields, 'created_at'
+        )
     
     # Filtrar por especialidad
     specialty = request.query_params.get('specialty')
     if specialty:
-        queryset = queryset.filter(specialties__name__icontains=specialty)
+        queryset = filter_by_specialty(queryset, specialty)
     
-    # Buscar por nombre
+    # Búsqueda full-text + trigramas, ordenada por relevancia
     search = request.query_params.get('search')
     if search:
-        queryset = queryset.filter(
-            Q(user__first_name__icontains=search) |
-            Q(user__last_name__icontains=search)
+        queryset = search_doctors(queryset, search)
+        paginator = DoctorSearchPagination()
+    else:
+        # Paginación por cursor (-created_at, doctor_id): sin OFFSET ni COUNT(*)
+        paginator = DoctorCursorPagination()
+    
+    page = paginator.paginate_queryset(queryset, request)
+    
+    if not sparse:
+        serializer = DoctorCardSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
+    context = {'request': request}
+    doctors = DoctorSerializer(context=context).setup_queryset(
+        Doctor.objects.public()
+    ).in_bulk([row['doctor_id'] for row in page])
+    serializer = DoctorSerializer(
+        [doctors[row['doctor_id']] for row in page if row['doctor_id'] in doctors],
+        many=True,
+        context=context
+    )
+    
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def doctor_nearby(request):
+    """
+    Doctores activos cerca de un punto, ordenados por distancia (público).
+    
+    GET /api/doctors/nearby/?lat=-34.6037&lng=-58.3816&radius_km=5
+    
+    Query params:
+    - lat, lng: punto de búsqueda (obligatorios)
+    - radius_km: radio de búsqueda (default 10, máx. 200)
+    - specialty: filtrar por especialidad
+    - page_size: cantidad de resultados (default 20, máx. 100)
+    
+    Response (200):
+    {
+        "count": 3,
+        "results": [{ <tarjeta de doctor>, "distance_km": 1.27 }, ...]
+    }
+    """
+    try:
+        lat = float(request.query_params['lat'])
+        lng = float(request.query_params['lng'])
+        radius_km = float(request.query_params.get('radius_km', DEFAULT_RADIUS_KM))
+        limit = int(request.query_params.get('page_size', DoctorCursorPagination.page_size))
+    except (KeyError, ValueError):
+        return Response(
+            {'error': 'Se requieren lat y lng numéricos'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return Response(
+            {'error': 'Coordenadas fuera de rango'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        return Response(
+            {'error': f'radius_km debe estar entre 0 y {MAX_RADIUS_KM}'},
+            status=status.HTTP_400_BAD_REQUEST
         )
+    limit = max(1, min(limit, DoctorCursorPagination.max_page_size))
     
-    queryset = queryset.distinct()
-    serializer = DoctorSerializer(queryset, many=True)
+    # 1. Prefiltro por bounding box (usa doctor_doc_geo_idx)
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    queryset = DoctorSearchDocument.objects.values(*DoctorCardSerializer.source_fields).filter(
+        latitude__isnull=False,
+        longitude__isnull=False,
+        latitude__range=(min_lat, max_lat),
+        longitude__range=(min_lng, max_lng),
+    )
+    
+    specialty = request.query_params.get('specialty')
+    if specialty:
+        queryset = filter_by_specialty(queryset, specialty)
+    
+    # 2. Distancia exacta sólo sobre los candidatos del rectángulo
+    queryset = queryset.annotate(
+        distance_km=haversine_expression(lat, lng)
+    ).filter(
+        distance_km__lte=radius_km
+    ).order_by('distance_km', 'doctor_id')[:limit]
+    
+    card = DoctorCardSerializer()
+    results = [
+        {**card.to_representation(row), 'distance_km': round(row['distance_km'], 2)}
+        for row in queryset
+    ]
     
     return Response({
-        'count': queryset.count(),
-        'results': serializer.data
+        'count': len(results),
+        'results': results
     })
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@etag_from_versions(lambda request, doctor_id: (doctor_namespace(doctor_id), 'specialties'))
+@cache_response(lambda request, doctor_id: (doctor_namespace(doctor_id), 'specialties'))
 def doctor_detail(request, doctor_id):
     """
     Ver detalle de un doctor específico (público).
     
     GET /api/doctors/<uuid:doctor_id>/
+    
+    Query params:
+    - fields / expand: campos a devolver (ej. ?fields=id,bio&expand=user)
+    
+    Soporta If-None-Match: responde 304 si el doctor no cambió.
     """
+    context = {'request': request}
+    queryset = DoctorSerializer(context=context).setup_queryset(Doctor.objects.public())
     try:
-        doctor = Doctor.objects.select_related('user').get(
-            id=doctor_id,
-            is_active=True,
-            deleted_at__isnull=True
-        )
+        doctor = queryset.get(id=doctor_id)
     except Doctor.DoesNotExist:
         return Response(
             {'error': 'Doctor no encontrado'},
             status=status.HTTP_404_NOT_FOUND
         )
     
-    serializer = DoctorSerializer(doctor)
+    serializer = DoctorSerializer(doctor, context=context)
     return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def doctor_export(request):
+    """
+    Exportar el directorio completo de doctores (sólo staff).
+    
+    GET /api/doctors/export/?output=jsonl
+    GET /api/doctors/export/?output=csv
+    
+    La respuesta se genera en streaming mientras se lee la base con un
+    cursor del lado del servidor (ver apps/users/export.py): la memoria
+    del worker no crece con la cantidad de doctores.
+    """
+    export_format = request.query_params.get('output', 'jsonl')
+    if export_format not in EXPORT_FORMATS:
+        return Response(
+            {'error': f'output debe ser uno de: {", ".join(EXPORT_FORMATS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    filename = f'doctores-{timezone.localdate():%Y%m%d}.{export_format}'
+    response = StreamingHttpResponse(
+        export_chunks(export_format),
+        content_type=CONTENT_TYPES[export_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,33 @@
+# apps/users/views/metrics.py
+"""
+Endpoint de métricas para Prometheus.
+
+No es parte de la API: view de Django (sin DRF ni usuarios). Pide el
+token compartido METRICS_TOKEN (Authorization: Bearer <token>, el
+`authorization` del scrape config de Prometheus). No se confía en la IP:
+detrás de un proxy en la misma máquina todos los requests llegan desde
+127.0.0.1. Sin METRICS_TOKEN configurado responde 404.
+"""
+
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from apps.users import metrics as prometheus
+
+
+@require_GET
+def metrics(request):
+    """
+    Métricas de todos los workers en el formato de texto de Prometheus.
+    
+    GET /metrics
+    """
+    authorization = request.headers.get('Authorization', '').encode()
+    expected = f'Bearer {settings.METRICS_TOKEN}'.encode()
+    if not (settings.METRICS_ENABLED and settings.METRICS_TOKEN and hmac.compare_digest(authorization, expected)):
+        raise Http404
+    return HttpResponse(prometheus.render(), content_type=CONTENT_TYPE_LATEST)
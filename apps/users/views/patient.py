@@ -8,6 +8,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from apps.users.conditional import make_etag, not_modified, set_validators
 from apps.users.serializers import (
     PatientSerializer,
     PatientCreateSerializer,
@@ -22,7 +23,7 @@ def patient_profile(request):
     Gestionar MI perfil de paciente.
     
     GET /api/patients/profile/
-    - Ver mi perfil de paciente
+    - Ver mi perfil de paciente (soporta If-None-Match / If-Modified-Since)
     
     POST /api/patients/profile/
     - Crear mi perfil de paciente
@@ -44,8 +45,21 @@ def patient_profile(request):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        serializer = PatientSerializer(request.user.patient_profile)
-        return Response(serializer.data)
+        patient = request.user.patient_profile
+        
+        last_modified = max(patient.updated_at, request.user.updated_at)
+        etag = make_etag(patient.pk, last_modified.isoformat())
+        response = not_modified(request, etag=etag, last_modified=last_modified, private=True)
+        if response is not None:
+            return response
+        
+        serializer = PatientSerializer(patient)
+        return set_validators(
+            Response(serializer.data),
+            etag=etag,
+            last_modified=last_modified,
+            private=True
+        )
     
     elif request.method == 'POST':
         serializer = PatientCreateSerializer(
@@ -0,0 +1,210 @@
+# apps/users/views/public_async.py
+"""
+Versiones async (ASGI nativas) de los endpoints públicos de lectura.
+
+Mismas respuestas que doctor_list, doctor_detail, specialty_list y
+specialty_detail, pero como `async def`: bajo ASGI no ocupan un thread
+del executor mientras esperan a Redis (cliente redis.asyncio, ver
+apps/users/cache.py) y leen la base con el ORM async (aget, ain_bulk,
+aiterator, ...).
+
+DRF 3.14 no soporta views async, así que no pasan por @api_view:
+- sólo aceptan GET / HEAD y responden JSON (ORJSONRenderer)
+- el request se envuelve en un rest_framework.request.Request para
+  reutilizar serializers, paginación y cache (query_params)
+- los APIException (ej. ?fields= inválido, cursor inválido) se
+  convierten con el exception handler de DRF
+- quedan fuera de ATOMIC_REQUESTS (Django no lo permite en views
+  async; además son sólo lecturas)
+
+Se activan con ASYNC_PUBLIC_VIEWS = True (ver apps/users/urls); tiene
+sentido sólo sirviendo con ASGI (config/asgi.py): bajo WSGI cada
+request async corre en su propio event loop.
+"""
+
+import functools
+
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from apps.users.cache import acache_response, doctor_namespace
+from apps.users.conditional import aetag_from_versions
+from apps.users.models import Doctor, DoctorSearchDocument, Specialty
+from apps.users.pagination import DoctorCursorPagination, DoctorSearchPagination
+from apps.users.renderers import ORJSONRenderer
+from apps.users.search import filter_by_specialty, search_doctors
+from apps.users.serializers import (
+    DoctorSerializer,
+    DoctorCardSerializer,
+    SpecialtySerializer,
+    wants_fieldset,
+)
+
+# Filas por viaje a la base al recorrer los doctores de una especialidad
+DOCTORS_CHUNK_SIZE = 2000
+
+_renderer = ORJSONRenderer()
+
+
+def _json_response(data, status_code=status.HTTP_200_OK, headers=None):
+    return HttpResponse(
+        _renderer.render(data),
+        status=status_code,
+        content_type='application/json',
+        headers=headers,
+    )
+
+
+def public_async_view(view_func):
+    """
+    Equivalente mínimo de @api_view(['GET']) + AllowAny para views async.
+
+    Va arriba de todo (los decorators de cache / ETag reciben el Request de DRF).
+    """
+    @transaction.non_atomic_requests
+    @functools.wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return _json_response(
+                {'detail': f'Método "{request.method}" no permitido.'},
+                status.HTTP_405_METHOD_NOT_ALLOWED,
+                headers={'Allow': 'GET, HEAD'},
+            )
+
+        request = Request(request)
+        try:
+            return await view_func(request, *args, **kwargs)
+        except APIException as exc:
+            response = exception_handler(exc, {'request': request})
+            headers = {
+                name: value for name, value in response.items()
+                if name.lower() != 'content-type'
+            }
+            return _json_response(response.data, response.status_code, headers=headers)
+
+    return wrapper
+
+
+@public_async_view
+@acache_response(
+    ('doctors', 'specialties'),
+    cacheable_params={'cursor', 'page_size', 'fields', 'expand'}
+)
+async def doctor_list_async(request):
+    """
+    GET /api/doctors/ (async). Ver doctor_list.
+    """
+    sparse = wants_fieldset(request)
+    if sparse:
+        queryset = DoctorSearchDocument.objects.values('doctor_id', 'created_at')
+    else:
+        queryset = DoctorSearchDocument.objects.values(
+            *DoctorCardSerializer.source_fields, 'created_at'
+        )
+
+    specialty = request.query_params.get('specialty')
+    if specialty:
+        queryset = filter_by_specialty(queryset, specialty)
+
+    search = request.query_params.get('search')
+    if search:
+        queryset = search_doctors(queryset, search)
+        paginator = DoctorSearchPagination()
+    else:
+        paginator = DoctorCursorPagination()
+
+    page = await paginator.apaginate_queryset(queryset, request)
+
+    if not sparse:
+        serializer = DoctorCardSerializer(page, many=True)
+        return _json_response(paginator.get_paginated_data(serializer.data))
+
+    context = {'request': request}
+    doctors = await DoctorSerializer(context=context).setup_queryset(
+        Doctor.objects.public()
+    ).ain_bulk([row['doctor_id'] for row in page])
+    serializer = DoctorSerializer(
+        [doctors[row['doctor_id']] for row in page if row['doctor_id'] in doctors],
+        many=True,
+        context=context
+    )
+
+    return _json_response(paginator.get_paginated_data(serializer.data))
+
+
+@public_async_view
+@aetag_from_versions(lambda request, doctor_id: (doctor_namespace(doctor_id), 'specialties'))
+@acache_response(lambda request, doctor_id: (doctor_namespace(doctor_id), 'specialties'))
+async def doctor_detail_async(request, doctor_id):
+    """
+    GET /api/doctors/<uuid:doctor_id>/ (async). Ver doctor_detail.
+    """
+    context = {'request': request}
+    queryset = DoctorSerializer(context=context).setup_queryset(Doctor.objects.public())
+    try:
+        doctor = await queryset.aget(id=doctor_id)
+    except Doctor.DoesNotExist:
+        return _json_response(
+            {'error': 'Doctor no encontrado'},
+            status.HTTP_404_NOT_FOUND
+        )
+
+    # Todo lo que lee el serializer ya está cargado (only / select_related / prefetch)
+    return _json_response(DoctorSerializer(doctor, context=context).data)
+
+
+@public_async_view
+@acache_response(('specialties',))
+async def specialty_list_async(request):
+    """
+    GET /api/specialties/ (async). Ver specialty_list.
+    """
+    context = {'request': request}
+    queryset = SpecialtySerializer(context=context).setup_queryset(
+        Specialty.objects.order_by('name')
+    )
+
+    search = request.query_params.get('search')
+    if search:
+        queryset = queryset.filter(name__icontains=search)
+
+    # Sin paginación: el total es el largo de la lista, sin un COUNT aparte
+    specialties = [specialty async for specialty in queryset]
+    serializer = SpecialtySerializer(specialties, many=True, context=context)
+
+    return _json_response({
+        'count': len(specialties),
+        'results': serializer.data
+    })
+
+
+@public_async_view
+@aetag_from_versions(('specialties', 'doctors'))
+@acache_response(('specialties', 'doctors'))
+async def specialty_detail_async(request, specialty_id):
+    """
+    GET /api/specialties/<uuid:specialty_id>/ (async). Ver specialty_detail.
+    """
+    try:
+        specialty = await Specialty.objects.aget(id=specialty_id)
+    except Specialty.DoesNotExist:
+        return _json_response(
+            {'error': 'Especialidad no encontrada'},
+            status.HTTP_404_NOT_FOUND
+        )
+
+    data = SpecialtySerializer(specialty).data
+
+    doctors = DoctorSearchDocument.objects.filter(
+        specialty_ids__contains=[specialty.id]
+    ).values(*DoctorCardSerializer.source_fields)
+    data['doctors'] = DoctorCardSerializer(
+        [row async for row in doctors.aiterator(chunk_size=DOCTORS_CHUNK_SIZE)],
+        many=True
+    ).data
+
+    return _json_response(data)
@@ -8,12 +8,15 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 
-from apps.users.models import Specialty
-from apps.users.serializers import SpecialtySerializer, DoctorSerializer
+from apps.users.cache import cache_response
+from apps.users.conditional import etag_from_versions
+from apps.users.models import DoctorSearchDocument, Specialty
+from apps.users.serializers import DoctorCardSerializer, SpecialtySerializer
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_response(('specialties',))
 def specialty_list(request):
     """
     Listar todas las especialidades médicas (público).
@@ -22,6 +25,7 @@ def specialty_list(request):
     
     Query params:
     - search: buscar por nombre
+    - fields: campos a devolver (ej. ?fields=id,name)
     
     Response (200):
     {
@@ -37,13 +41,16 @@ def specialty_list(request):
         ]
     }
     """
-    queryset = Specialty.objects.all().order_by('name')
+    context = {'request': request}
+    queryset = SpecialtySerializer(context=context).setup_queryset(
+        Specialty.objects.order_by('name')
+    )
     
     search = request.query_params.get('search')
     if search:
         queryset = queryset.filter(name__icontains=search)
     
-    serializer = SpecialtySerializer(queryset, many=True)
+    serializer = SpecialtySerializer(queryset, many=True, context=context)
     
     return Response({
         'count': queryset.count(),
@@ -53,12 +60,16 @@ def specialty_list(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@etag_from_versions(('specialties', 'doctors'))
+@cache_response(('specialties', 'doctors'))
 def specialty_detail(request, specialty_id):
     """
     Ver detalle de una especialidad con sus doctores.
     
     GET /api/specialties/<uuid:specialty_id>/
     
+    Soporta If-None-Match: responde 304 si nada cambió.
+    
     Response (200):
     {
         "id": "uuid",
@@ -78,8 +89,10 @@ def specialty_detail(request, specialty_id):
     
     data = SpecialtySerializer(specialty).data
     
-    # Agregar lista de doctores
-    doctors = specialty.doctors.filter(is_active=True, deleted_at__isnull=True)
-    data['doctors'] = DoctorSerializer(doctors, many=True).data
+    # Agregar tarjetas de doctores (desde el read model, índice GIN sobre specialty_ids)
+    doctors = DoctorSearchDocument.objects.filter(
+        specialty_ids__contains=[specialty.id]
+    ).values(*DoctorCardSerializer.source_fields)
+    data['doctors'] = DoctorCardSerializer(doctors, many=True).data
     
     return Response(data)
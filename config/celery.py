@@ -0,0 +1,19 @@
+"""
+Celery config for config project.
+
+Worker y beat:
+    celery -A config worker -l info
+    celery -A config beat -l info
+
+La configuración sale de settings.py (claves CELERY_*).
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+app = Celery('config')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
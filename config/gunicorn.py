@@ -0,0 +1,43 @@
+"""
+Gunicorn config for config project.
+
+    gunicorn -c config/gunicorn.py config.wsgi
+
+Workers gthread: cada proceso atiende GUNICORN_THREADS requests a la vez.
+El pool de hashing (apps/users/hashing.py) es por proceso y limita cuántos
+de esos threads pueden quedar tomados por logins / registros; con workers
+sync (un request por proceso) no tendría nada que acotar.
+
+Prepara el directorio de métricas multiproceso de Prometheus
+(PROMETHEUS_MULTIPROC_DIR, ver apps/users/metrics.py).
+"""
+
+import os
+import shutil
+
+# Sin `from decouple import config`: gunicorn toma cada nombre del módulo
+# como un setting, y `config` es uno de ellos
+import decouple
+
+bind = decouple.config('GUNICORN_BIND', default='0.0.0.0:8000')
+workers = decouple.config('GUNICORN_WORKERS', default=(os.cpu_count() or 1) * 2 + 1, cast=int)
+worker_class = 'gthread'
+threads = decouple.config('GUNICORN_THREADS', default=8, cast=int)
+
+multiproc_dir = decouple.config('PROMETHEUS_MULTIPROC_DIR', default='')
+if multiproc_dir:
+    # Los workers lo heredan del master antes de importar prometheus_client
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = multiproc_dir
+
+
+def on_starting(server):
+    # Los archivos de una corrida anterior sumarían valores viejos
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if multiproc_dir:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
+from celery.schedules import crontab
 from decouple import config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -38,6 +40,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Full-text search y pg_trgm
     # 'django.contrib.gis',  # PostGIS - Descomentar cuando instales GDAL
     'cloudinary',
     'cloudinary_storage'
@@ -60,6 +63,8 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    # Primero: mide también las queries de sesión y autenticación
+    'apps.users.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -158,12 +163,23 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
+    # JWT de simplejwt + cache de tokens verificados y del usuario (sin queries por request)
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # JSON con orjson (mismos bytes que el JSONRenderer de DRF)
+    'DEFAULT_RENDERER_CLASSES': (
+        'apps.users.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'apps.users.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': (
@@ -184,8 +200,24 @@ SIMPLE_JWT = {
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': config('JWT_SECRET_KEY', default=SECRET_KEY),
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Rotación con la blacklist en Redis (apps/users/tokens.py)
+    'TOKEN_REFRESH_SERIALIZER': 'apps.users.tokens.TokenRefreshSerializer',
 }
 
+# Blacklist de refresh tokens (apps/users/tokens.py). Redis propio, no el
+# del cache: instancia con maxmemory-policy noeviction y persistencia
+JWT_BLACKLIST_REDIS_URL = config('JWT_BLACKLIST_REDIS_URL', default='redis://localhost:6379/1')
+
+# Escribir además la blacklist en las tablas de token_blacklist (auditoría)
+JWT_BLACKLIST_DB_AUDIT = config('JWT_BLACKLIST_DB_AUDIT', default=False, cast=bool)
+
+# Cache de autenticación (apps/users/authentication.py)
+# LRU por proceso de tokens verificados: cantidad y segundos por entrada
+JWT_TOKEN_CACHE_SIZE = config('JWT_TOKEN_CACHE_SIZE', default=10000, cast=int)
+JWT_TOKEN_CACHE_TTL = config('JWT_TOKEN_CACHE_TTL', default=60, cast=int)
+# Segundos que vive en Redis el snapshot del usuario (se invalida al guardarlo)
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=300, cast=int)
+
 
 # CORS Settings
 CORS_ALLOWED_ORIGINS = [
@@ -202,11 +234,47 @@ CACHES = {
         'BACKEND': 'django_redis.cache.RedisCache',
         'LOCATION': config('REDIS_URL', default='redis://localhost:6379/0'),
         'OPTIONS': {
-            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            # DefaultClient que cuenta hits / misses por request (apps/users/instrumentation.py)
+            'CLIENT_CLASS': 'apps.users.instrumentation.InstrumentedRedisClient',
+            # El cache es una optimización: si Redis no responde, se sigue sin él
+            'IGNORE_EXCEPTIONS': True,
         }
     }
 }
 
+# Cache de respuestas de endpoints públicos (apps/users/cache.py)
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=300, cast=int)
+
+# Métricas por request (apps/users/instrumentation.py): fracción de requests
+# medidos (0 a 1) y repeticiones de una misma query que se loguean como N+1
+INSTRUMENTATION_SAMPLE_RATE = config('INSTRUMENTATION_SAMPLE_RATE', default=1.0 if DEBUG else 0.05, cast=float)
+INSTRUMENTATION_REPEATED_QUERY_THRESHOLD = config('INSTRUMENTATION_REPEATED_QUERY_THRESHOLD', default=5, cast=int)
+# Header Server-Timing en los requests medidos para todos los clientes
+# (si no, sólo para usuarios staff); el log no depende de esto
+SERVER_TIMING_HEADER = config('SERVER_TIMING_HEADER', default=DEBUG, cast=bool)
+
+# Métricas de Prometheus en /metrics (apps/users/metrics.py)
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+# Token que tiene que mandar Prometheus (Authorization: Bearer ...); vacío = /metrics desactivado
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+# Directorio compartido por los workers de gunicorn (modo multiproceso);
+# prometheus_client lo lee del entorno, así que se exporta antes de importarlo
+PROMETHEUS_MULTIPROC_DIR = config('PROMETHEUS_MULTIPROC_DIR', default='')
+if PROMETHEUS_MULTIPROC_DIR:
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', PROMETHEUS_MULTIPROC_DIR)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+# Listado / detalle de doctores y especialidades como views async
+# (apps/users/views/public_async.py). Activar sólo sirviendo con ASGI.
+ASYNC_PUBLIC_VIEWS = config('ASYNC_PUBLIC_VIEWS', default=False, cast=bool)
+
+# Hasheo de passwords en pool acotado (apps/users/hashing.py), por proceso.
+# Pensado para workers gthread: MAX_PENDING menor que GUNICORN_THREADS.
+# WORKERS=0 hashea en el thread del request; MAX_PENDING=0 usa 2 x WORKERS
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=2, cast=int)
+PASSWORD_HASHING_MAX_PENDING = config('PASSWORD_HASHING_MAX_PENDING', default=0, cast=int)
+PASSWORD_HASHING_TIMEOUT = config('PASSWORD_HASHING_TIMEOUT', default=5, cast=float)
+
 
 # Celery Configuration
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
@@ -215,6 +283,17 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'prune-jwt-tokens': {
+        'task': 'apps.users.tasks.prune_jwt_tokens',
+        'schedule': crontab(minute=17),
+    },
+}
+
+# Retención de las tablas de token_blacklist (apps/users/token_tables.py)
+# Tokens vencidos por lote y segundos de pausa entre lotes
+JWT_PRUNE_BATCH_SIZE = config('JWT_PRUNE_BATCH_SIZE', default=1000, cast=int)
+JWT_PRUNE_PAUSE = config('JWT_PRUNE_PAUSE', default=0.05, cast=float)
 
 
 # File Upload Settings
@@ -17,9 +17,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from apps.users.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     
+    # Métricas para Prometheus (con METRICS_TOKEN)
+    path('metrics', metrics, name='metrics'),
+    
     # API endpoints
     path('api/', include('apps.users.urls')),
 ]